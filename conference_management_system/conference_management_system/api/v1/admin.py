@@ -1,6 +1,16 @@
 import frappe
+from conference_management_system.conference_management_system.utils.api_log_body import get_api_log_body as read_api_log_body
 from conference_management_system.conference_management_system.utils.api_logger import log_api_call
-from conference_management_system.conference_management_system.utils.error_handler import handle_api_error
+from conference_management_system.conference_management_system.utils.compression import decompress_from_text
+from conference_management_system.conference_management_system.utils.dashboard import (
+    DASHBOARD_QUERIES, DashboardContext, build_dashboard_stats, build_recent_registrations,
+    build_revenue_summary, run_dashboard_queries
+)
+from conference_management_system.conference_management_system.utils.doc_cache import get_cache_stats as get_doc_cache_stats
+from conference_management_system.conference_management_system.utils.error_handler import handle_api_error, ValidationError
+from conference_management_system.conference_management_system.utils.identity import get_identity
+from conference_management_system.conference_management_system.utils.payment_processor import PaymentProcessor
+from conference_management_system.conference_management_system.utils.query_stats import reset_query_stats as reset_query_stats_store
 
 
 @frappe.whitelist()
@@ -19,9 +29,7 @@ def get_user_roles():
             }
         
         try:
-            roles = frappe.get_roles(user)
-            if not roles:
-                roles = []
+            roles = get_identity(user)["roles"]
         except Exception as role_error:
             frappe.log_error(f"Error fetching user roles: {str(role_error)}", "Admin API")
             roles = []
@@ -46,82 +54,10 @@ def get_user_roles():
 def get_dashboard_stats():
     """Get comprehensive dashboard statistics"""
     try:
-        # Initialize default values
-        stats = {
-            "conferences": 0,
-            "sessions": 0,
-            "registrations": 0,
-            "active_conferences": 0,
-            "total_revenue": 0,
-            "processing_fees": 0,
-            "net_revenue": 0,
-            "email_logs": 0,
-            "recent_emails": 0,
-            "api_logs": 0,
-            "recent_api_calls": 0
-        }
-        
-        # Get basic counts with error handling
-        try:
-            stats["conferences"] = frappe.db.count("Conference")
-        except Exception as e:
-            frappe.log_error(f"Error counting conferences: {str(e)}", "Admin API")
-        
-        try:
-            stats["sessions"] = frappe.db.count("Session")
-        except Exception as e:
-            frappe.log_error(f"Error counting sessions: {str(e)}", "Admin API")
-        
-        try:
-            stats["registrations"] = frappe.db.count("Registration")
-        except Exception as e:
-            frappe.log_error(f"Error counting registrations: {str(e)}", "Admin API")
-        
-        try:
-            stats["active_conferences"] = frappe.db.count("Conference", {"status": ["in", ["Upcoming", "Ongoing"]]})
-        except Exception as e:
-            frappe.log_error(f"Error counting active conferences: {str(e)}", "Admin API")
-        
-        # Get payment statistics with error handling
-        try:
-            payment_details = frappe.get_all("Mock Payment Details", 
-                filters={"payment_status": "Success"},
-                fields=["amount", "processing_fee", "net_amount"])
-            
-            if payment_details:
-                stats["total_revenue"] = sum(float(pd.get('amount', 0) or 0) for pd in payment_details)
-                stats["processing_fees"] = sum(float(pd.get('processing_fee', 0) or 0) for pd in payment_details)
-                stats["net_revenue"] = sum(float(pd.get('net_amount', 0) or 0) for pd in payment_details)
-        except Exception as e:
-            frappe.log_error(f"Error calculating payment statistics: {str(e)}", "Admin API")
-        
-        # Get email statistics with error handling
-        try:
-            stats["email_logs"] = frappe.db.count("Mock Email Log")
-        except Exception as e:
-            frappe.log_error(f"Error counting email logs: {str(e)}", "Admin API")
-        
-        try:
-            seven_days_ago = frappe.utils.add_days(frappe.utils.nowdate(), -7)
-            stats["recent_emails"] = frappe.db.count("Mock Email Log", {"sent_date": [">=", seven_days_ago]})
-        except Exception as e:
-            frappe.log_error(f"Error counting recent emails: {str(e)}", "Admin API")
-        
-        # Get API usage with error handling
-        try:
-            stats["api_logs"] = frappe.db.count("API Log")
-        except Exception as e:
-            frappe.log_error(f"Error counting API logs: {str(e)}", "Admin API")
-        
-        try:
-            yesterday = frappe.utils.add_days(frappe.utils.nowdate(), -1)
-            stats["recent_api_calls"] = frappe.db.count("API Log", {"timestamp": [">=", yesterday]})
-        except Exception as e:
-            frappe.log_error(f"Error counting recent API calls: {str(e)}", "Admin API")
-        
+        data = build_dashboard_stats(DashboardContext())
         return {
             "success": True,
-            "data": stats
+            "data": data
         }
     except Exception as e:
         frappe.log_error(f"Unexpected error in get_dashboard_stats: {str(e)}", "Admin API")
@@ -136,35 +72,11 @@ def get_dashboard_stats():
 def get_recent_registrations():
     """Get recent registrations with payment details"""
     try:
-        registrations = []
-        try:
-            registrations = frappe.db.sql("""
-                SELECT r.name, r.registration_date, r.payment_status, r.amount, r.payment_details,
-                       c.conference_name, s.session_name, a.attendee_name, a.email as attendee_email,
-                       p.payment_method, p.transaction_id
-                FROM `tabRegistration` r
-                LEFT JOIN `tabConference` c ON r.conference = c.name
-                LEFT JOIN `tabSession` s ON r.session = s.name
-                LEFT JOIN `tabAttendee` a ON r.attendee = a.name
-                LEFT JOIN `tabMock Payment Details` p ON r.payment_details = p.name
-                ORDER BY r.creation DESC
-                LIMIT 10
-            """, as_dict=True)
-            
-            # Sanitize data
-            for reg in registrations:
-                for key, value in reg.items():
-                    if value is None:
-                        reg[key] = ''
-                        
-        except Exception as sql_error:
-            frappe.log_error(f"SQL error in get_recent_registrations: {str(sql_error)}", "Admin API")
-            registrations = []
-        
+        data = build_recent_registrations(DashboardContext())
         return {
             "success": True,
-            "data": registrations,
-            "message": f"Found {len(registrations)} recent registrations"
+            "data": data,
+            "message": f"Found {len(data)} recent registrations"
         }
     except Exception as e:
         frappe.log_error(f"Unexpected error in get_recent_registrations: {str(e)}", "Admin API")
@@ -179,56 +91,10 @@ def get_recent_registrations():
 def get_revenue_summary():
     """Get comprehensive revenue summary with payment breakdown"""
     try:
-        # Initialize default values
-        revenue_data = {
-            "total_revenue": 0,
-            "processing_fees": 0,
-            "net_revenue": 0,
-            "paid_registrations": 0,
-            "conversion_rate": 0,
-            "payment_methods": {}
-        }
-        
-        # Get payment details for accurate revenue calculation
-        try:
-            successful_payments = frappe.get_all("Mock Payment Details", 
-                filters={"payment_status": "Success"},
-                fields=["amount", "processing_fee", "net_amount", "payment_method"])
-            
-            if successful_payments:
-                revenue_data["total_revenue"] = sum(float(pd.get('amount', 0) or 0) for pd in successful_payments)
-                revenue_data["processing_fees"] = sum(float(pd.get('processing_fee', 0) or 0) for pd in successful_payments)
-                revenue_data["net_revenue"] = sum(float(pd.get('net_amount', 0) or 0) for pd in successful_payments)
-                
-                # Payment method breakdown
-                method_breakdown = {}
-                for payment in successful_payments:
-                    method = payment.get('payment_method', 'Unknown')
-                    if not method:
-                        method = 'Unknown'
-                        
-                    if method not in method_breakdown:
-                        method_breakdown[method] = {"count": 0, "amount": 0}
-                    method_breakdown[method]["count"] += 1
-                    method_breakdown[method]["amount"] += float(payment.get('amount', 0) or 0)
-                
-                revenue_data["payment_methods"] = method_breakdown
-                revenue_data["paid_registrations"] = len(successful_payments)
-                
-        except Exception as payment_error:
-            frappe.log_error(f"Error fetching payment details: {str(payment_error)}", "Admin API")
-        
-        # Calculate conversion rate
-        try:
-            total_registrations = frappe.db.count("Registration")
-            if total_registrations > 0:
-                revenue_data["conversion_rate"] = round((revenue_data["paid_registrations"] / total_registrations * 100), 1)
-        except Exception as conversion_error:
-            frappe.log_error(f"Error calculating conversion rate: {str(conversion_error)}", "Admin API")
-        
+        data = build_revenue_summary(DashboardContext())
         return {
             "success": True,
-            "data": revenue_data
+            "data": data
         }
     except Exception as e:
         frappe.log_error(f"Unexpected error in get_revenue_summary: {str(e)}", "Admin API")
@@ -237,3 +103,153 @@ def get_revenue_summary():
             "error": "Failed to fetch revenue summary"
         }
 
+@frappe.whitelist()
+@log_api_call
+@handle_api_error
+def get_dashboard_batch():
+    """Run several dashboard queries in one request, sharing counts and the payment aggregate
+
+    queries: list of query names (default all)
+    since: token from an earlier response; unchanged queries come back as {"unchanged": true}
+    """
+    frappe.only_for(["System Manager", "Conference Admin"])
+    
+    data = frappe.local.form_dict
+    queries = data.get('queries') or list(DASHBOARD_QUERIES)
+    since = data.get('since')
+    
+    if isinstance(queries, str):
+        queries = frappe.parse_json(queries) if queries.startswith('[') else queries.split(',')
+    if isinstance(since, str):
+        since = frappe.parse_json(since)
+    
+    unknown = [query for query in queries if query not in DASHBOARD_QUERIES]
+    if unknown:
+        raise ValidationError(f"Unknown queries: {', '.join(unknown)}. Must be any of: {', '.join(DASHBOARD_QUERIES)}")
+    if since is not None and not isinstance(since, dict):
+        raise ValidationError("since must be the token returned by an earlier batch")
+    
+    return {
+        "success": True,
+        "data": run_dashboard_queries(queries, since)
+    }
+
+@frappe.whitelist()
+@log_api_call
+@handle_api_error
+def process_pending_payments():
+    """Settle many pending registrations in one batch"""
+    frappe.only_for(["System Manager", "Conference Admin"])
+    
+    data = frappe.local.form_dict
+    registration_ids = data.get('registration_ids')
+    payment_method = data.get('payment_method') or "Credit Card"
+    
+    if isinstance(registration_ids, str):
+        registration_ids = frappe.parse_json(registration_ids)
+    
+    if not registration_ids:
+        # Default to every registration still awaiting payment
+        registration_ids = frappe.get_all("Registration", filters={"payment_status": "Pending"}, pluck="name")
+    
+    if not isinstance(registration_ids, list):
+        raise ValidationError("registration_ids must be a list")
+    
+    return PaymentProcessor.process_payments_batch(registration_ids, payment_method)
+
+@frappe.whitelist()
+@log_api_call
+@handle_api_error
+def get_cache_stats():
+    """Document cache hit, miss and eviction counters"""
+    frappe.only_for(["System Manager", "Conference Admin"])
+    
+    return {
+        "success": True,
+        "data": get_doc_cache_stats()
+    }
+
+@frappe.whitelist()
+@log_api_call
+@handle_api_error
+def list_api_profiles():
+    """Recorded request profiles, newest first, without the profile data itself"""
+    frappe.only_for(["System Manager", "Conference Admin"])
+    
+    data = frappe.local.form_dict
+    filters = {}
+    if data.get('api_endpoint'):
+        filters["api_endpoint"] = data.get('api_endpoint')
+    if data.get('user'):
+        filters["user"] = data.get('user')
+    
+    limit = frappe.utils.cint(data.get('limit') or 50)
+    if limit < 1 or limit > 500:
+        raise ValidationError("limit must be between 1 and 500")
+    
+    profiles = frappe.get_all("API Profile",
+        filters=filters,
+        fields=["name", "api_endpoint", "api_log", "user", "timestamp", "engine", "wall_time",
+                "sql_time", "python_time", "query_count", "profile_format", "raw_size", "compressed_size"],
+        order_by="timestamp desc",
+        limit=limit)
+    
+    return {
+        "success": True,
+        "data": profiles
+    }
+
+@frappe.whitelist()
+@log_api_call
+@handle_api_error
+def download_api_profile():
+    """Download one profile: a pstats file for cProfile, an HTML report for pyinstrument"""
+    frappe.only_for(["System Manager", "Conference Admin"])
+    
+    name = frappe.local.form_dict.get('name')
+    if not name:
+        raise ValidationError("name is required")
+    if not frappe.db.exists("API Profile", name):
+        raise ValidationError(f"API Profile {name} not found")
+    
+    profile = frappe.db.get_value("API Profile", name, ["profile_format", "profile_data"], as_dict=True)
+    extension = "html" if profile.profile_format == "html" else "prof"
+    
+    frappe.local.response.filename = f"{name}.{extension}"
+    frappe.local.response.filecontent = decompress_from_text(profile.profile_data)
+    frappe.local.response.type = "download"
+
+@frappe.whitelist()
+@log_api_call
+@handle_api_error
+def reset_query_stats():
+    """Clear the query fingerprint totals and slow examples"""
+    frappe.only_for(["System Manager", "Conference Admin"])
+    
+    reset_query_stats_store()
+    return {
+        "success": True,
+        "message": "Query stats cleared"
+    }
+
+@frappe.whitelist()
+@log_api_call
+@handle_api_error
+def get_api_log_body():
+    """Decompressed request headers, request body and response body of one API Log"""
+    frappe.only_for(["System Manager", "Conference Admin"])
+    
+    name = frappe.local.form_dict.get('name')
+    if not name:
+        raise ValidationError("name is required")
+    if not frappe.db.exists("API Log", name):
+        raise ValidationError(f"API Log {name} not found")
+    
+    body = read_api_log_body(name)
+    if body is None:
+        raise ValidationError(f"API Log {name} has no stored bodies")
+    
+    return {
+        "success": True,
+        "data": body
+    }
@@ -1,6 +1,10 @@
 import frappe
 from conference_management_system.conference_management_system.utils.api_logger import log_api_call
+from conference_management_system.conference_management_system.utils.attendee_profile import get_attendee_profile as get_cached_attendee_profile
 from conference_management_system.conference_management_system.utils.error_handler import handle_api_error, ValidationError
+from conference_management_system.conference_management_system.utils.identity import get_attendee_email, resolve_attendee
+from conference_management_system.conference_management_system.utils.portal_state import PORTAL_STATE_FIELDS, get_portal_state as get_portal_state_for
+from conference_management_system.conference_management_system.utils.preference_store import VALID_PREFERENCE_TYPES, upsert_preferences
 
 
 @frappe.whitelist()
@@ -13,24 +17,21 @@ def get_attendee_profile():
         if not email:
             email = frappe.session.user
         
-        # Handle special users
-        if email == 'Administrator':
-            email = 'admin@system.local'
-        elif email == 'Guest' or not email:
+        if email == 'Guest' or not email:
             return {
                 "success": False,
                 "error": "Authentication required"
             }
         
         # Validate email format (skip for system users)
-        if email not in ['admin@system.local'] and (not email or "@" not in email):
+        if email != 'Administrator' and "@" not in email:
             return {
                 "success": False,
                 "error": "Invalid email format"
             }
         
         try:
-            attendee_name = frappe.get_value("Attendee", {"email": email}, "name")
+            attendee_name = resolve_attendee(email)
         except Exception as db_error:
             frappe.log_error(f"Database error fetching attendee: {str(db_error)}", "Attendee API")
             return {
@@ -50,82 +51,23 @@ def get_attendee_profile():
             }
         
         try:
-            attendee = frappe.get_doc("Attendee", attendee_name)
-        except frappe.DoesNotExistError:
-            return {
-                "success": False,
-                "error": "Attendee profile not found"
-            }
+            profile = get_cached_attendee_profile(attendee_name)
         except Exception as e:
-            frappe.log_error(f"Error fetching attendee document: {str(e)}", "Attendee API")
+            frappe.log_error(f"Error fetching attendee profile: {str(e)}", "Attendee API")
             return {
                 "success": False,
                 "error": "Failed to fetch attendee profile"
             }
         
-        # Get preferences with proper error handling
-        preferences = []
-        if hasattr(attendee, 'preferences') and attendee.preferences:
-            for pref in attendee.preferences:
-                try:
-                    if not pref.session:
-                        continue
-                    session_doc = frappe.get_doc("Session", pref.session)
-                    preferences.append({
-                        "session_id": pref.session,
-                        "session_name": getattr(session_doc, 'session_name', ''),
-                        "speaker": getattr(session_doc, 'speaker', ''),
-                        "preference_type": getattr(pref, 'preference_type', 'Interested')
-                    })
-                except frappe.DoesNotExistError:
-                    # Skip preferences for deleted sessions
-                    continue
-                except Exception as pref_error:
-                    frappe.log_error(f"Error processing preference: {str(pref_error)}", "Attendee API")
-                    continue
-        
-        # Get registrations with comprehensive error handling
-        registrations = []
-        try:
-            registrations = frappe.get_all("Registration",
-                filters={"attendee": attendee.name},
-                fields=["name", "registration_date", "payment_status", "conference", "session"],
-                order_by="registration_date DESC")
-        except Exception as reg_error:
-            frappe.log_error(f"Error fetching registrations: {str(reg_error)}", "Attendee API")
-            registrations = []
-        
-        # Get conference and session details with proper validation
-        valid_registrations = []
-        for reg in registrations:
-            try:
-                if not reg.get('conference') or not reg.get('session'):
-                    continue
-                    
-                conference = frappe.get_doc("Conference", reg.conference)
-                session = frappe.get_doc("Session", reg.session)
-                
-                reg.conference_name = getattr(conference, 'conference_name', '')
-                reg.session_name = getattr(session, 'session_name', '')
-                reg.speaker = getattr(session, 'speaker', '')
-                reg.session_date = str(getattr(session, 'session_date', '')) if hasattr(session, 'session_date') else ''
-                reg.start_time = str(getattr(session, 'start_time', '')) if hasattr(session, 'start_time') else ''
-                reg.end_time = str(getattr(session, 'end_time', '')) if hasattr(session, 'end_time') else ''
-                valid_registrations.append(reg)
-            except frappe.DoesNotExistError:
-                # Skip registrations for deleted conferences/sessions
-                continue
-            except Exception as detail_error:
-                frappe.log_error(f"Error processing registration details: {str(detail_error)}", "Attendee API")
-                continue
+        if not profile:
+            return {
+                "success": False,
+                "error": "Attendee profile not found"
+            }
         
         return {
             "success": True,
-            "data": {
-                "attendee": attendee.as_dict() if attendee else {},
-                "preferences": preferences,
-                "registrations": valid_registrations
-            }
+            "data": profile
         }
     except Exception as e:
         frappe.log_error(f"Unexpected error in get_attendee_profile: {str(e)}", "Attendee API")
@@ -152,130 +94,101 @@ def update_preferences():
                 "error": "Email and session_id are required"
             }
         
-        # Handle special users
-        if email == 'Administrator':
-            email = 'admin@system.local'
-        elif email == 'Guest':
+        # Clearing a preference goes through update_preferences_batch
+        if preference_type not in VALID_PREFERENCE_TYPES:
             return {
                 "success": False,
-                "error": "Authentication required"
+                "error": f"Invalid preference type. Must be one of: {', '.join(VALID_PREFERENCE_TYPES)}"
             }
         
-        # Validate email format (skip for system users)
-        if email not in ['admin@system.local'] and (not email or "@" not in email):
+        attendee_id, error = _get_or_create_attendee(email)
+        if error:
             return {
                 "success": False,
-                "error": "Invalid email format"
+                "error": error
             }
         
-        # Validate preference type
-        valid_preference_types = ['Interested', 'Not Interested', 'Attended', 'Wishlist']
-        if preference_type not in valid_preference_types:
+        try:
+            upsert_preferences(attendee_id, {session_id: preference_type})
+            frappe.db.commit()
+        except ValidationError as ve:
+            frappe.db.rollback()
             return {
                 "success": False,
-                "error": f"Invalid preference type. Must be one of: {', '.join(valid_preference_types)}"
+                "error": str(ve)
             }
-        
-        # Get or create attendee with proper error handling
-        try:
-            attendee = frappe.get_doc("Attendee", {"email": email})
-        except frappe.DoesNotExistError:
-            # Create attendee if doesn't exist
-            try:
-                attendee = frappe.new_doc("Attendee")
-                attendee.attendee_name = frappe.session.user_fullname or email.split('@')[0]
-                attendee.email = email
-                attendee.insert(ignore_permissions=True)
-                frappe.db.commit()
-            except Exception as create_error:
-                frappe.log_error(f"Error creating attendee: {str(create_error)}", "Attendee API")
-                return {
-                    "success": False,
-                    "error": "Failed to create attendee profile"
-                }
-        except Exception as e:
-            frappe.log_error(f"Error fetching attendee: {str(e)}", "Attendee API")
+        except Exception as save_error:
+            frappe.log_error(f"Error saving attendee preferences: {str(save_error)}", "Attendee API")
+            frappe.db.rollback()
             return {
                 "success": False,
-                "error": "Failed to fetch attendee profile"
+                "error": "Failed to save preferences"
             }
         
-        # Validate session exists
-        try:
-            session_doc = frappe.get_doc("Session", session_id)
-        except frappe.DoesNotExistError:
-            return {
-                "success": False,
-                "error": "Session not found"
+        return {
+            "success": True,
+            "message": "Preferences updated successfully",
+            "data": {
+                "session_id": session_id,
+                "preference_type": preference_type,
+                "session_name": frappe.db.get_value("Session", session_id, "session_name") or '',
+                "attendee_id": attendee_id
             }
-        except Exception as e:
-            frappe.log_error(f"Error fetching session: {str(e)}", "Attendee API")
+        }
+    except Exception as e:
+        frappe.log_error(f"Unexpected error in update_preferences: {str(e)}", "Attendee API")
+        return {
+            "success": False,
+            "error": "An unexpected error occurred while updating preferences"
+        }
+
+@frappe.whitelist()
+@log_api_call
+@handle_api_error
+def update_preferences_batch():
+    """Update many session preferences for the current user in one transaction
+
+    An empty preference_type clears that session's preference
+    """
+    try:
+        data = frappe.local.form_dict
+        preferences = data.get('preferences')
+        
+        if isinstance(preferences, str):
+            preferences = frappe.parse_json(preferences)
+        
+        if not preferences or not isinstance(preferences, list):
             return {
                 "success": False,
-                "error": "Failed to validate session"
+                "error": "preferences must be a non-empty list of {session_id, preference_type}"
             }
         
-        # Check if preference already exists
-        existing_pref = None
-        try:
-            if hasattr(attendee, 'preferences') and attendee.preferences:
-                for pref in attendee.preferences:
-                    if getattr(pref, 'session', None) == session_id:
-                        existing_pref = pref
-                        break
-        except Exception as e:
-            frappe.log_error(f"Error checking existing preferences: {str(e)}", "Attendee API")
-            # Continue with creating new preference
+        # Later entries for the same session win, matching the order the user clicked
+        changes = {}
+        for pref in preferences:
+            if not isinstance(pref, dict) or not pref.get('session_id'):
+                return {
+                    "success": False,
+                    "error": "Each preference needs a session_id"
+                }
+            changes[pref['session_id']] = pref.get('preference_type') or ''
         
-        # Update or create preference
-        try:
-            if existing_pref:
-                existing_pref.preference_type = preference_type
-                frappe.log_error(f"Updated existing preference for session {session_id} to {preference_type}", "Attendee API Debug")
-            else:
-                new_pref = attendee.append("preferences", {
-                    "session": session_id,
-                    "preference_type": preference_type
-                })
-                frappe.log_error(f"Created new preference for session {session_id} with type {preference_type}", "Attendee API Debug")
-        except Exception as e:
-            frappe.log_error(f"Error updating preference data: {str(e)}", "Attendee API")
+        # Always the caller's own attendee; an email in the request is ignored
+        attendee_id, error = _get_or_create_attendee(frappe.session.user)
+        if error:
             return {
                 "success": False,
-                "error": "Failed to update preference data"
+                "error": error
             }
         
-        # Save with comprehensive error handling
         try:
-            # Force reload to ensure we have latest data
-            attendee.reload()
-            attendee.save(ignore_permissions=True)
+            summary = upsert_preferences(attendee_id, changes)
             frappe.db.commit()
-            
-            # Double-check by reloading from database
-            attendee.reload()
-            preference_saved = False
-            saved_preference_type = None
-            
-            for pref in attendee.preferences:
-                if getattr(pref, 'session', None) == session_id:
-                    preference_saved = True
-                    saved_preference_type = getattr(pref, 'preference_type', None)
-                    break
-            
-            if not preference_saved:
-                frappe.log_error(f"Preference not found after save for session {session_id}", "Attendee API")
-                return {
-                    "success": False,
-                    "error": "Preference was not saved properly"
-                }
-                
-        except frappe.ValidationError as ve:
-            frappe.log_error(f"Validation error saving preferences: {str(ve)}", "Attendee API")
+        except ValidationError as ve:
             frappe.db.rollback()
             return {
                 "success": False,
-                "error": f"Validation failed: {str(ve)}"
+                "error": str(ve)
             }
         except Exception as save_error:
             frappe.log_error(f"Error saving attendee preferences: {str(save_error)}", "Attendee API")
@@ -285,19 +198,91 @@ def update_preferences():
                 "error": "Failed to save preferences"
             }
         
+        summary["attendee_id"] = attendee_id
         return {
             "success": True,
             "message": "Preferences updated successfully",
-            "data": {
-                "session_id": session_id,
-                "preference_type": saved_preference_type or preference_type,
-                "session_name": getattr(session_doc, 'session_name', ''),
-                "attendee_id": attendee.name
-            }
+            "data": summary
         }
     except Exception as e:
-        frappe.log_error(f"Unexpected error in update_preferences: {str(e)}", "Attendee API")
+        frappe.log_error(f"Unexpected error in update_preferences_batch: {str(e)}", "Attendee API")
         return {
             "success": False,
             "error": "An unexpected error occurred while updating preferences"
-        }
\ No newline at end of file
+        }
+
+@frappe.whitelist()
+@log_api_call
+@handle_api_error
+def get_portal_state():
+    """Profile, preferences, registrations and recommendations for the current user in one call
+
+    fields: optional comma-separated or JSON list mask, any of profile, preferences,
+    registrations and recommendations (default all)
+    """
+    try:
+        if frappe.session.user == 'Guest':
+            return {
+                "success": False,
+                "error": "Authentication required"
+            }
+        
+        fields = frappe.form_dict.get('fields') or list(PORTAL_STATE_FIELDS)
+        if isinstance(fields, str):
+            fields = frappe.parse_json(fields) if fields.startswith('[') else fields.split(',')
+        fields = [field.strip() for field in fields if field.strip()]
+        
+        unknown = [field for field in fields if field not in PORTAL_STATE_FIELDS]
+        if unknown:
+            return {
+                "success": False,
+                "error": f"Unknown fields: {', '.join(unknown)}. Must be any of: {', '.join(PORTAL_STATE_FIELDS)}"
+            }
+        
+        attendee_id = resolve_attendee()
+        state = get_portal_state_for(attendee_id, fields) if attendee_id else None
+        if not state:
+            return {
+                "success": True,
+                "data": {
+                    "attendee": None,
+                    **{field: [] for field in fields if field != "profile"}
+                },
+                "message": "No attendee profile found. Please register for a session first."
+            }
+        
+        return {
+            "success": True,
+            "data": state
+        }
+    except Exception as e:
+        frappe.log_error(f"Unexpected error in get_portal_state: {str(e)}", "Attendee API")
+        return {
+            "success": False,
+            "error": "An unexpected error occurred while fetching portal state"
+        }
+
+def _get_or_create_attendee(email):
+    """Return (attendee_id, error) for the email, creating the attendee on first use"""
+    if email == 'Guest':
+        return None, "Authentication required"
+    
+    # Validate email format (skip for system users)
+    if email != 'Administrator' and (not email or "@" not in email):
+        return None, "Invalid email format"
+    
+    try:
+        attendee_id = resolve_attendee(email)
+        if attendee_id:
+            return attendee_id, None
+        
+        email = get_attendee_email(email)
+        attendee = frappe.new_doc("Attendee")
+        attendee.attendee_name = frappe.session.user_fullname or email.split('@')[0]
+        attendee.email = email
+        attendee.insert(ignore_permissions=True)
+        frappe.db.commit()
+        return attendee.name, None
+    except Exception as e:
+        frappe.log_error(f"Error fetching or creating attendee: {str(e)}", "Attendee API")
+        return None, "Failed to fetch attendee profile"
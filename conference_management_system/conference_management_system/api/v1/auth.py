@@ -1,6 +1,36 @@
 import frappe
 from conference_management_system.conference_management_system.utils.api_logger import log_api_call
 from conference_management_system.conference_management_system.utils.error_handler import handle_api_error
+from conference_management_system.conference_management_system.utils.identity import ADMIN_ROLES, get_identity
+
+@frappe.whitelist(allow_guest=True)
+@handle_api_error
+def whoami():
+    """Who the caller is: roles, attendee mapping and session state
+
+    Answers from session data and the cached identity without writing an API Log,
+    so it is cheap enough to call on every navigation
+    """
+    user = frappe.session.user or "Guest"
+    is_guest = user == "Guest"
+    identity = get_identity(user)
+    roles = identity["roles"]
+    
+    return {
+        "success": True,
+        "data": {
+            "user": user,
+            "is_guest": is_guest,
+            "authenticated": not is_guest,
+            "user_fullname": "" if is_guest else (frappe.session.data.get("full_name") or frappe.session.get("user_fullname") or ""),
+            "roles": roles,
+            "has_attendee_role": "Attendee" in roles,
+            "is_admin": any(role in roles for role in ADMIN_ROLES),
+            "attendee_id": identity["attendee_id"],
+            "email_verified": identity["email_verified"],
+            "session_valid": True
+        }
+    }
 
 @frappe.whitelist()
 @log_api_call
@@ -23,9 +53,7 @@ def get_user_info():
         roles = []
         if not is_guest:
             try:
-                roles = frappe.get_roles(user)
-                if not roles:
-                    roles = []
+                roles = get_identity(user)["roles"]
             except Exception as role_error:
                 frappe.log_error(f"Error fetching user roles: {str(role_error)}", "Auth API")
                 roles = []
@@ -83,18 +111,8 @@ def check_session():
         
         is_authenticated = user != "Guest"
         
-        # Additional session validation
+        # Deleting or disabling a user ends their sessions, so an authenticated session implies the user exists
         session_valid = True
-        try:
-            if is_authenticated:
-                # Verify user still exists
-                frappe.get_doc("User", user)
-        except frappe.DoesNotExistError:
-            session_valid = False
-            is_authenticated = False
-        except Exception as validation_error:
-            frappe.log_error(f"Session validation error: {str(validation_error)}", "Auth API")
-            session_valid = False
         
         return {
             "success": True,
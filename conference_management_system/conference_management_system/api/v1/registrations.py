@@ -1,8 +1,11 @@
 import frappe
 import uuid
 from conference_management_system.conference_management_system.utils.api_logger import log_api_call
+from conference_management_system.conference_management_system.utils.attendee_profile import get_attendee_profile
+from conference_management_system.conference_management_system.utils.doc_cache import get_cached_doc
+from conference_management_system.conference_management_system.utils.identity import ADMIN_ROLES, get_attendee_email, get_identity, resolve_attendee
 from conference_management_system.conference_management_system.utils.payment_processor import PaymentProcessor
-from conference_management_system.conference_management_system.utils.email_service import send_registration_confirmation, send_payment_confirmation
+from conference_management_system.conference_management_system.utils.portal_state import recommend_sessions, get_attendee_registrations as get_portal_registrations
 
 @frappe.whitelist()
 @log_api_call
@@ -22,28 +25,25 @@ def register_for_session():
         if email and email not in ['Administrator', 'Guest'] and '@' not in email:
             frappe.throw("Please enter a valid email address")
         
-        # Handle special cases for Administrator
-        if email == 'Administrator':
-            email = 'admin@system.local'
-        elif email == 'Guest':
+        if email == 'Guest':
             frappe.throw("Guest users cannot register for sessions")
         
         # Get or create attendee
-        existing_attendee = frappe.get_value("Attendee", {"email": email}, "name")
+        existing_attendee = resolve_attendee(email)
         
         if existing_attendee:
-            attendee = frappe.get_doc("Attendee", existing_attendee)
+            attendee = get_cached_doc("Attendee", existing_attendee)
         else:
             attendee = frappe.new_doc("Attendee")
             attendee.attendee_name = data.get('attendee_name')
-            attendee.email = email
+            attendee.email = get_attendee_email(email)
             attendee.insert(ignore_permissions=True)
         
         # Get session details
-        session_doc = frappe.get_doc("Session", data.get('session_id'))
+        session_doc = get_cached_doc("Session", data.get('session_id'))
         
         # Get conference details for amount
-        conference_doc = frappe.get_doc("Conference", session_doc.conference)
+        conference_doc = get_cached_doc("Conference", session_doc.conference)
         
         # Create registration
         registration = frappe.new_doc("Registration")
@@ -58,12 +58,10 @@ def register_for_session():
             "join_link": f"https://conference.local/join/{uuid.uuid4().hex[:12]}"
         })
         
+        # Registration.after_insert sends the confirmation email
         registration.insert()
         frappe.db.commit()
         
-        # Send registration confirmation email
-        send_registration_confirmation(registration)
-        
         return {
             "success": True,
             "data": {
@@ -94,18 +92,29 @@ def process_payment():
             if not data.get(field):
                 frappe.throw(f"Missing required field: {field}")
         
-        # Process payment using enhanced payment processor
-        payment_result = PaymentProcessor.process_payment(
+        # Attendees may only pay for their own registrations; foreign ones look missing
+        attendee = frappe.db.get_value("Registration", data.get('registration_id'), "attendee")
+        if not attendee or not _can_access_registration(attendee):
+            return {
+                "success": False,
+                "error": "Registration not found"
+            }
+        
+        # Retries carrying the same key replay the original result instead of charging again
+        idempotency_key = data.get('idempotency_key')
+        if not idempotency_key and frappe.request:
+            idempotency_key = frappe.request.headers.get('Idempotency-Key')
+        
+        # Async mode returns a Processing payment right away; the gateway outcome arrives via callback.
+        # The payment confirmation email is sent by Registration.on_update when the status becomes Paid
+        payment_result = PaymentProcessor.submit_payment(
             registration_id=data.get('registration_id'),
             payment_method=data.get('payment_method'),
-            payment_data=data
+            payment_data=data,
+            idempotency_key=idempotency_key,
+            async_payment=frappe.utils.cint(data.get('async_payment'))
         )
         
-        # Send payment confirmation email if successful
-        if payment_result.get('success'):
-            registration = frappe.get_doc("Registration", data.get('registration_id'))
-            send_payment_confirmation(registration)
-        
         return payment_result
             
     except Exception as e:
@@ -115,6 +124,48 @@ def process_payment():
             "error": str(e)
         }
 
+@frappe.whitelist()
+@log_api_call
+def get_payment_status():
+    """Get the latest payment state for a registration (polling fallback for async payments)"""
+    try:
+        registration_id = frappe.form_dict.get('registration_id')
+        if not registration_id:
+            frappe.throw("Registration ID parameter is required")
+        
+        registration = frappe.db.get_value("Registration", registration_id,
+            ["name", "attendee", "payment_status", "payment_details"], as_dict=True)
+        
+        # Attendees may only poll their own registrations; foreign ones look missing
+        if registration and not _can_access_registration(registration.attendee):
+            registration = None
+        
+        if not registration:
+            return {
+                "success": False,
+                "error": "Registration not found"
+            }
+        
+        payment = frappe.db.get_value("Mock Payment Details",
+            {"registration": registration_id},
+            ["name", "payment_status", "transaction_id", "failure_reason"],
+            as_dict=True, order_by="creation desc")
+        
+        return {
+            "success": True,
+            "data": {
+                "registration_id": registration.name,
+                "payment_status": registration.payment_status,
+                "payment": payment
+            }
+        }
+    except Exception as e:
+        frappe.log_error(f"Error fetching payment status: {e}")
+        return {
+            "success": False,
+            "error": str(e)
+        }
+
 @frappe.whitelist()
 @log_api_call
 def get_attendee_registrations():
@@ -122,16 +173,13 @@ def get_attendee_registrations():
     try:
         email = frappe.session.user
         
-        # Handle Administrator user
-        if email == 'Administrator':
-            email = 'admin@system.local'
-        elif email == 'Guest':
+        if email == 'Guest':
             return {
                 "success": False,
                 "error": "Guest users cannot access registrations"
             }
         
-        attendee = frappe.get_value("Attendee", {"email": email}, "name")
+        attendee = resolve_attendee(email)
         if not attendee:
             return {
                 "success": True,
@@ -139,27 +187,7 @@ def get_attendee_registrations():
                 "message": "No registrations found. Please register for sessions first."
             }
             
-        registrations = frappe.get_all("Registration",
-            filters={"attendee": attendee},
-            fields=["name", "registration_date", "payment_status", "invoice_id", "join_link", "amount", "conference", "session", "payment_details"],
-            order_by="registration_date DESC")
-        
-        # Get conference and session details with payment info
-        for reg in registrations:
-            conference = frappe.get_doc("Conference", reg.conference)
-            session = frappe.get_doc("Session", reg.session)
-            reg.conference_name = conference.conference_name
-            reg.session_name = session.session_name
-            reg.speaker = session.speaker
-            reg.start_time = str(session.start_time)
-            reg.end_time = str(session.end_time)
-            
-            # Add payment details if available
-            if reg.payment_details:
-                payment_details = frappe.get_doc("Mock Payment Details", reg.payment_details)
-                reg.payment_method = payment_details.payment_method
-                reg.transaction_id = payment_details.transaction_id
-                reg.processing_fee = payment_details.processing_fee
+        registrations = get_portal_registrations(attendee)
         
         return {
             "success": True,
@@ -182,50 +210,12 @@ def get_recommendations():
         if not attendee_id:
             frappe.throw("Attendee ID parameter is required")
         
-        # Get attendee preferences and past registrations
-        attendee = frappe.get_doc("Attendee", attendee_id)
-        
-        # Get sessions from preferred topics/speakers
-        preferred_sessions = []
-        if attendee.preferences:
-            for pref in attendee.preferences:
-                if pref.session:
-                    session_doc = frappe.get_doc("Session", pref.session)
-                    # Find similar sessions by speaker or keywords
-                    similar_sessions = frappe.db.sql("""
-                        SELECT DISTINCT s.name, s.session_name, s.speaker, s.start_time, s.end_time, s.conference
-                        FROM `tabSession` s
-                        JOIN `tabConference` c ON s.conference = c.name
-                        WHERE (s.speaker = %s OR s.session_name LIKE %s OR s.description LIKE %s)
-                        AND c.status IN ('Upcoming', 'Ongoing')
-                        AND s.session_date >= CURDATE()
-                        LIMIT 3
-                    """, (session_doc.speaker, f"%{session_doc.session_name.split()[0]}%", f"%{session_doc.session_name.split()[0]}%"), as_dict=True)
-                    preferred_sessions.extend(similar_sessions)
-        
-        # Get popular upcoming sessions if no preferences
-        if not preferred_sessions:
-            preferred_sessions = frappe.db.sql("""
-                SELECT s.name, s.session_name, s.speaker, s.start_time, s.end_time, s.conference,
-                       COUNT(r.name) as registration_count
-                FROM `tabSession` s
-                JOIN `tabConference` c ON s.conference = c.name
-                LEFT JOIN `tabRegistration` r ON s.name = r.session
-                WHERE c.status IN ('Upcoming', 'Ongoing')
-                AND s.session_date >= CURDATE()
-                GROUP BY s.name
-                ORDER BY registration_count DESC
-                LIMIT 5
-            """, as_dict=True)
-        
-        recommendations = preferred_sessions[:5]
-        
-        # Add availability info
-        for rec in recommendations:
-            session_doc = frappe.get_doc("Session", rec['name'])
-            registered_count = frappe.db.count("Registration", {"session": rec['name']})
-            rec['available_spots'] = session_doc.max_attendees - registered_count
-            rec['max_attendees'] = session_doc.max_attendees
+        # Preferences come from the cached profile, which carries session names and speakers
+        profile = get_attendee_profile(attendee_id)
+        if not profile:
+            frappe.throw(f"Attendee {attendee_id} not found", frappe.DoesNotExistError)
+        
+        recommendations = recommend_sessions(profile["preferences"])
         
         return {
             "success": True,
@@ -239,5 +229,7 @@ def get_recommendations():
             "error": str(e)
         }
 
-
-
+def _can_access_registration(attendee):
+    """Admins reach every registration, attendees only their own"""
+    identity = get_identity()
+    return any(role in identity["roles"] for role in ADMIN_ROLES) or attendee == identity["attendee_id"]
@@ -1,9 +1,16 @@
 import frappe
 from conference_management_system.conference_management_system.utils.api_logger import log_api_call
+from conference_management_system.conference_management_system.utils.http_cache import catalog_response, make_snapshot, not_found_response
+from conference_management_system.conference_management_system.utils.identity import resolve_attendee
+from conference_management_system.conference_management_system.utils.session_catalog import get_catalog_snapshot, get_catalog_state, get_conference_sessions, get_registered_session_ids
 
+# Seconds a browser or reverse proxy may reuse a public response without revalidating
+CATALOG_MAX_AGE = 30
+AVAILABILITY_MAX_AGE = 5
 
 
-@frappe.whitelist()
+
+@frappe.whitelist(allow_guest=True)
 @log_api_call
 def get_sessions_by_conference():
     """Get all sessions for a specific conference"""
@@ -12,70 +19,87 @@ def get_sessions_by_conference():
         if not conference_id:
             frappe.throw("Conference ID parameter is required")
         
-        # Validate conference exists
-        if not frappe.db.exists("Conference", conference_id):
-            return {
-                "success": False,
-                "error": "Conference not found"
-            }
-        
-        sessions = frappe.get_all("Session",
-            filters={"conference": conference_id},
-            fields=["name", "session_name", "speaker", "session_date", "start_time", "end_time", "max_attendees", "description"],
-            order_by="session_date ASC, start_time ASC")
-        
-        # Get current user's attendee record
-        current_user_email = frappe.session.user
-        attendee_id = None
-        if current_user_email and current_user_email != "Guest":
-            try:
-                # Handle Administrator user
-                if current_user_email == 'Administrator':
-                    current_user_email = 'admin@system.local'
-                attendee_id = frappe.get_value("Attendee", {"email": current_user_email}, "name")
-            except Exception:
-                pass
-        
-        # Add registration info
-        for session in sessions:
-            try:
-                # Convert time fields to strings
-                if session.get('start_time'):
-                    session['start_time'] = str(session['start_time'])
-                if session.get('end_time'):
-                    session['end_time'] = str(session['end_time'])
-                if session.get('session_date'):
-                    session['session_date'] = str(session['session_date'])
-                
-                # Ensure required fields
-                session['session_name'] = session.get('session_name', '')
-                session['speaker'] = session.get('speaker', '')
-                session['max_attendees'] = int(session.get('max_attendees', 0) or 0)
-                
-                session['registered_count'] = frappe.db.count("Registration", {"session": session['name']})
-                session['available_spots'] = max(0, session['max_attendees'] - session['registered_count'])
-                
-                # Check if current user is already registered
-                session['user_registered'] = False
-                if attendee_id:
-                    try:
-                        existing_reg = frappe.db.get_value("Registration", 
-                            {"session": session['name'], "attendee": attendee_id}, "name")
-                        session['user_registered'] = bool(existing_reg)
-                    except Exception:
-                        pass
-            except Exception as session_error:
-                frappe.log_error(f"Error processing session {session.get('name', 'unknown')}: {str(session_error)}", "Sessions API")
-                continue
+        # Guests all see the same listing, so serve the shared versioned snapshot
+        if frappe.session.user == "Guest":
+            snapshot = get_catalog_snapshot(f"sessions:{conference_id}", _sessions_payload, conference_id)
+            if not snapshot:
+                return not_found_response("Conference not found")
+            return catalog_response(snapshot, CATALOG_MAX_AGE)
         
+        # Signed-in users get their registrations folded in, revalidated on every request
+        payload = _sessions_payload(conference_id, _get_current_attendee())
+        if not payload["success"]:
+            return not_found_response(payload["error"])
+        return catalog_response(make_snapshot(payload, get_catalog_state()["modified"]), 0, public=False)
+    except Exception as e:
+        frappe.log_error(f"Error fetching sessions: {e}")
         return {
-            "success": True,
-            "data": sessions,
-            "message": f"Found {len(sessions)} sessions"
+            "success": False,
+            "error": str(e)
         }
+
+@frappe.whitelist(allow_guest=True)
+@log_api_call
+def get_session_availability():
+    """Get registered counts and remaining spots for each session of a conference"""
+    try:
+        conference_id = frappe.form_dict.get('conference_id')
+        if not conference_id:
+            frappe.throw("Conference ID parameter is required")
+        
+        snapshot = get_catalog_snapshot(f"availability:{conference_id}", _availability_payload, conference_id)
+        if not snapshot:
+            return not_found_response("Conference not found")
+        return catalog_response(snapshot, AVAILABILITY_MAX_AGE)
     except Exception as e:
-        frappe.log_error(f"Error fetching sessions: {e}")
+        frappe.log_error(f"Error fetching session availability: {e}")
         return {
             "success": False,
             "error": str(e)
-        }
\ No newline at end of file
+        }
+
+def _sessions_payload(conference_id, attendee_id=None):
+    # Shared part: sessions with registration counts, cached per conference
+    sessions = get_conference_sessions(conference_id)
+    if sessions is None:
+        return {
+            "success": False,
+            "error": "Conference not found"
+        }
+    
+    # User-specific part: one query for this attendee's registrations
+    registered = get_registered_session_ids(attendee_id, [session['name'] for session in sessions])
+    for session in sessions:
+        session['user_registered'] = session['name'] in registered
+    
+    return {
+        "success": True,
+        "data": sessions,
+        "message": f"Found {len(sessions)} sessions"
+    }
+
+def _availability_payload(conference_id):
+    sessions = get_conference_sessions(conference_id)
+    if sessions is None:
+        return {
+            "success": False,
+            "error": "Conference not found"
+        }
+    
+    return {
+        "success": True,
+        "data": {
+            session['name']: {
+                "registered_count": session['registered_count'],
+                "available_spots": session['available_spots']
+            }
+            for session in sessions
+        }
+    }
+
+def _get_current_attendee():
+    """Attendee record of the signed-in user, if any"""
+    try:
+        return resolve_attendee(frappe.session.user)
+    except Exception:
+        return None
\ No newline at end of file
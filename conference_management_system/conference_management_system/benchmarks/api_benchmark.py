@@ -0,0 +1,161 @@
+import importlib
+import inspect
+import json
+import uuid
+
+import frappe
+
+from conference_management_system.conference_management_system.benchmarks.metrics import (
+    call_endpoint,
+    ensure_benchmark_site,
+    measure,
+    measure_peak_memory,
+    summarize,
+    write_report,
+)
+from conference_management_system.conference_management_system.utils.test_data_generator import (
+    create_bulk_sample_data,
+)
+
+API_PACKAGE = "conference_management_system.conference_management_system.api.v1"
+API_MODULES = ("admin", "attendees", "auth", "conferences", "registrations", "sessions")
+
+# Who calls each endpoint and with which form_dict; builders get the fixture and the iteration
+# number so writes never collide. "attendee" is the fixture attendee's user
+BENCHMARK_CASES = {
+    "admin.get_user_roles": ("Administrator", lambda f, i: {}),
+    "admin.get_dashboard_stats": ("Administrator", lambda f, i: {}),
+    "admin.get_recent_registrations": ("Administrator", lambda f, i: {}),
+    "admin.get_revenue_summary": ("Administrator", lambda f, i: {}),
+    "admin.get_dashboard_batch": ("Administrator", lambda f, i: {}),
+    "admin.process_pending_payments": ("Administrator", lambda f, i: {
+        "registration_ids": json.dumps(f.take_pending(10)), "payment_method": "UPI"}),
+    "admin.get_cache_stats": ("Administrator", lambda f, i: {}),
+    "attendees.get_attendee_profile": ("attendee", lambda f, i: {"email": f.email}),
+    "attendees.update_preferences": ("attendee", lambda f, i: {
+        "email": f.email, "session_id": f.sessions[i % len(f.sessions)], "preference_type": "Interested"}),
+    "attendees.update_preferences_batch": ("attendee", lambda f, i: {
+        "preferences": json.dumps([{"session_id": session, "preference_type": "Wishlist" if i % 2 else "Interested"}
+                                   for session in f.sessions[:5]])}),
+    "attendees.get_portal_state": ("attendee", lambda f, i: {}),
+    "auth.whoami": ("attendee", lambda f, i: {}),
+    "auth.get_user_info": ("attendee", lambda f, i: {}),
+    "auth.check_session": ("attendee", lambda f, i: {}),
+    "conferences.get_upcoming_conferences": ("Guest", lambda f, i: {}),
+    "registrations.register_for_session": ("Administrator", lambda f, i: {
+        "session_id": f.sessions[i % len(f.sessions)], "attendee_name": "Benchmark Attendee",
+        "email": f"bench-{uuid.uuid4().hex[:10]}@example.com"}),
+    "registrations.process_payment": ("Administrator", lambda f, i: {
+        "registration_id": f.take_pending(1)[0], "payment_method": "Credit Card"}),
+    "registrations.get_payment_status": ("Administrator", lambda f, i: {"registration_id": f.registration}),
+    "registrations.get_attendee_registrations": ("attendee", lambda f, i: {}),
+    "registrations.get_recommendations": ("attendee", lambda f, i: {"attendee_id": f.attendee}),
+    "sessions.get_sessions_by_conference": ("Guest", lambda f, i: {"conference_id": f.conference}),
+    "sessions.get_session_availability": ("Guest", lambda f, i: {"conference_id": f.conference})
+}
+
+
+class Fixture:
+    """Records from the seeded dataset that benchmark cases point at"""
+
+    def __init__(self):
+        self.conference = frappe.db.sql("""
+            SELECT conference FROM `tabSession`
+            GROUP BY conference
+            ORDER BY COUNT(*) DESC
+            LIMIT 1
+        """)[0][0]
+        # Sessions with the most room left, so registrations keep succeeding
+        self.sessions = [row[0] for row in frappe.db.sql("""
+            SELECT s.name FROM `tabSession` s
+            LEFT JOIN `tabRegistration` r ON r.session = s.name
+            GROUP BY s.name
+            ORDER BY s.max_attendees - COUNT(r.name) DESC
+            LIMIT 50
+        """)]
+        attendee = frappe.db.sql("""
+            SELECT a.name, a.email FROM `tabAttendee` a
+            JOIN `tabRegistration` r ON r.attendee = a.name
+            GROUP BY a.name
+            ORDER BY COUNT(*) DESC
+            LIMIT 1
+        """)[0]
+        self.attendee, self.email = attendee
+        self.registration = frappe.db.get_value("Registration", {"attendee": self.attendee}, "name")
+        self._pending = frappe.get_all("Registration",
+            filters={"payment_status": "Pending"}, pluck="name", limit=2000)
+
+    def take_pending(self, count):
+        """Pending registrations not handed out before"""
+        if len(self._pending) < count:
+            frappe.throw("Not enough pending registrations left; seed a larger scale or use fewer iterations")
+        taken, self._pending = self._pending[:count], self._pending[count:]
+        return taken
+
+
+def run_api_benchmarks(scale="small", iterations=20, seed=42, seed_data=True, endpoints=None, output=None):
+    """Benchmark every whitelisted api/v1 endpoint and write the results as JSON
+
+    Only runs on sites with allow_benchmarks set in site_config.json, because seeding
+    wipes the conference data. Run with
+    bench --site <site> execute <module>.run_api_benchmarks --kwargs "{'scale': '10k'}"
+    """
+    ensure_benchmark_site()
+
+    if seed_data:
+        create_bulk_sample_data(scale, seed)
+
+    fixture = Fixture()
+    _ensure_user(fixture.email)
+
+    results = {}
+    for name, function in _discover_endpoints():
+        if endpoints and name not in endpoints:
+            continue
+        if name not in BENCHMARK_CASES:
+            results[name] = {"skipped": "no benchmark case"}
+            continue
+
+        user, build_args = BENCHMARK_CASES[name]
+        user = fixture.email if user == "attendee" else user
+        try:
+            # First call warms caches and is not recorded
+            call_endpoint(function, user, build_args(fixture, 0))
+            measurements = []
+            for i in range(1, iterations + 1):
+                form_dict = build_args(fixture, i)
+                with measure() as measurement:
+                    call_endpoint(function, user, form_dict)
+                measurements.append(measurement)
+            results[name] = summarize(measurements)
+            results[name]["peak_memory_kb"] = measure_peak_memory(
+                call_endpoint, function, user, build_args(fixture, iterations + 1))
+        except Exception as e:
+            frappe.db.rollback()
+            results[name] = {"error": str(e)}
+        print(f"{name}: {results[name]}")
+
+    frappe.set_user("Administrator")
+    meta = {"scale": scale, "iterations": iterations, "seed": seed}
+    return write_report("api", scale, meta, results, output)
+
+def _discover_endpoints():
+    """(module.function, function) for every whitelisted function in api/v1"""
+    whitelisted = set(frappe.whitelisted) | set(frappe.guest_methods)
+    for module_name in API_MODULES:
+        module = importlib.import_module(f"{API_PACKAGE}.{module_name}")
+        for name, function in inspect.getmembers(module, inspect.isfunction):
+            if function in whitelisted and function.__module__ == module.__name__:
+                yield f"{module_name}.{name}", function
+
+def _ensure_user(email):
+    """Website user for the fixture attendee, so attendee endpoints run their signed-in paths"""
+    if frappe.db.exists("User", email):
+        return
+    user = frappe.new_doc("User")
+    user.email = email
+    user.first_name = "Benchmark"
+    user.send_welcome_email = 0
+    user.insert(ignore_permissions=True)
+    user.add_roles("Attendee")
+    frappe.db.commit()
@@ -0,0 +1,84 @@
+"""Compare two benchmark result files and flag regressions
+
+Plain Python with no Frappe import, so results from two commits can be diffed anywhere:
+python -m conference_management_system.conference_management_system.benchmarks.compare base.json new.json
+"""
+import argparse
+import json
+import sys
+
+# metric -> absolute change below which a difference is treated as noise
+COMPARED_METRICS = {
+    "wall_ms_median": 1.0,
+    "queries": 0,
+    "rows_read": 0,
+    "peak_memory_kb": 16.0
+}
+
+DEFAULT_THRESHOLD = 0.10
+
+
+def compare_results(baseline, current, threshold=DEFAULT_THRESHOLD):
+    """Regressions and improvements between two result files (paths or loaded dicts)
+
+    A metric regresses when it grows by more than threshold (a fraction of the
+    baseline) and by more than its noise floor
+    """
+    baseline, current = _load(baseline), _load(current)
+    comparison = {"regressions": [], "improvements": [], "missing": []}
+
+    for endpoint, before in sorted(baseline["results"].items()):
+        after = current["results"].get(endpoint)
+        if not after or "error" in after or "skipped" in after:
+            if "error" not in before and "skipped" not in before:
+                comparison["missing"].append(endpoint)
+            continue
+
+        for metric, noise in COMPARED_METRICS.items():
+            old, new = before.get(metric), after.get(metric)
+            if old is None or new is None:
+                continue
+            change = new - old
+            if abs(change) <= noise or abs(change) <= threshold * old:
+                continue
+            comparison["regressions" if change > 0 else "improvements"].append({
+                "endpoint": endpoint,
+                "metric": metric,
+                "baseline": old,
+                "current": new,
+                "change": round(change / old, 3) if old else None
+            })
+
+    return comparison
+
+def format_comparison(comparison):
+    lines = []
+    for kind in ("regressions", "improvements"):
+        lines.append(f"{kind.title()}: {len(comparison[kind])}")
+        for item in comparison[kind]:
+            change = f"{item['change']:+.1%}" if item["change"] is not None else "new"
+            lines.append(f"  {item['endpoint']:<45} {item['metric']:<16} {item['baseline']} -> {item['current']} ({change})")
+    if comparison["missing"]:
+        lines.append(f"Missing or failing in current run: {', '.join(comparison['missing'])}")
+    return "\n".join(lines)
+
+def _load(results):
+    if isinstance(results, dict):
+        return results
+    with open(results) as f:
+        return json.load(f)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files")
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed growth as a fraction of the baseline (default 0.10)")
+    args = parser.parse_args(argv)
+
+    comparison = compare_results(args.baseline, args.current, args.threshold)
+    print(format_comparison(comparison))
+    return 1 if comparison["regressions"] or comparison["missing"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
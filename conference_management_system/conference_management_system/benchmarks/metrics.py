@@ -0,0 +1,136 @@
+import json
+import os
+import subprocess
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+
+import frappe
+
+
+def ensure_benchmark_site():
+    """Refuse to run destructive benchmarks outside a throwaway site"""
+    if not frappe.conf.allow_benchmarks:
+        frappe.throw("Benchmarks wipe or add conference data; set allow_benchmarks in site_config.json of a throwaway site")
+
+
+class Measurement(dict):
+    """Wall time, query count, rows read and (when traced) peak Python memory for one measured block"""
+
+@contextmanager
+def measure(trace_memory=False):
+    """Measure the enclosed block; the Measurement is filled in when the block exits
+
+    Rows read is the change in the server's Handler_read counters for this connection
+    (MariaDB/MySQL), so it counts rows the engine touched, not rows returned.
+    trace_memory records peak Python memory with tracemalloc, which slows every
+    allocation, so timed runs leave it off and measure_peak_memory traces separately
+    """
+    measurement = Measurement()
+    original_sql = frappe.db.sql
+    queries = [0]
+
+    def counting_sql(*args, **kwargs):
+        queries[0] += 1
+        return original_sql(*args, **kwargs)
+
+    rows_before = _rows_read(original_sql)
+    tracing = tracemalloc.is_tracing()
+    if trace_memory:
+        if not tracing:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+    frappe.db.sql = counting_sql
+    started = time.perf_counter()
+    try:
+        yield measurement
+    finally:
+        wall_ms = (time.perf_counter() - started) * 1000
+        frappe.db.sql = original_sql
+        peak = tracemalloc.get_traced_memory()[1] if trace_memory else None
+        if trace_memory and not tracing:
+            tracemalloc.stop()
+        rows_after = _rows_read(original_sql)
+        measurement.update({
+            "wall_ms": round(wall_ms, 3),
+            "queries": queries[0],
+            "rows_read": rows_after - rows_before if rows_before is not None and rows_after is not None else None,
+            "peak_memory_kb": round(peak / 1024, 1) if peak is not None else None
+        })
+
+def measure_peak_memory(function, *args):
+    """Peak Python memory in KB of one extra call, traced apart from the timed runs"""
+    with measure(trace_memory=True) as measurement:
+        function(*args)
+    return measurement["peak_memory_kb"]
+
+def summarize(measurements):
+    """Median and p95 wall time plus the worst query, row and memory figures of a run"""
+    walls = sorted(m["wall_ms"] for m in measurements)
+    rows = [m["rows_read"] for m in measurements if m["rows_read"] is not None]
+    memory = [m["peak_memory_kb"] for m in measurements if m["peak_memory_kb"] is not None]
+    return {
+        "iterations": len(measurements),
+        "wall_ms_median": round(walls[len(walls) // 2], 3),
+        "wall_ms_p95": round(walls[min(len(walls) - 1, int(len(walls) * 0.95))], 3),
+        "queries": max(m["queries"] for m in measurements),
+        "rows_read": max(rows) if rows else None,
+        "peak_memory_kb": max(memory) if memory else None
+    }
+
+def percentiles(values):
+    """p50, p95, p99 and max of a list of latencies"""
+    if not values:
+        return {}
+    values = sorted(values)
+
+    def pick(q):
+        return values[min(len(values) - 1, int(len(values) * q))]
+
+    return {"p50": pick(0.50), "p95": pick(0.95), "p99": pick(0.99), "max": values[-1]}
+
+def call_endpoint(function, user, form_dict):
+    """Call an endpoint the way a fresh request would: new form_dict, no request-local caches"""
+    frappe.set_user(user)
+    for attr in ("cms_doc_cache", "cms_attendee_for"):
+        if hasattr(frappe.local, attr):
+            delattr(frappe.local, attr)
+    frappe.local.form_dict = frappe._dict(form_dict)
+    frappe.local.response = frappe._dict({"docs": []})
+    try:
+        return function()
+    finally:
+        # The request handler commits after the endpoint returns, whatever it reported
+        frappe.db.commit()
+
+def write_report(kind, label, meta, results, output=None):
+    """Write results with run metadata to sites/<site>/benchmarks and return the path"""
+    report = {
+        "meta": dict(meta, commit=git_commit(), site=frappe.local.site,
+                     created=datetime.now().isoformat(timespec="seconds")),
+        "results": results
+    }
+    output = output or frappe.get_site_path("benchmarks", f"{kind}-{label}-{report['meta']['commit'] or 'local'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=1, sort_keys=True, default=str)
+    print(f"\nResults written to {output}")
+    return output
+
+def git_commit():
+    """Short commit hash of the app checkout, or None outside a git tree"""
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"],
+            cwd=frappe.get_app_path("conference_management_system"), text=True,
+            stderr=subprocess.DEVNULL).strip()
+    except Exception:
+        return None
+
+def _rows_read(sql):
+    if (frappe.conf.db_type or "mariadb") != "mariadb":
+        return None
+    try:
+        return sum(int(value) for _, value in sql("SHOW SESSION STATUS LIKE 'Handler_read%'"))
+    except Exception:
+        return None
@@ -0,0 +1,284 @@
+import multiprocessing
+import queue
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import timedelta
+
+import frappe
+
+from conference_management_system.conference_management_system.benchmarks.metrics import (
+    call_endpoint,
+    ensure_benchmark_site,
+    percentiles,
+    write_report,
+)
+from conference_management_system.conference_management_system.utils.test_data_generator import bulk_write
+
+SCENARIOS = ("capacity", "overlap", "duplicate_email")
+
+# Capacity scenario: every round targets a fresh session with only a few seats left
+CAPACITY_SESSION_SIZE = 20
+CAPACITY_SEATS_LEFT = 2
+
+BARRIER_TIMEOUT = 60
+
+
+def run_registration_load(workers=8, rounds=25, scenarios=None, output=None):
+    """Fire concurrent register_for_session calls and check the registration invariants
+
+    Each round starts all workers together on one contended target:
+    - capacity: workers new attendees race for the last seats of a nearly full session
+    - overlap: one attendee registers for two overlapping sessions from every worker
+    - duplicate_email: every worker registers the same new email at once
+    Afterwards the run's data is checked for overbooked sessions, overlapping
+    registrations and duplicate attendees. Only runs on sites with allow_benchmarks
+    set; it adds data but deletes nothing.
+    """
+    ensure_benchmark_site()
+    scenarios = scenarios or list(SCENARIOS)
+    unknown = [scenario for scenario in scenarios if scenario not in SCENARIOS]
+    if unknown:
+        frappe.throw(f"Unknown scenarios: {', '.join(unknown)}. Must be any of: {', '.join(SCENARIOS)}")
+
+    run_id = uuid.uuid4().hex[:6]
+    plan = _prepare(run_id, workers, rounds, scenarios)
+    print(f"Load run {run_id}: {workers} workers x {len(plan['rounds'])} rounds")
+
+    context = multiprocessing.get_context("spawn")
+    barrier = context.Barrier(workers)
+    results = context.Queue()
+    processes = [
+        context.Process(target=_worker, args=(
+            frappe.local.site, frappe.local.sites_path,
+            [round_tasks[worker] for round_tasks in plan["rounds"]], barrier, results))
+        for worker in range(workers)
+    ]
+
+    started = time.perf_counter()
+    for process in processes:
+        process.start()
+
+    records = []
+    for _ in processes:
+        try:
+            records.extend(results.get(timeout=BARRIER_TIMEOUT * (len(plan["rounds"]) + 1)))
+        except queue.Empty:
+            break
+    for process in processes:
+        process.join(timeout=BARRIER_TIMEOUT)
+    wall_seconds = time.perf_counter() - started
+
+    violations = _check_invariants(run_id, plan["conferences"])
+    report = _summarize(records, wall_seconds, violations)
+    report.update({"workers": workers, "rounds": rounds, "scenarios": scenarios, "run_id": run_id})
+
+    print(f"{report['requests']} requests in {report['wall_seconds']}s ({report['throughput_rps']} req/s), "
+          f"latency {report['latency_ms']}")
+    for scenario, summary in report["by_scenario"].items():
+        print(f"  {scenario}: {summary['outcomes']}")
+    print(f"Invariants {'held' if report['passed'] else 'VIOLATED'}: "
+          f"{ {kind: len(rows) for kind, rows in violations.items()} }")
+
+    meta = {"workers": workers, "rounds": rounds, "scenarios": scenarios}
+    return write_report("registration-load", f"{workers}w", meta, report, output)
+
+def _prepare(run_id, workers, rounds, scenarios):
+    """Create one conference per scenario and the per-round tasks, one per worker
+
+    Fixtures are bulk inserted, which also lets the overlap scenario hold two
+    sessions that Session validation would refuse to schedule side by side
+    """
+    day = frappe.utils.getdate(frappe.utils.add_days(frappe.utils.nowdate(), 30))
+    conferences, sessions, attendees, registrations = [], [], [], []
+    plan = {"rounds": [], "conferences": []}
+
+    def conference(scenario, days=1):
+        name = f"LOAD-{run_id}-{scenario}"
+        conferences.append({
+            "name": name,
+            "conference_name": f"Load Test {run_id} {scenario}",
+            "start_date": day,
+            "end_date": day + timedelta(days=days - 1),
+            "location": "Load Test",
+            "status": "Upcoming",
+            "description": "Registration load test",
+            "registration_fee": 1000
+        })
+        plan["conferences"].append(name)
+        return name
+
+    def session(conf, label, start, end, capacity, offset=0):
+        name = f"SES-LOAD-{run_id}-{label}"
+        sessions.append({
+            "name": name,
+            "session_name": f"Load {label}",
+            "conference": conf,
+            "speaker": "Load Test",
+            "session_date": day + timedelta(days=offset),
+            "start_time": start,
+            "end_time": end,
+            "max_attendees": capacity,
+            "description": "Registration load test"
+        })
+        return name
+
+    def attendee(email):
+        name = f"ATT-LOAD-{run_id}-{len(attendees) + 1:06d}"
+        attendees.append({"name": name, "attendee_name": "Load Attendee", "email": email, "email_verified": 1})
+        return name
+
+    def task(scenario, session_id, email):
+        return {"scenario": scenario, "form_dict": {
+            "session_id": session_id, "attendee_name": "Load Attendee", "email": email}}
+
+    if "capacity" in scenarios:
+        conf = conference("capacity")
+        for r in range(rounds):
+            target = session(conf, f"cap-{r}", "09:00:00", "10:00:00", CAPACITY_SESSION_SIZE)
+            for k in range(CAPACITY_SESSION_SIZE - CAPACITY_SEATS_LEFT):
+                registrations.append({
+                    "name": f"REG-LOAD-{run_id}-{len(registrations) + 1:07d}",
+                    "conference": conf,
+                    "session": target,
+                    "attendee": attendee(f"load-{run_id}-fill-{r}-{k}@example.com"),
+                    "registration_date": frappe.utils.nowdate(),
+                    "payment_status": "Pending",
+                    "amount": 1000
+                })
+            plan["rounds"].append([task("capacity", target, f"load-{run_id}-cap-{r}-{w}@example.com")
+                                   for w in range(workers)])
+
+    if "overlap" in scenarios:
+        conf = conference("overlap")
+        first = session(conf, "ovl-a", "09:00:00", "10:00:00", 100000)
+        second = session(conf, "ovl-b", "09:30:00", "10:30:00", 100000)
+        for r in range(rounds):
+            email = f"load-{run_id}-ovl-{r}@example.com"
+            attendee(email)
+            plan["rounds"].append([task("overlap", first if w % 2 == 0 else second, email)
+                                   for w in range(workers)])
+
+    if "duplicate_email" in scenarios:
+        # One session per worker on separate days, so only attendee creation can collide
+        conf = conference("duplicate_email", days=workers)
+        targets = [session(conf, f"dup-{w}", "09:00:00", "10:00:00", 100000, offset=w) for w in range(workers)]
+        for r in range(rounds):
+            email = f"load-{run_id}-dup-{r}@example.com"
+            plan["rounds"].append([task("duplicate_email", targets[w], email) for w in range(workers)])
+
+    bulk_write("Conference", conferences)
+    bulk_write("Session", sessions)
+    bulk_write("Attendee", attendees)
+    bulk_write("Registration", registrations)
+    frappe.db.commit()
+    return plan
+
+def _worker(site, sites_path, tasks, barrier, results):
+    """Run one worker's share of every round, starting each round together with the others"""
+    frappe.init(site=site, sites_path=sites_path)
+    frappe.connect()
+    records = []
+    try:
+        from conference_management_system.conference_management_system.api.v1.registrations import (
+            register_for_session,
+        )
+
+        for task in tasks:
+            try:
+                barrier.wait(timeout=BARRIER_TIMEOUT)
+            except threading.BrokenBarrierError:
+                break
+
+            started = time.perf_counter()
+            try:
+                response = call_endpoint(register_for_session, "Administrator", task["form_dict"])
+                message = "" if response.get("success") else str(response.get("error", ""))
+                outcome = "ok" if response.get("success") else _classify(message)
+            except Exception as e:
+                frappe.db.rollback()
+                message = str(e)
+                outcome = _classify(message)
+
+            records.append({
+                "scenario": task["scenario"],
+                "outcome": outcome,
+                "latency_ms": round((time.perf_counter() - started) * 1000, 3),
+                "message": message[:200]
+            })
+    finally:
+        results.put(records)
+        frappe.destroy()
+
+def _classify(message):
+    """Bucket a failed registration by what stopped it"""
+    lowered = message.lower()
+    if "deadlock" in lowered:
+        return "deadlock"
+    if "lock wait timeout" in lowered:
+        return "lock_timeout"
+    if "capacity" in lowered:
+        return "rejected_capacity"
+    if "overlapping" in lowered:
+        return "rejected_overlap"
+    if "duplicate entry" in lowered or "already exists" in lowered:
+        return "rejected_duplicate"
+    return "error"
+
+def _check_invariants(run_id, conferences):
+    """Rows that break the registration rules within this run's conferences"""
+    conferences = tuple(conferences)
+    return {
+        "overbooked_sessions": frappe.db.sql("""
+            SELECT s.name AS session, s.max_attendees, COUNT(r.name) AS registered
+            FROM `tabSession` s
+            JOIN `tabRegistration` r ON r.session = s.name
+            WHERE s.conference IN %s
+            GROUP BY s.name, s.max_attendees
+            HAVING COUNT(r.name) > s.max_attendees
+        """, (conferences,), as_dict=True),
+        "overlapping_registrations": frappe.db.sql("""
+            SELECT r1.attendee, r1.name AS registration, r2.name AS other_registration
+            FROM `tabRegistration` r1
+            JOIN `tabRegistration` r2 ON r2.attendee = r1.attendee AND r1.name < r2.name
+            JOIN `tabSession` s1 ON s1.name = r1.session
+            JOIN `tabSession` s2 ON s2.name = r2.session
+            WHERE s1.conference IN %s
+            AND s2.conference = s1.conference
+            AND s2.session_date = s1.session_date
+            AND s1.start_time < s2.end_time AND s2.start_time < s1.end_time
+        """, (conferences,), as_dict=True),
+        "duplicate_attendees": frappe.db.sql("""
+            SELECT LOWER(email) AS email, COUNT(*) AS attendees
+            FROM `tabAttendee`
+            WHERE email LIKE %s
+            GROUP BY LOWER(email)
+            HAVING COUNT(*) > 1
+        """, (f"load-{run_id}-%",), as_dict=True)
+    }
+
+def _summarize(records, wall_seconds, violations):
+    by_scenario = {}
+    for scenario in sorted({record["scenario"] for record in records}):
+        rows = [record for record in records if record["scenario"] == scenario]
+        by_scenario[scenario] = {
+            "requests": len(rows),
+            "outcomes": dict(Counter(record["outcome"] for record in rows)),
+            "latency_ms": percentiles([record["latency_ms"] for record in rows]),
+            "errors": sorted({record["message"] for record in rows if record["outcome"] == "error"})[:10]
+        }
+
+    outcomes = Counter(record["outcome"] for record in records)
+    return {
+        "requests": len(records),
+        "wall_seconds": round(wall_seconds, 2),
+        # Includes the time workers spend waiting for each other at round barriers
+        "throughput_rps": round(len(records) / wall_seconds, 1) if wall_seconds else 0,
+        "latency_ms": percentiles([record["latency_ms"] for record in records]),
+        "deadlocks": outcomes.get("deadlock", 0),
+        "lock_timeouts": outcomes.get("lock_timeout", 0),
+        "by_scenario": by_scenario,
+        "violations": violations,
+        "passed": not any(violations.values())
+    }
@@ -0,0 +1,185 @@
+import importlib
+import json
+import random
+from datetime import datetime, timedelta
+
+import frappe
+
+from conference_management_system.conference_management_system.benchmarks.metrics import (
+    ensure_benchmark_site,
+    measure,
+    measure_peak_memory,
+    summarize,
+    write_report,
+)
+from conference_management_system.conference_management_system.utils.api_log_body import pack_api_log_body
+from conference_management_system.conference_management_system.utils.test_data_generator import (
+    SCALE_PRESETS,
+    bulk_write,
+    create_bulk_sample_data,
+)
+
+REPORT_PACKAGE = "conference_management_system.conference_management_system.report"
+
+# API Log rows seeded next to each registration preset
+API_LOG_ROWS = {"small": 2000, "10k": 200000, "1m": 2000000}
+
+# Row limits the reports apply in get_data, so the explained query matches the executed one
+REPORT_LIMITS = {"api_usage_report": 1000}
+
+API_LOG_ENDPOINTS = ("get_upcoming_conferences", "get_sessions_by_conference", "register_for_session",
+                     "process_payment", "get_attendee_registrations", "get_portal_state", "get_dashboard_batch")
+
+# Report -> case name -> filter builder; builders get the fixture so filters hit real data
+REPORT_CASES = {
+    "conference_report": {
+        "all": lambda f: {},
+        "status": lambda f: {"status": "Upcoming"},
+        "next_90_days": lambda f: {"from_date": f.today, "to_date": f.today + timedelta(days=90)}
+    },
+    "session_analysis_report": {
+        "all": lambda f: {},
+        "conference": lambda f: {"conference": f.conference},
+        "speaker_like": lambda f: {"speaker": "Smith"},
+        "session_name_like": lambda f: {"session_name": "Cloud"},
+        "min_occupancy": lambda f: {"min_occupancy": 50},
+        "next_90_days": lambda f: {"from_date": f.today, "to_date": f.today + timedelta(days=90)}
+    },
+    "api_usage_report": {
+        "all": lambda f: {},
+        "endpoint_like": lambda f: {"api_endpoint": "registration"},
+        "status_code": lambda f: {"status_code": 400},
+        "method": lambda f: {"method": "GET"},
+        "last_7_days": lambda f: {"from_date": f.today - timedelta(days=7), "to_date": f.today}
+    }
+}
+
+
+class Fixture:
+    def __init__(self):
+        self.today = datetime.now().date()
+        self.conference = frappe.db.sql("""
+            SELECT conference FROM `tabSession`
+            GROUP BY conference
+            ORDER BY COUNT(*) DESC
+            LIMIT 1
+        """)[0][0]
+
+
+def run_report_benchmarks(scales=("small", "10k"), iterations=5, seed=42, reports=None, output=None):
+    """Seed each scale, time every report filter case and capture its EXPLAIN plan
+
+    Results are keyed scale:report:case, so two runs can be diffed with
+    benchmarks.compare. Only runs on sites with allow_benchmarks set in site_config.json
+    """
+    ensure_benchmark_site()
+    if isinstance(scales, str):
+        scales = [scales]
+    unknown = [scale for scale in scales if scale not in SCALE_PRESETS]
+    if unknown:
+        frappe.throw(f"Unknown scales: {', '.join(unknown)}. Must be any of: {', '.join(SCALE_PRESETS)}")
+
+    results = {}
+    for scale in scales:
+        create_bulk_sample_data(scale, seed)
+        seed_api_logs(API_LOG_ROWS[scale], seed)
+        fixture = Fixture()
+
+        for report_name, cases in REPORT_CASES.items():
+            if reports and report_name not in reports:
+                continue
+            report = importlib.import_module(f"{REPORT_PACKAGE}.{report_name}.{report_name}")
+            for case, build_filters in cases.items():
+                filters = frappe._dict(build_filters(fixture))
+                key = f"{scale}:{report_name}:{case}"
+                try:
+                    results[key] = _benchmark_report(report, filters, iterations, REPORT_LIMITS.get(report_name))
+                except Exception as e:
+                    frappe.db.rollback()
+                    results[key] = {"error": str(e)}
+
+    print(format_table(results, scales))
+    meta = {"scales": list(scales), "iterations": iterations, "seed": seed}
+    return write_report("reports", "-".join(scales), meta, results, output)
+
+def seed_api_logs(count, seed=None):
+    """Replace the API Log with count synthetic rows spread over the last 90 days"""
+    rng = random.Random(seed)
+    frappe.db.sql("DELETE FROM `tabAPI Log`")
+    frappe.db.sql("DELETE FROM `tabAPI Log Body`")
+    frappe.db.commit()
+
+    now = datetime.now()
+    rows, bodies = [], []
+    for i in range(count):
+        name = f"LOG-BENCH-{i + 1:08d}"
+        endpoint = rng.choice(API_LOG_ENDPOINTS)
+        status_code = rng.choices([200, 400, 500], weights=[90, 8, 2])[0]
+        payload, sizes = pack_api_log_body(
+            json.dumps({"User-Agent": "report-benchmark", "Accept": "application/json"}),
+            json.dumps({"cmd": endpoint, "args": "x" * rng.randint(20, 400)}),
+            json.dumps({"success": status_code == 200, "data": "y" * rng.randint(50, 3000)})
+        )
+        rows.append({
+            "name": name,
+            "api_endpoint": endpoint,
+            "method": "GET" if endpoint.startswith("get_") else "POST",
+            "status_code": status_code,
+            "response_time": round(rng.uniform(5, 400), 2),
+            "ip_address": f"10.0.{rng.randint(0, 255)}.{rng.randint(1, 254)}",
+            "user_agent": "report-benchmark",
+            "timestamp": now - timedelta(seconds=rng.randint(0, 90 * 86400)),
+            **sizes
+        })
+        bodies.append({"name": name, "api_log": name, "payload": payload})
+        if len(rows) >= 5000:
+            bulk_write("API Log", rows)
+            bulk_write("API Log Body", bodies)
+            rows, bodies = [], []
+    bulk_write("API Log", rows)
+    bulk_write("API Log Body", bodies)
+
+def _benchmark_report(report, filters, iterations, limit=None):
+    """Time execute() for one filter set and attach the EXPLAIN plan of its query"""
+    report.execute(filters)  # warm-up, not recorded
+
+    measurements = []
+    rows = 0
+    for _ in range(iterations):
+        with measure() as measurement:
+            _, data = report.execute(filters)
+        measurements.append(measurement)
+        rows = len(data)
+
+    query, values = report.get_query(filters, limit=limit)
+    plan = frappe.db.sql(f"EXPLAIN {query}", values, as_dict=True)
+
+    result = summarize(measurements)
+    result.update({
+        "peak_memory_kb": measure_peak_memory(report.execute, filters),
+        "result_rows": rows,
+        "plan": [{
+            "table": step.get("table"),
+            "type": step.get("type"),
+            "key": step.get("key"),
+            "rows": step.get("rows"),
+            "extra": step.get("Extra")
+        } for step in plan],
+        "full_scans": [step.get("table") for step in plan if step.get("type") == "ALL"]
+    })
+    return result
+
+def format_table(results, scales):
+    """Plain-text table: one line per report case, wall time and rows read per scale"""
+    cases = sorted({key.split(":", 1)[1] for key in results})
+    header = f"{'report:case':<48}" + "".join(f"{scale + ' ms':>12}{scale + ' rows':>14}" for scale in scales) + "  full scans"
+    lines = [header, "-" * len(header)]
+    for case in cases:
+        line = f"{case:<48}"
+        full_scans = []
+        for scale in scales:
+            result = results.get(f"{scale}:{case}", {})
+            line += f"{result.get('wall_ms_median', '-'):>12}{str(result.get('rows_read', '-')):>14}"
+            full_scans = result.get("full_scans", full_scans)
+        lines.append(line + "  " + ", ".join(full_scans or []))
+    return "\n".join(lines)
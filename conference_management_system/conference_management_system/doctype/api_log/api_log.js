@@ -0,0 +1,49 @@
+frappe.ui.form.on('API Log', {
+    refresh: function (frm) {
+        if (frm.is_new() || !frm.doc.stored_size) {
+            return;
+        }
+
+        // Bodies are stored compressed and only decompressed when asked for
+        frm.add_custom_button(__('View Bodies'), function () {
+            frappe.call({
+                method: 'conference_management_system.conference_management_system.api.v1.admin.get_api_log_body',
+                args: { name: frm.doc.name },
+                callback: function (r) {
+                    if (!(r.message && r.message.success)) {
+                        frappe.msgprint((r.message && r.message.error) || __('Could not load the logged bodies'));
+                        return;
+                    }
+                    showBodies(r.message.data);
+                }
+            });
+        });
+    }
+});
+
+function showBodies(body) {
+    const dialog = new frappe.ui.Dialog({
+        title: __('Logged Request and Response'),
+        size: 'extra-large',
+        fields: [
+            { fieldname: 'request_headers', fieldtype: 'Code', label: __('Request Headers'), options: 'JSON', read_only: 1 },
+            { fieldname: 'request_body', fieldtype: 'Code', label: __('Request Body'), options: 'JSON', read_only: 1 },
+            { fieldname: 'response_body', fieldtype: 'Code', label: __('Response Body'), options: 'JSON', read_only: 1 }
+        ]
+    });
+    dialog.set_values({
+        request_headers: prettyJson(body.request_headers),
+        request_body: prettyJson(body.request_body),
+        response_body: prettyJson(body.response_body)
+    });
+    dialog.show();
+}
+
+function prettyJson(text) {
+    // Stored compact and possibly cut at the size cap, in which case it is shown as is
+    try {
+        return JSON.stringify(JSON.parse(text), null, 2);
+    } catch (e) {
+        return text;
+    }
+}
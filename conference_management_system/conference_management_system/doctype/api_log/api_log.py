@@ -2,4 +2,5 @@ import frappe
 from frappe.model.document import Document
 
 class APILog(Document):
-    pass
\ No newline at end of file
+    def on_trash(self):
+        frappe.db.delete("API Log Body", {"api_log": self.name})
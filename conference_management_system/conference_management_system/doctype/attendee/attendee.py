@@ -3,7 +3,10 @@ from frappe.model.document import Document
 import random
 import string
 import re
+from conference_management_system.conference_management_system.utils.attendee_profile import invalidate_attendee_profile
 from conference_management_system.conference_management_system.utils.error_handler import ValidationError
+from conference_management_system.conference_management_system.utils.doc_cache import invalidate_cached_doc
+from conference_management_system.conference_management_system.utils.identity import get_attendee_user, invalidate_attendee_email, invalidate_identity
 
 class Attendee(Document):
     def validate(self):
@@ -15,6 +18,28 @@ class Attendee(Document):
             frappe.log_error(f"Attendee validation error: {str(e)}", "Attendee Document")
             raise
     
+    def on_update(self):
+        invalidate_cached_doc(self.doctype, self.name)
+        invalidate_attendee_profile(self.name)
+        previous = self.get_doc_before_save()
+        previous_email = previous.email if previous else None
+        invalidate_identity(get_attendee_user(self.email), get_attendee_user(previous_email))
+        # Runs on insert too, which clears a cached "no attendee" answer for the email
+        if self.has_value_changed("email"):
+            invalidate_attendee_email(self.email, previous_email)
+    
+    def on_trash(self):
+        invalidate_cached_doc(self.doctype, self.name)
+        invalidate_attendee_profile(self.name)
+        invalidate_identity(get_attendee_user(self.email))
+        invalidate_attendee_email(self.email)
+    
+    def after_rename(self, old_name, new_name, merge=False):
+        invalidate_cached_doc(self.doctype, old_name)
+        invalidate_attendee_profile(old_name, new_name)
+        invalidate_identity(get_attendee_user(self.email))
+        invalidate_attendee_email(self.email)
+    
     def validate_required_fields(self):
         """Validate required fields"""
         try:
@@ -1,12 +1,22 @@
 import frappe
 from frappe.model.document import Document
 from frappe.utils import nowdate, getdate
+from conference_management_system.conference_management_system.utils.doc_cache import invalidate_cached_doc
+from conference_management_system.conference_management_system.utils.session_catalog import bump_catalog_version, invalidate_conference_sessions
 
 class Conference(Document):
     def validate(self):
         self.validate_dates()
         self.update_status()
     
+    def on_update(self):
+        invalidate_cached_doc(self.doctype, self.name)
+        bump_catalog_version()
+    
+    def on_trash(self):
+        invalidate_cached_doc(self.doctype, self.name)
+        invalidate_conference_sessions(self.name)
+    
     def validate_dates(self):
         if self.start_date and self.end_date:
             if getdate(self.start_date) > getdate(self.end_date):
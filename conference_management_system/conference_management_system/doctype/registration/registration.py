@@ -3,6 +3,10 @@ from frappe.model.document import Document
 from frappe.utils import nowdate
 import uuid
 from conference_management_system.conference_management_system.utils.error_handler import ValidationError
+from conference_management_system.conference_management_system.utils.attendee_profile import invalidate_attendee_profile
+from conference_management_system.conference_management_system.utils.availability_feed import queue_availability_update
+from conference_management_system.conference_management_system.utils.doc_cache import get_cached_doc
+from conference_management_system.conference_management_system.utils.session_catalog import invalidate_conference_sessions
 
 class Registration(Document):
     def validate(self):
@@ -26,6 +30,8 @@ class Registration(Document):
             raise
     
     def after_insert(self):
+        invalidate_conference_sessions(self.conference)
+        queue_availability_update(self.conference, self.session)
         try:
             from conference_management_system.conference_management_system.utils.email_service import send_registration_confirmation
             send_registration_confirmation(self)
@@ -34,6 +40,12 @@ class Registration(Document):
             # Don't raise error to prevent registration failure
     
     def on_update(self):
+        # Runs on insert too; covers session, payment and attendee changes
+        previous = self.get_doc_before_save()
+        invalidate_attendee_profile(self.attendee, previous.attendee if previous else None)
+        # after_insert already handled a new registration, which has no previous version
+        if previous and self.has_value_changed("session"):
+            self.invalidate_session_catalog()
         try:
             if self.has_value_changed("payment_status") and self.payment_status == "Paid":
                 try:
@@ -44,6 +56,21 @@ class Registration(Document):
         except Exception as e:
             frappe.log_error(f"Error in on_update: {str(e)}", "Registration Document")
     
+    def on_trash(self):
+        invalidate_attendee_profile(self.attendee)
+        invalidate_conference_sessions(self.conference)
+        queue_availability_update(self.conference, self.session)
+    
+    def invalidate_session_catalog(self):
+        """Drop cached session listings and push availability for the sessions this registration moved between"""
+        invalidate_conference_sessions(self.conference)
+        queue_availability_update(self.conference, self.session)
+        previous = self.get_doc_before_save()
+        if previous:
+            queue_availability_update(previous.conference, previous.session)
+            if previous.conference != self.conference:
+                invalidate_conference_sessions(previous.conference)
+    
     def validate_required_fields(self):
         """Validate required fields"""
         try:
@@ -91,7 +118,7 @@ class Registration(Document):
                 return
             
             try:
-                session_doc = frappe.get_doc("Session", self.session)
+                session_doc = get_cached_doc("Session", self.session)
             except frappe.DoesNotExistError:
                 raise ValidationError("Selected session does not exist")
             
@@ -120,7 +147,7 @@ class Registration(Document):
                 return
             
             try:
-                session_doc = frappe.get_doc("Session", self.session)
+                session_doc = get_cached_doc("Session", self.session)
             except frappe.DoesNotExistError:
                 raise ValidationError("Selected session does not exist")
             
@@ -164,7 +191,7 @@ class Registration(Document):
         try:
             if self.conference and not self.amount:
                 try:
-                    conference_doc = frappe.get_doc("Conference", self.conference)
+                    conference_doc = get_cached_doc("Conference", self.conference)
                     self.amount = float(conference_doc.registration_fee or 0)
                 except frappe.DoesNotExistError:
                     raise ValidationError("Selected conference does not exist")
@@ -198,7 +225,7 @@ class Registration(Document):
         """Get session details for this registration"""
         try:
             if self.session:
-                return frappe.get_doc("Session", self.session)
+                return get_cached_doc("Session", self.session)
         except Exception as e:
             frappe.log_error(f"Error fetching session details: {str(e)}", "Registration Document")
         return None
@@ -207,7 +234,7 @@ class Registration(Document):
         """Get conference details for this registration"""
         try:
             if self.conference:
-                return frappe.get_doc("Conference", self.conference)
+                return get_cached_doc("Conference", self.conference)
         except Exception as e:
             frappe.log_error(f"Error fetching conference details: {str(e)}", "Registration Document")
         return None
@@ -216,7 +243,7 @@ class Registration(Document):
         """Get attendee details for this registration"""
         try:
             if self.attendee:
-                return frappe.get_doc("Attendee", self.attendee)
+                return get_cached_doc("Attendee", self.attendee)
         except Exception as e:
             frappe.log_error(f"Error fetching attendee details: {str(e)}", "Registration Document")
         return None
@@ -2,6 +2,8 @@ import frappe
 from frappe.model.document import Document
 from frappe.utils import get_time, getdate, nowdate
 from conference_management_system.conference_management_system.utils.error_handler import ValidationError
+from conference_management_system.conference_management_system.utils.doc_cache import get_cached_doc, invalidate_cached_doc
+from conference_management_system.conference_management_system.utils.session_catalog import invalidate_conference_sessions
 
 class Session(Document):
     def validate(self):
@@ -15,6 +17,17 @@ class Session(Document):
             frappe.log_error(f"Session validation error: {str(e)}", "Session Document")
             raise
     
+    def on_update(self):
+        invalidate_cached_doc(self.doctype, self.name)
+        invalidate_conference_sessions(self.conference)
+        previous = self.get_doc_before_save()
+        if previous and previous.conference != self.conference:
+            invalidate_conference_sessions(previous.conference)
+    
+    def on_trash(self):
+        invalidate_cached_doc(self.doctype, self.name)
+        invalidate_conference_sessions(self.conference)
+    
     def validate_required_fields(self):
         """Validate required fields"""
         try:
@@ -106,7 +119,7 @@ class Session(Document):
         try:
             if self.conference and self.session_date:
                 try:
-                    conf = frappe.get_doc("Conference", self.conference)
+                    conf = get_cached_doc("Conference", self.conference)
                     session_date = getdate(self.session_date)
                     start_date = getdate(conf.start_date)
                     end_date = getdate(conf.end_date)
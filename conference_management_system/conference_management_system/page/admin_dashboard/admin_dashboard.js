@@ -75,6 +75,9 @@ frappe.pages['admin-dashboard'].on_page_load = function (wrapper) {
                                 <button class="adm-btn adm-btn-accent" data-route="query-report,API Usage Report">
                                     API Usage Report
                                 </button>
+                                <button class="adm-btn adm-btn-accent" data-route="query-report,Query Stats Report">
+                                    Query Stats
+                                </button>
                                 <button class="adm-btn" data-route="List,Registration,{%22payment_status%22:%22Paid%22}">
                                     Paid Registrations
                                 </button>
@@ -407,69 +410,81 @@ frappe.pages['admin-dashboard'].on_page_load = function (wrapper) {
         loadDashboardData();
     }
 
-    function loadDashboardData() {
-        loadStatistics();
-        loadRevenueSummary();
-    }
+    page.set_secondary_action(__('Refresh'), () => loadDashboardData(true));
 
-    function loadStatistics() {
+    // Token from the last batch; refreshes send it so unchanged sections are skipped
+    let dashboardToken = null;
+
+    function loadDashboardData(incremental = false) {
         frappe.call({
-            method: 'conference_management_system.conference_management_system.api.v1.admin.get_dashboard_stats',
+            method: 'conference_management_system.conference_management_system.api.v1.admin.get_dashboard_batch',
+            args: {
+                queries: ['dashboard_stats', 'revenue_summary'],
+                since: incremental && dashboardToken ? dashboardToken : undefined
+            },
             callback: function (r) {
-                if (r.message && r.message.success) {
-                    const stats = r.message.data || {};
-                    $('#total-conferences').text(stats.conferences || 0);
-                    $('#total-sessions').text(stats.sessions || 0);
-                    $('#total-registrations').text(stats.registrations || 0);
-                    $('#active-conferences').text(stats.active_conferences || 0);
-                    $('#total-revenue').text('₹' + (stats.total_revenue || 0).toLocaleString());
-                    $('#email-logs').text(stats.email_logs || 0);
-                    $('#api-calls').text(stats.api_logs || 0);
+                if (!(r.message && r.message.success)) {
+                    renderRevenueSummary(null);
+                    return;
                 }
+                const batch = r.message.data || {};
+                const results = batch.results || {};
+                dashboardToken = batch.token || null;
+
+                const stats = results.dashboard_stats || {};
+                if (!stats.unchanged) renderStatistics(stats.data);
+
+                const revenue = results.revenue_summary || {};
+                if (!revenue.unchanged) renderRevenueSummary(revenue.data);
             }
         });
     }
 
-    function loadRevenueSummary() {
-        frappe.call({
-            method: 'conference_management_system.conference_management_system.api.v1.admin.get_revenue_summary',
-            callback: function (r) {
-                const container = $('#revenue-summary');
-                if (r.message && r.message.success) {
-                    const data = r.message.data || {};
-                    const paymentMethodsCount = data.payment_methods ? Object.keys(data.payment_methods).length : 0;
-
-                    container.html(`
-                        <div class="adm-revenue-item adm-click" data-route="List,Mock Payment Details,{%22payment_status%22:%22Success%22}">
-                            <div class="adm-revenue-number">₹${(data.total_revenue || 0).toLocaleString()}</div>
-                            <div class="adm-revenue-label">Total Revenue</div>
-                        </div>
-                        <div class="adm-revenue-item">
-                            <div class="adm-revenue-number">₹${(data.processing_fees || 0).toLocaleString()}</div>
-                            <div class="adm-revenue-label">Processing Fees</div>
-                        </div>
-                        <div class="adm-revenue-item">
-                            <div class="adm-revenue-number">₹${(data.net_revenue || 0).toLocaleString()}</div>
-                            <div class="adm-revenue-label">Net Revenue</div>
-                        </div>
-                        <div class="adm-revenue-item adm-click" data-route="List,Registration,{%22payment_status%22:%22Paid%22}">
-                            <div class="adm-revenue-number">${data.paid_registrations || 0}</div>
-                            <div class="adm-revenue-label">Paid Registrations</div>
-                        </div>
-                        <div class="adm-revenue-item">
-                            <div class="adm-revenue-number">${data.conversion_rate || 0}%</div>
-                            <div class="adm-revenue-label">Conversion Rate</div>
-                        </div>
-                        <div class="adm-revenue-item adm-click" data-route="List,Registration,{%22payment_status%22:%22Pending%22}">
-                            <div class="adm-revenue-number">${paymentMethodsCount}</div>
-                            <div class="adm-revenue-label">Payment Methods</div>
-                        </div>
-                    `);
-                } else {
-                    container.html('<div class="adm-empty">No revenue data available</div>');
-                }
-            }
-        });
+    function renderStatistics(stats) {
+        stats = stats || {};
+        $('#total-conferences').text(stats.conferences || 0);
+        $('#total-sessions').text(stats.sessions || 0);
+        $('#total-registrations').text(stats.registrations || 0);
+        $('#active-conferences').text(stats.active_conferences || 0);
+        $('#total-revenue').text('₹' + (stats.total_revenue || 0).toLocaleString());
+        $('#email-logs').text(stats.email_logs || 0);
+        $('#api-calls').text(stats.api_logs || 0);
+    }
+
+    function renderRevenueSummary(data) {
+        const container = $('#revenue-summary');
+        if (data) {
+            const paymentMethodsCount = data.payment_methods ? Object.keys(data.payment_methods).length : 0;
+
+            container.html(`
+                <div class="adm-revenue-item adm-click" data-route="List,Mock Payment Details,{%22payment_status%22:%22Success%22}">
+                    <div class="adm-revenue-number">₹${(data.total_revenue || 0).toLocaleString()}</div>
+                    <div class="adm-revenue-label">Total Revenue</div>
+                </div>
+                <div class="adm-revenue-item">
+                    <div class="adm-revenue-number">₹${(data.processing_fees || 0).toLocaleString()}</div>
+                    <div class="adm-revenue-label">Processing Fees</div>
+                </div>
+                <div class="adm-revenue-item">
+                    <div class="adm-revenue-number">₹${(data.net_revenue || 0).toLocaleString()}</div>
+                    <div class="adm-revenue-label">Net Revenue</div>
+                </div>
+                <div class="adm-revenue-item adm-click" data-route="List,Registration,{%22payment_status%22:%22Paid%22}">
+                    <div class="adm-revenue-number">${data.paid_registrations || 0}</div>
+                    <div class="adm-revenue-label">Paid Registrations</div>
+                </div>
+                <div class="adm-revenue-item">
+                    <div class="adm-revenue-number">${data.conversion_rate || 0}%</div>
+                    <div class="adm-revenue-label">Conversion Rate</div>
+                </div>
+                <div class="adm-revenue-item adm-click" data-route="List,Registration,{%22payment_status%22:%22Pending%22}">
+                    <div class="adm-revenue-number">${paymentMethodsCount}</div>
+                    <div class="adm-revenue-label">Payment Methods</div>
+                </div>
+            `);
+        } else {
+            container.html('<div class="adm-empty">No revenue data available</div>');
+        }
     }
 
     renderPage();
@@ -8,6 +8,14 @@ frappe.pages['attendee-portal'].on_page_load = function (wrapper) {
     let currentTab = 'conferences';
     let allConferences = [];
     let lastSearchKeyword = '';
+    const availabilitySubscriptions = new Set();
+
+    // Capacity changes are pushed per conference instead of re-fetching the session list
+    frappe.realtime.on('session_availability', function (data) {
+        Object.entries(data.sessions || {}).forEach(([sessionName, availability]) => {
+            updateSessionAvailability(sessionName, availability);
+        });
+    });
 
     function renderPage() {
         page.body.empty();
@@ -513,6 +521,7 @@ frappe.pages['attendee-portal'].on_page_load = function (wrapper) {
 
         frappe.call({
             method: 'conference_management_system.conference_management_system.api.v1.conferences.get_upcoming_conferences',
+            type: 'GET',
             callback: function (r) {
                 if (r.message && r.message.success) {
                     allConferences = r.message.data || [];
@@ -535,6 +544,7 @@ frappe.pages['attendee-portal'].on_page_load = function (wrapper) {
 
         frappe.call({
             method: 'conference_management_system.conference_management_system.api.v1.conferences.get_upcoming_conferences',
+            type: 'GET',
             callback: function (r) {
                 if (r.message && r.message.success) {
                     allConferences = r.message.data || [];
@@ -608,6 +618,7 @@ frappe.pages['attendee-portal'].on_page_load = function (wrapper) {
 
         frappe.call({
             method: 'conference_management_system.conference_management_system.api.v1.sessions.get_sessions_by_conference',
+            type: 'GET',
             args: { conference_id: conferenceName },
             callback: function (r) {
 
@@ -617,6 +628,7 @@ frappe.pages['attendee-portal'].on_page_load = function (wrapper) {
 
                     if (sessions.length > 0) {
                         renderSessions(sessions, container, conferenceName);
+                        subscribeAvailability(conferenceName);
                     } else {
                         container.html('<div class="ap-empty" style="padding: 8px;">No sessions found for this conference.</div>');
                     }
@@ -653,15 +665,16 @@ frappe.pages['attendee-portal'].on_page_load = function (wrapper) {
             }
 
             const sessionHtml = `
-                <div class="ap-session-row">
+                <div class="ap-session-row" data-session="${session.name}">
                     <div class="ap-session-title">${frappe.utils.escape_html(session.session_name)}</div>
                     <div class="ap-session-meta">
                         ${session.speaker || 'TBA'} • ${session.start_time}-${session.end_time} •
-                        ${availableSpots}/${session.max_attendees || 'Unlimited'}
+                        <span class="ap-session-spots">${availableSpots}</span>/${session.max_attendees || 'Unlimited'}
                     </div>
                     <button class="ap-register-btn"
                         data-session="${session.name}"
                         data-conference="${conferenceName}"
+                        data-user-registered="${userRegistered ? 1 : 0}"
                         ${disabledAttr}>
                         ${buttonText}
                     </button>
@@ -682,6 +695,24 @@ frappe.pages['attendee-portal'].on_page_load = function (wrapper) {
 
     }
 
+    function subscribeAvailability(conferenceName) {
+        if (availabilitySubscriptions.has(conferenceName)) return;
+        availabilitySubscriptions.add(conferenceName);
+        frappe.realtime.doc_subscribe('Conference', conferenceName);
+    }
+
+    function updateSessionAvailability(sessionName, availability) {
+        const row = $(`.ap-session-row[data-session="${sessionName}"]`);
+        if (!row.length) return;
+
+        const availableSpots = availability.available_spots || 0;
+        row.find('.ap-session-spots').text(availableSpots);
+
+        const button = row.find('.ap-register-btn');
+        if (button.data('user-registered')) return;
+        button.prop('disabled', availableSpots <= 0).text(availableSpots > 0 ? 'Register' : 'Full');
+    }
+
     function registerForSession(sessionName, conferenceName) {
         const email = frappe.session.user;
         const name = frappe.session.user_fullname || email;
@@ -767,6 +798,8 @@ frappe.pages['attendee-portal'].on_page_load = function (wrapper) {
 
     function processPayment(registrationId) {
         const paymentMethods = ['Credit Card', 'Debit Card', 'UPI', 'Net Banking'];
+        // One key per dialog: repeated clicks and network retries replay the same payment
+        const idempotencyKey = frappe.utils.get_random(20);
 
         const dialog = new frappe.ui.Dialog({
             title: 'Select Payment Method',
@@ -803,7 +836,8 @@ frappe.pages['attendee-portal'].on_page_load = function (wrapper) {
                         registration_id: registrationId,
                         payment_method: values.payment_method,
                         card_number: values.card_number,
-                        upi_id: values.upi_id
+                        upi_id: values.upi_id,
+                        idempotency_key: idempotencyKey
                     },
                     callback: function (r) {
                         if (r.message?.success) {
@@ -832,191 +866,159 @@ frappe.pages['attendee-portal'].on_page_load = function (wrapper) {
         const container = $('#recommendations-list');
         container.html('<div class="ap-empty">Loading recommendations...</div>');
 
+        // One round trip for recommendations plus the registrations and preferences that mark them
         frappe.call({
-            method: 'conference_management_system.conference_management_system.api.v1.attendees.get_attendee_profile',
+            method: 'conference_management_system.conference_management_system.api.v1.attendees.get_portal_state',
             args: {
-                email: frappe.session.user,
+                fields: 'preferences,registrations,recommendations',
                 _: forceRefresh ? Date.now() : undefined
             },
             no_cache: forceRefresh,
             callback: function (r) {
-                if (r.message?.success && r.message.data?.attendee) {
-                    const attendeeId = r.message.data.attendee.name;
-
-                    frappe.call({
-                        method: 'conference_management_system.conference_management_system.api.v1.registrations.get_recommendations',
-                        args: {
-                            attendee_id: attendeeId,
-                            _: forceRefresh ? Date.now() : undefined
-                        },
-                        no_cache: forceRefresh,
-                        callback: function (rec_r) {
-                            if (rec_r.message?.success && rec_r.message.data?.length) {
-                                renderRecommendations(rec_r.message.data, container);
-                            } else {
-                                container.html('<div class="ap-empty">No recommendations available. Register for sessions to get personalized suggestions.</div>');
-                            }
-                        },
-                        error: function () {
-                            container.html('<div class="ap-empty">Failed to load recommendations.</div>');
-                        }
-                    });
-                } else {
+                const state = r.message?.success ? r.message.data : null;
+                if (!state?.recommendations) {
                     container.html('<div class="ap-empty">Please register for sessions first to get recommendations.</div>');
+                } else if (!state.recommendations.length) {
+                    container.html('<div class="ap-empty">No recommendations available. Register for sessions to get personalized suggestions.</div>');
+                } else {
+                    renderRecommendations(state.recommendations, container, state.registrations, state.preferences);
                 }
+            },
+            error: function () {
+                container.html('<div class="ap-empty">Failed to load recommendations.</div>');
             }
         });
     }
 
-    function renderRecommendations(recommendations, container) {
-        Promise.all([
-            new Promise((resolve) => {
-                frappe.call({
-                    method: 'conference_management_system.conference_management_system.api.v1.registrations.get_attendee_registrations',
-                    no_cache: true,
-                    callback: function (r) {
-                        const userRegistrations = new Set();
-                        if (r.message?.success && r.message.data) {
-                            r.message.data.forEach(reg => userRegistrations.add(reg.session));
-                        }
-                        resolve(userRegistrations);
-                    },
-                    error: () => resolve(new Set())
-                });
-            }),
-            new Promise((resolve) => {
-                frappe.call({
-                    method: 'conference_management_system.conference_management_system.api.v1.attendees.get_attendee_profile',
-                    args: { email: frappe.session.user },
-                    no_cache: true,
-                    callback: function (r) {
-                        const preferences = new Map();
-                        if (r.message?.success && r.message.data?.preferences) {
-                            r.message.data.preferences.forEach(pref => {
-                                preferences.set(pref.session_id, pref.preference_type);
-                            });
-                        }
-                        resolve(preferences);
-                    },
-                    error: () => resolve(new Map())
-                });
-            })
-        ]).then(([userRegistrations, userPreferences]) => {
-            let html = '';
-            recommendations.forEach(rec => {
-                const availableSpots = rec.available_spots || 0;
-                const isAvailable = availableSpots > 0;
-                const userRegistered = userRegistrations.has(rec.name);
-                const currentPreference = userPreferences.get(rec.name);
-
-                let buttonText = 'Register';
-                let disabledAttr = '';
-                if (userRegistered) {
-                    buttonText = 'Registered';
-                    disabledAttr = 'disabled';
-                } else if (!isAvailable) {
-                    buttonText = 'Full';
-                    disabledAttr = 'disabled';
-                }
+    function renderRecommendations(recommendations, container, registrations, preferences) {
+        const userRegistrations = new Set((registrations || []).map(reg => reg.session));
+        const userPreferences = new Map((preferences || []).map(pref => [pref.session_id, pref.preference_type]));
 
-                let likeState = '';
-                let neutralState = '';
-                let dislikeState = '';
-                if (currentPreference === 'Interested') {
-                    likeState = 'active';
-                } else if (currentPreference === 'Not Interested') {
-                    dislikeState = 'active';
-                } else {
-                    neutralState = 'active';
-                }
+        let html = '';
+        recommendations.forEach(rec => {
+            const availableSpots = rec.available_spots || 0;
+            const isAvailable = availableSpots > 0;
+            const userRegistered = userRegistrations.has(rec.name);
+            const currentPreference = userPreferences.get(rec.name);
 
-                html += `
-                    <div class="ap-session-row">
-                        <div class="ap-session-title">${frappe.utils.escape_html(rec.session_name)}</div>
-                        <div class="ap-session-meta">
-                            ${rec.speaker || 'TBA'} • ${rec.conference_name || 'Conference'}<br>
-                            ${rec.start_time || ''} - ${rec.end_time || ''} •
-                            ${availableSpots}/${rec.max_attendees || 'Unlimited'} spots
-                        </div>
-                        <div style="display:flex; gap:8px; align-items:center;">
-                            <button class="ap-register-btn"
-                                data-session="${rec.name}"
-                                ${disabledAttr}>
-                                ${buttonText}
-                            </button>
-                            <div class="ap-interest-bar" data-session="${rec.name}">
-                                <button class="ap-interest-btn ${neutralState}" data-action="neutral">Neutral</button>
-                                <button class="ap-interest-btn ${likeState}" data-action="interested">Like</button>
-                                <button class="ap-interest-btn negative ${dislikeState}" data-action="not_interested">Skip</button>
-                            </div>
+            let buttonText = 'Register';
+            let disabledAttr = '';
+            if (userRegistered) {
+                buttonText = 'Registered';
+                disabledAttr = 'disabled';
+            } else if (!isAvailable) {
+                buttonText = 'Full';
+                disabledAttr = 'disabled';
+            }
+
+            let likeState = '';
+            let neutralState = '';
+            let dislikeState = '';
+            if (currentPreference === 'Interested') {
+                likeState = 'active';
+            } else if (currentPreference === 'Not Interested') {
+                dislikeState = 'active';
+            } else {
+                neutralState = 'active';
+            }
+
+            html += `
+                <div class="ap-session-row">
+                    <div class="ap-session-title">${frappe.utils.escape_html(rec.session_name)}</div>
+                    <div class="ap-session-meta">
+                        ${rec.speaker || 'TBA'} • ${rec.conference_name || 'Conference'}<br>
+                        ${rec.start_time || ''} - ${rec.end_time || ''} •
+                        ${availableSpots}/${rec.max_attendees || 'Unlimited'} spots
+                    </div>
+                    <div style="display:flex; gap:8px; align-items:center;">
+                        <button class="ap-register-btn"
+                            data-session="${rec.name}"
+                            ${disabledAttr}>
+                            ${buttonText}
+                        </button>
+                        <div class="ap-interest-bar" data-session="${rec.name}">
+                            <button class="ap-interest-btn ${neutralState}" data-action="neutral">Neutral</button>
+                            <button class="ap-interest-btn ${likeState}" data-action="interested">Like</button>
+                            <button class="ap-interest-btn negative ${dislikeState}" data-action="not_interested">Skip</button>
                         </div>
                     </div>
-                `;
-            });
+                </div>
+            `;
+        });
 
-            container.html(html || '<div class="ap-empty">No recommendations found.</div>');
+        container.html(html || '<div class="ap-empty">No recommendations found.</div>');
 
-            container.find('.ap-register-btn').on('click', function () {
-                if ($(this).prop('disabled')) return;
-                const sessionName = $(this).data('session');
-                registerForSession(sessionName, null);
-            });
+        container.find('.ap-register-btn').on('click', function () {
+            if ($(this).prop('disabled')) return;
+            const sessionName = $(this).data('session');
+            registerForSession(sessionName, null);
+        });
 
-            container.find('.ap-interest-btn').on('click', function () {
-                const btn = $(this);
-                const action = btn.data('action');
-                const bar = btn.closest('.ap-interest-bar');
-                const sessionId = bar.data('session');
+        container.find('.ap-interest-btn').on('click', function () {
+            const btn = $(this);
+            const action = btn.data('action');
+            const bar = btn.closest('.ap-interest-bar');
+            const sessionId = bar.data('session');
 
-                bar.find('.ap-interest-btn').removeClass('active');
-                btn.addClass('active');
+            bar.find('.ap-interest-btn').removeClass('active');
+            btn.addClass('active');
 
-                if (action === 'neutral') {
-                    updatePreference(sessionId, null, btn, true);
-                } else {
-                    const preferenceType = action === 'interested' ? 'Interested' : 'Not Interested';
-                    updatePreference(sessionId, preferenceType, btn, false);
-                }
-            });
+            if (action === 'neutral') {
+                updatePreference(sessionId, null, btn, true);
+            } else {
+                const preferenceType = action === 'interested' ? 'Interested' : 'Not Interested';
+                updatePreference(sessionId, preferenceType, btn, false);
+            }
         });
     }
 
+    const pendingPreferences = new Map();
+    let preferenceFlushTimer = null;
+
+    // Clicks within a short window are saved together in one batch request
     function updatePreference(sessionId, preferenceType, button, neutral) {
-        const originalText = button.text();
+        const previous = pendingPreferences.get(sessionId);
+        if (previous && previous.button[0] !== button[0]) {
+            previous.button.text(previous.originalText);
+        }
+        pendingPreferences.set(sessionId, {
+            preferenceType: neutral ? '' : preferenceType,
+            button: button,
+            originalText: previous && previous.button[0] === button[0] ? previous.originalText : button.text()
+        });
         button.text('...');
 
-        if (neutral) {
-            frappe.call({
-                method: 'conference_management_system.conference_management_system.api.v1.attendees.update_preferences',
-                args: {
-                    email: frappe.session.user,
-                    session_id: sessionId,
-                    preference_type: ''
-                },
-                callback: function () {
-                    button.text(originalText);
-                },
-                error: function () {
-                    button.text(originalText);
-                }
-            });
-            return;
-        }
+        clearTimeout(preferenceFlushTimer);
+        preferenceFlushTimer = setTimeout(flushPreferences, 400);
+    }
+
+    function flushPreferences() {
+        const batch = Array.from(pendingPreferences.entries());
+        pendingPreferences.clear();
+        if (!batch.length) return;
+
+        const restoreButtons = () => batch.forEach(([, pref]) => pref.button.text(pref.originalText));
 
         frappe.call({
-            method: 'conference_management_system.conference_management_system.api.v1.attendees.update_preferences',
+            method: 'conference_management_system.conference_management_system.api.v1.attendees.update_preferences_batch',
             args: {
-                email: frappe.session.user,
-                session_id: sessionId,
-                preference_type: preferenceType
+                preferences: batch.map(([sessionId, pref]) => ({
+                    session_id: sessionId,
+                    preference_type: pref.preferenceType
+                }))
             },
             callback: function (r) {
-                button.text(originalText);
+                restoreButtons();
                 if (r.message?.success) {
-                    frappe.show_alert(
-                        { message: `Marked as ${preferenceType}`, indicator: 'green' },
-                        2
-                    );
+                    const marked = batch.filter(([, pref]) => pref.preferenceType);
+                    if (marked.length === 1) {
+                        frappe.show_alert(
+                            { message: `Marked as ${marked[0][1].preferenceType}`, indicator: 'green' },
+                            2
+                        );
+                    } else if (marked.length > 1) {
+                        frappe.show_alert({ message: `Updated ${marked.length} preferences`, indicator: 'green' }, 2);
+                    }
                 } else {
                     frappe.msgprint({
                         title: 'Error',
@@ -1026,7 +1028,7 @@ frappe.pages['attendee-portal'].on_page_load = function (wrapper) {
                 }
             },
             error: function () {
-                button.text(originalText);
+                restoreButtons();
                 frappe.msgprint({
                     title: 'Error',
                     message: 'Failed to update preference',
@@ -1,5 +1,33 @@
 import frappe
 from frappe import _
+from conference_management_system.conference_management_system.utils.report_filters import (
+    ReportFilter, ReportQuery, date_value, int_value, like_value, next_day_value
+)
+
+REPORT_QUERY = ReportQuery(
+    template="""
+        SELECT 
+            timestamp,
+            COALESCE(api_endpoint, '') as api_endpoint,
+            COALESCE(method, '') as method,
+            COALESCE(status_code, 0) as status_code,
+            COALESCE(owner, '') as owner,
+            COALESCE(request_size, 0) as request_size,
+            COALESCE(response_size, 0) as response_size
+        FROM `tabAPI Log`
+        {conditions}
+        ORDER BY timestamp DESC
+        {limit}
+    """,
+    filters=[
+        ReportFilter("method", "method = %(method)s"),
+        ReportFilter("status_code", "status_code = %(status_code)s", int_value),
+        ReportFilter("api_endpoint", "api_endpoint LIKE %(api_endpoint)s", like_value),
+        # Range predicates on the raw column keep the timestamp index usable
+        ReportFilter("from_date", "timestamp >= %(from_date)s", date_value),
+        ReportFilter("to_date", "timestamp < %(to_date)s", next_day_value)
+    ]
+)
 
 def execute(filters=None):
     columns = get_columns()
@@ -40,13 +68,13 @@ def get_columns():
             "width": 150
         },
         {
-            "label": _("Request Size"),
+            "label": _("Request Size (bytes)"),
             "fieldname": "request_size",
             "fieldtype": "Int",
             "width": 120
         },
         {
-            "label": _("Response Size"),
+            "label": _("Response Size (bytes)"),
             "fieldname": "response_size",
             "fieldtype": "Int",
             "width": 120
@@ -55,60 +83,25 @@ def get_columns():
 
 def get_data(filters):
     try:
-        conditions = get_conditions(filters)
-        
-        data = frappe.db.sql(f"""
-            SELECT 
-                timestamp,
-                COALESCE(api_endpoint, '') as api_endpoint,
-                COALESCE(method, '') as method,
-                COALESCE(status_code, 0) as status_code,
-                COALESCE(owner, '') as owner,
-                COALESCE(CHAR_LENGTH(request_body), 0) as request_size,
-                COALESCE(CHAR_LENGTH(response_body), 0) as response_size
-            FROM `tabAPI Log`
-            {conditions}
-            ORDER BY timestamp DESC
-            LIMIT 1000
-        """, as_dict=True)
+        query, values = get_query(filters, limit=1000)
+        data = frappe.db.sql(query, values, as_dict=True)
         
         # Clean up data
         for row in data:
-            row['status_code'] = int(row.get('status_code', 0) or 0)
-            row['request_size'] = int(row.get('request_size', 0) or 0)
-            row['response_size'] = int(row.get('response_size', 0) or 0)
+            format_row(row)
         
         return data
     except Exception as e:
         frappe.log_error(f"Error fetching API usage data: {str(e)}", "API Usage Report")
         return []
 
-def get_conditions(filters):
-    try:
-        conditions = "WHERE 1=1"
-        
-        if filters and filters.get("method"):
-            conditions += f" AND method = '{frappe.db.escape(filters.get('method'))}'"
-        
-        if filters and filters.get("status_code"):
-            try:
-                status_code = int(filters.get('status_code'))
-                conditions += f" AND status_code = {status_code}"
-            except (ValueError, TypeError):
-                pass  # Skip invalid status codes
-        
-        if filters and filters.get("api_endpoint"):
-            conditions += f" AND api_endpoint LIKE '%{frappe.db.escape(filters.get('api_endpoint'))}%'"
-        
-        if filters and filters.get("from_date"):
-            from_date = filters.get('from_date')
-            conditions += f" AND DATE(timestamp) >= '{from_date}'"
-        
-        if filters and filters.get("to_date"):
-            to_date = filters.get('to_date')
-            conditions += f" AND DATE(timestamp) <= '{to_date}'"
-        
-        return conditions
-    except Exception as e:
-        frappe.log_error(f"Error building filter conditions: {str(e)}", "API Usage Report")
-        return "WHERE 1=1"
\ No newline at end of file
+def get_query(filters, limit=None):
+    """(query, values) for API Log rows, newest first; the report caps them at 1000, exports pass no limit"""
+    return REPORT_QUERY.build(filters, limit=limit)
+
+def format_row(row):
+    """Normalize numeric columns of a result row in place"""
+    row['status_code'] = int(row.get('status_code', 0) or 0)
+    row['request_size'] = int(row.get('request_size', 0) or 0)
+    row['response_size'] = int(row.get('response_size', 0) or 0)
+    return row
\ No newline at end of file
@@ -1,5 +1,38 @@
 import frappe
 from frappe import _
+from conference_management_system.conference_management_system.utils.report_filters import (
+    ReportFilter, ReportQuery, date_value
+)
+
+REPORT_QUERY = ReportQuery(
+    template="""
+        SELECT 
+            c.name,
+            c.conference_name,
+            c.status,
+            c.start_date,
+            c.end_date,
+            COALESCE(c.location, '') as location,
+            COALESCE(c.registration_fee, 0) as registration_fee,
+            COUNT(DISTINCT s.name) as total_sessions,
+            COUNT(DISTINCT r.attendee) as total_attendees,
+            COUNT(DISTINCT CASE WHEN r.payment_status = 'Paid' THEN r.name END) as paid_registrations,
+            COALESCE(SUM(CASE WHEN r.payment_status = 'Paid' THEN r.amount ELSE 0 END), 0) as revenue
+        FROM `tabConference` c
+        LEFT JOIN `tabSession` s ON c.name = s.conference
+        LEFT JOIN `tabRegistration` r ON c.name = r.conference
+        {conditions}
+        GROUP BY c.name, c.conference_name, c.status, c.start_date, c.end_date, c.location, c.registration_fee
+        {having}
+        ORDER BY c.start_date DESC
+        {limit}
+    """,
+    filters=[
+        ReportFilter("status", "c.status = %(status)s"),
+        ReportFilter("from_date", "c.start_date >= %(from_date)s", date_value),
+        ReportFilter("to_date", "c.end_date <= %(to_date)s", date_value)
+    ]
+)
 
 def execute(filters=None):
     columns = get_columns()
@@ -73,29 +106,10 @@ def get_columns():
 
 def get_data(filters):
     try:
-        conditions = get_conditions(filters)
+        query, values = get_query(filters)
         
         try:
-            data = frappe.db.sql(f"""
-                SELECT 
-                    c.name,
-                    c.conference_name,
-                    c.status,
-                    c.start_date,
-                    c.end_date,
-                    COALESCE(c.location, '') as location,
-                    COALESCE(c.registration_fee, 0) as registration_fee,
-                    COUNT(DISTINCT s.name) as total_sessions,
-                    COUNT(DISTINCT r.attendee) as total_attendees,
-                    COUNT(DISTINCT CASE WHEN r.payment_status = 'Paid' THEN r.name END) as paid_registrations,
-                    COALESCE(SUM(CASE WHEN r.payment_status = 'Paid' THEN r.amount ELSE 0 END), 0) as revenue
-                FROM `tabConference` c
-                LEFT JOIN `tabSession` s ON c.name = s.conference
-                LEFT JOIN `tabRegistration` r ON c.name = r.conference
-                {conditions}
-                GROUP BY c.name, c.conference_name, c.status, c.start_date, c.end_date, c.location, c.registration_fee
-                ORDER BY c.start_date DESC
-            """, as_dict=True)
+            data = frappe.db.sql(query, values, as_dict=True)
         except Exception as sql_error:
             frappe.log_error(f"SQL query failed in conference report: {str(sql_error)}", "Conference Report")
             return []
@@ -103,11 +117,7 @@ def get_data(filters):
         # Clean up data
         try:
             for row in data:
-                row['total_sessions'] = int(row.get('total_sessions', 0) or 0)
-                row['total_attendees'] = int(row.get('total_attendees', 0) or 0)
-                row['paid_registrations'] = int(row.get('paid_registrations', 0) or 0)
-                row['revenue'] = float(row.get('revenue', 0) or 0)
-                row['registration_fee'] = float(row.get('registration_fee', 0) or 0)
+                format_row(row)
         except Exception as data_error:
             frappe.log_error(f"Error processing report data: {str(data_error)}", "Conference Report")
             return []
@@ -117,22 +127,15 @@ def get_data(filters):
         frappe.log_error(f"Error fetching conference report data: {str(e)}", "Conference Report")
         return []
 
-def get_conditions(filters):
-    try:
-        conditions = "WHERE 1=1"
-        
-        if filters and filters.get("status"):
-            conditions += f" AND c.status = '{frappe.db.escape(filters.get('status'))}'"
-        
-        if filters and filters.get("from_date"):
-            from_date = filters.get('from_date')
-            conditions += f" AND c.start_date >= '{from_date}'"
-        
-        if filters and filters.get("to_date"):
-            to_date = filters.get('to_date')
-            conditions += f" AND c.end_date <= '{to_date}'"
-        
-        return conditions
-    except Exception as e:
-        frappe.log_error(f"Error building filter conditions: {str(e)}", "Conference Report")
-        return "WHERE 1=1"
\ No newline at end of file
+def get_query(filters, limit=None):
+    """(query, values) for one row per conference; the report and exports both read every match"""
+    return REPORT_QUERY.build(filters, limit=limit)
+
+def format_row(row):
+    """Normalize numeric columns of a result row in place"""
+    row['total_sessions'] = int(row.get('total_sessions', 0) or 0)
+    row['total_attendees'] = int(row.get('total_attendees', 0) or 0)
+    row['paid_registrations'] = int(row.get('paid_registrations', 0) or 0)
+    row['revenue'] = float(row.get('revenue', 0) or 0)
+    row['registration_fee'] = float(row.get('registration_fee', 0) or 0)
+    return row
\ No newline at end of file
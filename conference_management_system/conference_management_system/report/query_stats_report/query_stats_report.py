@@ -0,0 +1,119 @@
+import frappe
+from frappe import _
+
+from conference_management_system.conference_management_system.utils.query_stats import get_query_stats
+
+SORT_FIELDS = ("total_ms", "max_ms", "avg_ms", "count", "rows")
+
+def execute(filters=None):
+    columns = get_columns()
+    data = get_data(filters or {})
+    return columns, data
+
+def get_columns():
+    return [
+        {
+            "label": _("API Endpoint"),
+            "fieldname": "api_endpoint",
+            "fieldtype": "Data",
+            "width": 200
+        },
+        {
+            "label": _("Fingerprint"),
+            "fieldname": "fingerprint",
+            "fieldtype": "Data",
+            "width": 110
+        },
+        {
+            "label": _("Query"),
+            "fieldname": "query",
+            "fieldtype": "Data",
+            "width": 400
+        },
+        {
+            "label": _("Calls"),
+            "fieldname": "count",
+            "fieldtype": "Int",
+            "width": 80
+        },
+        {
+            "label": _("Total ms"),
+            "fieldname": "total_ms",
+            "fieldtype": "Float",
+            "width": 100
+        },
+        {
+            "label": _("Avg ms"),
+            "fieldname": "avg_ms",
+            "fieldtype": "Float",
+            "width": 90
+        },
+        {
+            "label": _("Max ms"),
+            "fieldname": "max_ms",
+            "fieldtype": "Float",
+            "width": 90
+        },
+        {
+            "label": _("Rows"),
+            "fieldname": "rows",
+            "fieldtype": "Int",
+            "width": 90
+        },
+        {
+            "label": _("Avg Rows"),
+            "fieldname": "avg_rows",
+            "fieldtype": "Float",
+            "width": 90
+        },
+        {
+            "label": _("Slowest Example ms"),
+            "fieldname": "example_ms",
+            "fieldtype": "Float",
+            "width": 130
+        },
+        {
+            "label": _("Example Parameters"),
+            "fieldname": "example_parameters",
+            "fieldtype": "Data",
+            "width": 200
+        },
+        {
+            "label": _("Explain"),
+            "fieldname": "explain",
+            "fieldtype": "Data",
+            "width": 300
+        }
+    ]
+
+def get_data(filters):
+    try:
+        data = get_query_stats(filters.get("api_endpoint"))
+    except Exception as e:
+        frappe.log_error(f"Error fetching query stats: {str(e)}", "Query Stats Report")
+        return []
+
+    if filters.get("query"):
+        needle = filters.get("query").lower()
+        data = [row for row in data if needle in row["query"].lower()]
+    if filters.get("slow_only"):
+        data = [row for row in data if row["example"]]
+
+    sort_by = filters.get("sort_by") if filters.get("sort_by") in SORT_FIELDS else "total_ms"
+    data.sort(key=lambda row: row[sort_by], reverse=True)
+
+    for row in data:
+        format_row(row)
+    return data
+
+def format_row(row):
+    """Flatten the slowest example into display columns"""
+    example = row.pop("example", None) or {}
+    row["example_ms"] = example.get("duration_ms", 0)
+    row["example_parameters"] = example.get("value_types", "")
+    # One line per plan step: table, access type, key used and estimated rows
+    row["explain"] = "; ".join(
+        step.get("error") or f"{step.get('table')}: {step.get('type')} key={step.get('key')} rows={step.get('rows')}"
+        for step in example.get("explain") or []
+    )
+    return row
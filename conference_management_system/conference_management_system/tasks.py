@@ -1,5 +1,9 @@
 import frappe
 from conference_management_system.conference_management_system.utils.recommendation_engine import RecommendationEngine
+from conference_management_system.conference_management_system.utils.doc_cache import invalidate_cached_doc
+from conference_management_system.conference_management_system.utils.payment_processor import PaymentProcessor
+from conference_management_system.conference_management_system.utils.profiler import get_profile_retention_days
+from conference_management_system.conference_management_system.utils.session_catalog import bump_catalog_version
 
 def update_conference_status():
     """Daily task to update conference status based on dates"""
@@ -38,6 +42,8 @@ def update_conference_status():
                     if new_status:
                         try:
                             frappe.db.set_value("Conference", conf.name, "status", new_status)
+                            # set_value skips the controller hooks, so drop cached copies here
+                            invalidate_cached_doc("Conference", conf.name)
                             updated_count += 1
                         except Exception as update_error:
                             errors.append(f"Failed to update {conf.name}: {str(update_error)}")
@@ -48,6 +54,8 @@ def update_conference_status():
         
         try:
             if updated_count > 0:
+                # Status moves conferences in and out of the public catalog
+                bump_catalog_version()
                 frappe.db.commit()
                 frappe.log_error(f"Updated {updated_count} conference statuses", "Scheduled Task")
         except Exception as commit_error:
@@ -73,7 +81,7 @@ def send_weekly_recommendations():
         frappe.log_error(f"Unexpected error in send_weekly_recommendations: {str(e)}", "Scheduled Task")
 
 def cleanup_old_api_logs():
-    """Monthly task to cleanup old API logs (keep last 3 months)"""
+    """Monthly task to cleanup old API logs and their bodies (keep last 3 months) and expired API profiles"""
     try:
         try:
             three_months_ago = frappe.utils.add_months(frappe.utils.now(), -3)
@@ -90,6 +98,12 @@ def cleanup_old_api_logs():
             """, three_months_ago, as_dict=True)
             
             if count_result and count_result[0].get('count', 0) > 0:
+                # Bodies live in their own table keyed by log name, so remove them first
+                frappe.db.sql("""
+                    DELETE FROM `tabAPI Log Body`
+                    WHERE api_log IN (SELECT name FROM `tabAPI Log` WHERE timestamp < %s)
+                """, three_months_ago)
+                
                 # Delete old logs
                 frappe.db.sql("""
                     DELETE FROM `tabAPI Log` 
@@ -102,8 +116,24 @@ def cleanup_old_api_logs():
             frappe.log_error(f"Error deleting API logs: {str(delete_error)}", "Scheduled Task")
             return
         
+        deleted_profiles = 0
+        try:
+            # Profiles carry whole call trees, so they are kept for a shorter window
+            profile_cutoff = frappe.utils.add_days(frappe.utils.now(), -get_profile_retention_days())
+            deleted_profiles = frappe.db.count("API Profile", {"timestamp": ["<", profile_cutoff]})
+            if deleted_profiles:
+                frappe.db.sql("""
+                    DELETE FROM `tabAPI Profile`
+                    WHERE timestamp < %s
+                """, profile_cutoff)
+        except Exception as profile_error:
+            frappe.log_error(f"Error deleting API profiles: {str(profile_error)}", "Scheduled Task")
+            deleted_profiles = 0
+        
         try:
             frappe.db.commit()
+            if deleted_profiles > 0:
+                frappe.log_error(f"Cleaned up {deleted_profiles} old API profiles", "Scheduled Task")
             if deleted_count > 0:
                 frappe.log_error(f"Cleaned up {deleted_count} old API logs", "Scheduled Task")
             else:
@@ -114,3 +144,11 @@ def cleanup_old_api_logs():
     except Exception as e:
         frappe.log_error(f"Unexpected error in cleanup_old_api_logs: {str(e)}", "Scheduled Task")
 
+def reconcile_pending_payments():
+    """Resolve payments left Processing by gateway timeouts or lost async jobs"""
+    try:
+        summary = PaymentProcessor.reconcile_pending_payments()
+        if summary["checked"]:
+            frappe.log_error(f"Reconciled {summary['resolved']} of {summary['checked']} pending payments", "Scheduled Task")
+    except Exception as e:
+        frappe.log_error(f"Unexpected error in reconcile_pending_payments: {str(e)}", "Scheduled Task")
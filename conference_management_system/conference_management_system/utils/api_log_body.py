@@ -0,0 +1,41 @@
+import json
+
+import frappe
+
+from conference_management_system.conference_management_system.utils.compression import (
+    API_LOG_CODEC,
+    compress_to_text,
+    decompress_from_text,
+)
+
+BODY_PARTS = ("request_headers", "request_body", "response_body")
+
+
+def pack_api_log_body(request_headers, request_body, response_body):
+    """Compressed payload for API Log Body plus the byte sizes kept on the API Log row
+
+    The three parts are compressed together so repeated keys across them share one window
+    """
+    parts = {"request_headers": request_headers or "", "request_body": request_body or "", "response_body": response_body or ""}
+    payload = compress_to_text(json.dumps(parts, separators=(",", ":"), ensure_ascii=False), API_LOG_CODEC)
+    return payload, {
+        "request_size": len(parts["request_body"].encode("utf-8")),
+        "response_size": len(parts["response_body"].encode("utf-8")),
+        "stored_size": len(payload)
+    }
+
+def save_api_log_body(api_log, payload):
+    """Write the body row keyed by its API Log name, skipping document hooks"""
+    body_doc = frappe.new_doc("API Log Body")
+    body_doc.name = api_log
+    body_doc.api_log = api_log
+    body_doc.payload = payload
+    body_doc.db_insert()
+
+def get_api_log_body(api_log):
+    """Decompressed headers and bodies of one API Log, or None when none were stored"""
+    payload = frappe.db.get_value("API Log Body", api_log, "payload")
+    if not payload:
+        return None
+    parts = json.loads(decompress_from_text(payload))
+    return {part: parts.get(part, "") for part in BODY_PARTS}
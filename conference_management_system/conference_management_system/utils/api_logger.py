@@ -1,7 +1,30 @@
 import frappe
 import json
+import random
 import time
-from functools import wraps
+from functools import lru_cache, wraps
+from werkzeug.wrappers import Response
+from conference_management_system.conference_management_system.utils.api_log_body import pack_api_log_body, save_api_log_body
+from conference_management_system.conference_management_system.utils.profiler import start_profile
+from conference_management_system.conference_management_system.utils.query_stats import start_query_capture
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Size caps for logged request and response data
+LOG_FIELD_LIMIT = 10000
+LOG_LIST_LIMIT = 100
+LOG_VALUE_LIMIT = 1000
+
+# Share of 304 Not Modified responses that still get an API Log row
+NOT_MODIFIED_LOG_RATE = 0.01
+
+SENSITIVE_KEY_PARTS = frozenset(("password", "token", "secret", "key"))
+
+_JSON_SCALARS = (str, int, float, bool)
+_encoder = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False, default=str)
 
 def log_api_call(func):
     """Decorator to log API calls with complete data"""
@@ -35,11 +58,15 @@ def log_api_call(func):
         result = None
         status_code = 200
         error = None
+        queries = start_query_capture(func.__name__)
+        profile = start_profile(func.__name__)
         
         try:
             result = func(*args, **kwargs)
             # Determine status code from result
-            if isinstance(result, dict):
+            if isinstance(result, Response):
+                status_code = result.status_code
+            elif isinstance(result, dict):
                 if result.get('success') is False:
                     status_code = 400  # Bad request for business logic errors
                 elif result.get('error_type') == 'permission_error':
@@ -52,34 +79,47 @@ def log_api_call(func):
             result = {"success": False, "error": str(e), "error_type": "server_error"}
             status_code = 500
             error = str(e)
+        finally:
+            if profile:
+                profile.stop()
+            if queries:
+                queries.stop()
         
         # Calculate response time
         response_time = round((time.time() - start_time) * 1000, 2)
         
-        # Log using frappe ORM with error handling
-        try:
-            # Sanitize data for JSON serialization
-            safe_headers = _sanitize_for_json(request_data["headers"])
-            safe_form_dict = _sanitize_for_json(request_data["form_dict"])
-            safe_result = _sanitize_for_json(result)
-            
-            log_doc = frappe.new_doc("API Log")
-            log_doc.api_endpoint = func.__name__
-            log_doc.method = request_data["method"]
-            log_doc.request_headers = json.dumps(safe_headers, indent=2, default=str)[:10000]  # Limit size
-            log_doc.request_body = json.dumps(safe_form_dict, indent=2, default=str)[:10000]  # Limit size
-            log_doc.response_body = json.dumps(safe_result, indent=2, default=str)[:10000]  # Limit size
-            log_doc.status_code = status_code
-            log_doc.response_time = response_time
-            log_doc.ip_address = request_data["ip"]
-            log_doc.user_agent = (request_data["user_agent"] or "")[:500]  # Limit size
-            
-            log_doc.insert(ignore_permissions=True)
-            frappe.db.commit()
-            
-        except Exception as log_error:
-            frappe.log_error(f"API Log failed for {func.__name__}: {str(log_error)}", "API Logger")
-            # Don't fail the API call if logging fails
+        # Log using frappe ORM with error handling. Revalidated catalog hits are the
+        # cheapest responses we serve, so only a sample of 304s is logged
+        log_doc = None
+        if status_code != 304 or random.random() < NOT_MODIFIED_LOG_RATE:
+            try:
+                log_doc = frappe.new_doc("API Log")
+                log_doc.api_endpoint = func.__name__
+                log_doc.method = request_data["method"]
+                # Bodies go compressed into API Log Body; the log row keeps only their sizes
+                body_payload, body_sizes = pack_api_log_body(
+                    serialize_for_log(request_data["headers"]),
+                    serialize_for_log(request_data["form_dict"]),
+                    serialize_for_log(result)
+                )
+                log_doc.update(body_sizes)
+                log_doc.status_code = status_code
+                log_doc.response_time = response_time
+                log_doc.ip_address = request_data["ip"]
+                log_doc.user_agent = (request_data["user_agent"] or "")[:500]  # Limit size
+                
+                log_doc.insert(ignore_permissions=True)
+                save_api_log_body(log_doc.name, body_payload)
+                frappe.db.commit()
+                
+            except Exception as log_error:
+                frappe.log_error(f"API Log failed for {func.__name__}: {str(log_error)}", "API Logger")
+                # Don't fail the API call if logging fails
+        
+        if queries:
+            queries.flush()
+        if profile:
+            profile.save(log_doc.name if log_doc and not log_doc.is_new() else None)
         
         if error:
             raise Exception(error)
@@ -88,43 +128,45 @@ def log_api_call(func):
     
     return wrapper
 
-def _sanitize_for_json(data):
-    """Sanitize data for JSON serialization"""
+def serialize_for_log(data, limit=LOG_FIELD_LIMIT):
+    """Compact JSON for an API Log field, with sensitive keys masked, cut at limit characters"""
     try:
-        if data is None:
-            return {}
-        
-        if isinstance(data, dict):
-            sanitized = {}
-            for key, value in data.items():
-                try:
-                    # Skip sensitive fields
-                    if isinstance(key, str) and any(sensitive in key.lower() for sensitive in ['password', 'token', 'secret', 'key']):
-                        sanitized[key] = "[REDACTED]"
-                    else:
-                        sanitized[key] = _sanitize_value(value)
-                except Exception:
-                    sanitized[key] = "[ERROR_SERIALIZING]"
-            return sanitized
-        
-        return _sanitize_value(data)
-        
+        if isinstance(data, Response):
+            # Already serialized for the client; store those bytes instead of encoding again
+            return data.get_data(as_text=True)[:limit] if data.is_sequence else ""
+        redacted = _redact({} if data is None else data)
+        if orjson:
+            return orjson.dumps(redacted, option=orjson.OPT_NON_STR_KEYS)[:limit].decode("utf-8", "ignore")
+        return _bounded_encode(redacted, limit)
     except Exception:
-        return {"error": "Failed to sanitize data"}
+        return '{"error":"Failed to serialize data"}'
 
-def _sanitize_value(value):
-    """Sanitize individual values for JSON serialization"""
-    try:
-        if value is None:
-            return None
-        elif isinstance(value, (str, int, float, bool)):
-            return value
-        elif isinstance(value, (list, tuple)):
-            return [_sanitize_value(item) for item in value[:100]]  # Limit list size
-        elif isinstance(value, dict):
-            return _sanitize_for_json(value)
-        else:
-            return str(value)[:1000]  # Convert to string and limit size
-    except Exception:
-        return "[ERROR_SERIALIZING]"
+def _redact(value):
+    """JSON-safe copy of value in one pass: sensitive keys masked, lists and unknown objects capped"""
+    if value is None or isinstance(value, _JSON_SCALARS):
+        return value
+    if isinstance(value, dict):
+        return {
+            key: "[REDACTED]" if isinstance(key, str) and _is_sensitive(key) else _redact(item)
+            for key, item in value.items()
+        }
+    if isinstance(value, list | tuple):
+        return [_redact(item) for item in value[:LOG_LIST_LIMIT]]
+    return str(value)[:LOG_VALUE_LIMIT]
+
+@lru_cache(maxsize=4096)
+def _is_sensitive(key):
+    # Requests reuse a small set of header and form keys, so each is checked once per worker
+    lowered = key.lower()
+    return any(part in lowered for part in SENSITIVE_KEY_PARTS)
 
+def _bounded_encode(data, limit):
+    """Stream compact JSON and stop as soon as limit characters are written"""
+    chunks = []
+    size = 0
+    for chunk in _encoder.iterencode(data):
+        chunks.append(chunk)
+        size += len(chunk)
+        if size >= limit:
+            break
+    return "".join(chunks)[:limit]
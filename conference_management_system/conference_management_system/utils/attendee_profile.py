@@ -0,0 +1,75 @@
+import frappe
+
+# Registration, payment and preference changes invalidate explicitly; the TTL
+# bounds how long a renamed session or conference shows its old name
+PROFILE_CACHE_TTL = 600
+
+
+def get_attendee_profile(attendee_id):
+    """Attendee details, preferences and registration history, cached per attendee
+
+    Returns None when the attendee does not exist
+    """
+    cache_key = _cache_key(attendee_id)
+    profile = frappe.cache().get_value(cache_key)
+
+    if profile is None:
+        profile = _build_profile(attendee_id)
+        if profile is None:
+            return None
+        frappe.cache().set_value(cache_key, profile, expires_in_sec=PROFILE_CACHE_TTL)
+
+    return profile
+
+def invalidate_attendee_profile(*attendee_ids):
+    """Drop cached profiles now and again after commit, so no reader re-caches uncommitted state"""
+    cache_keys = [_cache_key(attendee_id) for attendee_id in set(attendee_ids) if attendee_id]
+    if not cache_keys:
+        return
+
+    frappe.cache().delete_value(cache_keys)
+    frappe.db.after_commit.add(lambda: frappe.cache().delete_value(cache_keys))
+
+def _build_profile(attendee_id):
+    """Assemble the profile from three queries selecting only the displayed columns"""
+    attendee = frappe.db.get_value("Attendee", attendee_id, ["name", "attendee_name", "email"], as_dict=True)
+    if not attendee:
+        return None
+
+    # Inner joins skip preferences and registrations whose session or conference was deleted
+    preferences = frappe.db.sql("""
+        SELECT p.session AS session_id, s.session_name, s.speaker, p.preference_type
+        FROM `tabAttendee Preference` p
+        JOIN `tabSession` s ON s.name = p.session
+        WHERE p.parent = %s AND p.parenttype = 'Attendee' AND p.parentfield = 'preferences'
+        ORDER BY p.idx
+    """, (attendee_id,), as_dict=True)
+
+    registrations = frappe.db.sql("""
+        SELECT r.name, r.registration_date, r.payment_status, r.conference, r.session,
+               c.conference_name, s.session_name, s.speaker, s.session_date, s.start_time, s.end_time
+        FROM `tabRegistration` r
+        JOIN `tabConference` c ON c.name = r.conference
+        JOIN `tabSession` s ON s.name = r.session
+        WHERE r.attendee = %s
+        ORDER BY r.registration_date DESC
+    """, (attendee_id,), as_dict=True)
+
+    for pref in preferences:
+        pref.preference_type = pref.preference_type or 'Interested'
+
+    for reg in registrations:
+        reg.session_name = reg.session_name or ''
+        reg.speaker = reg.speaker or ''
+        reg.session_date = str(reg.session_date) if reg.session_date else ''
+        reg.start_time = str(reg.start_time) if reg.start_time else ''
+        reg.end_time = str(reg.end_time) if reg.end_time else ''
+
+    return {
+        "attendee": attendee,
+        "preferences": preferences,
+        "registrations": registrations
+    }
+
+def _cache_key(attendee_id):
+    return f"cms:attendee_profile:{attendee_id}"
@@ -0,0 +1,83 @@
+import frappe
+
+from conference_management_system.conference_management_system.utils.session_catalog import (
+    get_conference_sessions,
+)
+
+AVAILABILITY_EVENT = "session_availability"
+
+# Expiry guards so a crashed flush job cannot leave a conference stuck; the lock one is
+# short because it only has to outlive the queue wait of a healthy flush
+PENDING_TTL = 300
+FLUSH_LOCK_TTL = 15
+
+
+def queue_availability_update(conference_id, session_id):
+    """Mark a session's availability as changed once the current transaction commits"""
+    if conference_id and session_id:
+        frappe.db.after_commit.add(lambda: _mark_pending(conference_id, session_id))
+
+def flush_availability_updates(conference_id):
+    """Background job: broadcast every session changed since the flush was queued
+
+    The lock taken when the flush was queued stays held until the batch is read, so every
+    change committed while the job waits or starts up joins this broadcast
+    """
+    cache = frappe.cache()
+    pending_key = cache.make_key(_pending_key(conference_id))
+
+    # Read the batch and release the lock in one transaction: a change landing after it
+    # finds the lock free and queues the next flush, and none can slip between the two
+    pipe = cache.pipeline(transaction=True)
+    pipe.smembers(pending_key)
+    pipe.delete(pending_key)
+    pipe.delete(cache.make_key(_lock_key(conference_id)))
+    members, _, _ = pipe.execute()
+
+    changed = {frappe.safe_decode(member) for member in members}
+    if not changed:
+        return
+
+    try:
+        sessions = get_conference_sessions(conference_id) or []
+        availability = {
+            session["name"]: {
+                "registered_count": session["registered_count"],
+                "available_spots": session["available_spots"]
+            }
+            for session in sessions if session["name"] in changed
+        }
+
+        frappe.publish_realtime(
+            AVAILABILITY_EVENT,
+            {"conference": conference_id, "sessions": availability},
+            doctype="Conference",
+            docname=conference_id
+        )
+    except Exception as e:
+        frappe.log_error(f"Error broadcasting availability for {conference_id}: {str(e)}", "Availability Feed")
+
+def _mark_pending(conference_id, session_id):
+    """Record the change and schedule a flush if this conference has none queued"""
+    try:
+        cache = frappe.cache()
+        pending_key = cache.make_key(_pending_key(conference_id))
+        pipe = cache.pipeline()
+        pipe.sadd(pending_key, session_id)
+        pipe.expire(pending_key, PENDING_TTL)
+        pipe.execute()
+
+        if cache.set(cache.make_key(_lock_key(conference_id)), 1, nx=True, ex=FLUSH_LOCK_TTL):
+            frappe.enqueue(
+                "conference_management_system.conference_management_system.utils.availability_feed.flush_availability_updates",
+                queue="short",
+                conference_id=conference_id
+            )
+    except Exception as e:
+        frappe.log_error(f"Error queueing availability update for {session_id}: {str(e)}", "Availability Feed")
+
+def _pending_key(conference_id):
+    return f"cms:availability_pending:{conference_id}"
+
+def _lock_key(conference_id):
+    return f"cms:availability_flush:{conference_id}"
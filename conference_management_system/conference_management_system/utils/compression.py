@@ -0,0 +1,92 @@
+import base64
+import zlib
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Stored payloads are "<codec>:<base64>" so the codec can change without rewriting old rows
+DEFAULT_CODEC = "zlib"
+ZLIB_LEVEL = 6
+ZSTD_LEVEL = 6
+
+# Preset dictionary for API Log bodies: fragments that recur in our headers and JSON payloads.
+# zlib favours the end of the dictionary, so the most common fragments come last. Never edit
+# it in place; stored rows name the version they were written with, so add a new one instead
+API_LOG_DICTIONARY_V1 = b"".join(s.encode() for s in (
+    '"Sec-Fetch-Dest":"empty","Sec-Fetch-Mode":"cors","Sec-Fetch-Site":"same-origin",',
+    '"Sec-Ch-Ua-Mobile":"?0","Sec-Ch-Ua-Platform":"\\"Windows\\"","Upgrade-Insecure-Requests":"1",',
+    '"X-Forwarded-For":"","X-Forwarded-Proto":"https","X-Real-Ip":"',
+    '"Origin":"https://","Referer":"https://","/app/admin-dashboard","/attendee-portal',
+    '"Content-Length":"","Content-Type":"application/x-www-form-urlencoded; charset=UTF-8",',
+    '"Content-Type":"application/json","X-Requested-With":"XMLHttpRequest",',
+    '"Cookie":"full_name=; sid=; system_user=no; user_id=; user_image=",',
+    '"X-Frappe-Csrf-Token":"","X-Frappe-Cmd":"",',
+    '"Accept-Language":"en-US,en;q=0.9","Accept-Encoding":"gzip, deflate, br, zstd",',
+    '"User-Agent":"Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/ Safari/537.36",',
+    '"Connection":"keep-alive","Accept":"application/json, text/javascript, */*; q=0.01",',
+    '{"Host":"',
+    '"registration_fee":,"location":"","status":"Upcoming","description":"","start_date":"","end_date":"",',
+    '"speaker":"","session_date":"","start_time":"","end_time":"","max_attendees":,"available_spots":,',
+    '"registered_count":,"is_full":false,"session_name":"","conference_name":"","conference":"",',
+    '"attendee":"","attendee_name":"","email":"@example.com","registration_date":"",',
+    '"payment_status":"Pending","payment_status":"Paid","amount":,"transaction_id":"","payment_method":"",',
+    '"registration_id":"REG-","session_id":"SES-","conference_id":"CONF-","preference_type":"Interested",',
+    '{"cmd":"conference_management_system.api.v1.',
+    '"error_type":"validation_error","error_type":"permission_error","error_type":"server_error",',
+    '{"success":false,"error":"","message":"',
+    '{"message":{"success":true,"data":[{"name":"',
+    '{"success":true,"data":{"name":"',
+    '{"success":true,"data":[{"name":"',
+))
+
+
+def _zlib_compress(data, dictionary=None):
+    compressor = zlib.compressobj(ZLIB_LEVEL, zdict=dictionary) if dictionary else zlib.compressobj(ZLIB_LEVEL)
+    return compressor.compress(data) + compressor.flush()
+
+def _zlib_decompress(data, dictionary=None):
+    decompressor = zlib.decompressobj(zdict=dictionary) if dictionary else zlib.decompressobj()
+    return decompressor.decompress(data) + decompressor.flush()
+
+def _zstd_dictionary(dictionary):
+    return zstandard.ZstdCompressionDict(dictionary, dict_type=zstandard.DICT_TYPE_RAWCONTENT)
+
+def _zstd_compress(data, dictionary):
+    return zstandard.ZstdCompressor(level=ZSTD_LEVEL, dict_data=_zstd_dictionary(dictionary)).compress(data)
+
+def _zstd_decompress(data, dictionary):
+    return zstandard.ZstdDecompressor(dict_data=_zstd_dictionary(dictionary)).decompress(data)
+
+# codec -> (compress, decompress, dictionary)
+CODECS = {
+    "zlib": (_zlib_compress, _zlib_decompress, None),
+    "zlib-d1": (_zlib_compress, _zlib_decompress, API_LOG_DICTIONARY_V1),
+    "zstd-d1": (_zstd_compress, _zstd_decompress, API_LOG_DICTIONARY_V1)
+}
+
+# Best codec this worker can write for API Log bodies; every worker can read zlib rows
+API_LOG_CODEC = "zstd-d1" if zstandard else "zlib-d1"
+
+
+def compress_to_text(data, codec=DEFAULT_CODEC):
+    """Compress bytes (or str, as UTF-8) into text that fits a Long Text field"""
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    compress, _, dictionary = _get_codec(codec)
+    payload = compress(data, dictionary)
+    return f"{codec}:{base64.b64encode(payload).decode('ascii')}"
+
+def decompress_from_text(text):
+    """Original bytes of a compress_to_text payload"""
+    codec, _, encoded = (text or "").partition(":")
+    _, decompress, dictionary = _get_codec(codec)
+    return decompress(base64.b64decode(encoded), dictionary)
+
+def _get_codec(codec):
+    if codec not in CODECS:
+        raise ValueError(f"Unknown compression codec: {codec}")
+    if codec.startswith("zstd") and not zstandard:
+        raise ValueError(f"Compression codec {codec} needs the zstandard package")
+    return CODECS[codec]
@@ -0,0 +1,183 @@
+import hashlib
+import time
+
+import frappe
+
+# Tables the dashboard reads; their row count and last modified time form the refresh token
+SOURCE_DOCTYPES = ("Conference", "Session", "Registration", "Mock Payment Details", "Mock Email Log", "API Log")
+
+PAYMENT_AGGREGATE_TTL = 3600
+
+# Pseudo source that moves every TIME_BUCKET_SECONDS. The API Log counts and the recent-activity
+# windows change with the clock (and with every logged call, this batch included) rather than with
+# table edits, so dashboard_stats refreshes them on this schedule instead of via a table fingerprint
+TIME_BUCKET = "time_bucket"
+TIME_BUCKET_SECONDS = 300
+
+
+class DashboardContext:
+    """Intermediate results shared by every query in one dashboard batch"""
+
+    def __init__(self):
+        self._source_state = None
+        self._payment_aggregate = None
+
+    def source_state(self):
+        """Row count and fingerprint per source table, read in one round trip"""
+        if self._source_state is None:
+            rows = frappe.db.sql(" UNION ALL ".join(
+                f"SELECT %s, COUNT(*), MAX(modified) FROM `tab{doctype}`" for doctype in SOURCE_DOCTYPES
+            ), SOURCE_DOCTYPES)
+            self._source_state = {
+                doctype: {
+                    "count": count or 0,
+                    "fingerprint": hashlib.sha1(f"{count}:{modified}".encode()).hexdigest()[:12]
+                }
+                for doctype, count, modified in rows
+            }
+            self._source_state[TIME_BUCKET] = {
+                "count": None,
+                "fingerprint": str(int(time.time() // TIME_BUCKET_SECONDS))
+            }
+        return self._source_state
+
+    def count(self, doctype):
+        return self.source_state()[doctype]["count"]
+
+    def fingerprint(self, doctype):
+        return self.source_state()[doctype]["fingerprint"]
+
+    def payment_aggregate(self):
+        """Successful payments grouped by method, from one scan reused until payments change"""
+        if self._payment_aggregate is None:
+            cache_key = f"cms:dashboard:payments:{self.fingerprint('Mock Payment Details')}"
+            aggregate = frappe.cache().get_value(cache_key)
+            if aggregate is None:
+                rows = frappe.db.sql("""
+                    SELECT payment_method, COUNT(*) AS count, SUM(amount) AS amount,
+                           SUM(processing_fee) AS processing_fee, SUM(net_amount) AS net_amount
+                    FROM `tabMock Payment Details`
+                    WHERE payment_status = 'Success'
+                    GROUP BY payment_method
+                """, as_dict=True)
+                aggregate = {
+                    "total_revenue": sum(float(row.amount or 0) for row in rows),
+                    "processing_fees": sum(float(row.processing_fee or 0) for row in rows),
+                    "net_revenue": sum(float(row.net_amount or 0) for row in rows),
+                    "payments": sum(row.count for row in rows),
+                    "payment_methods": {}
+                }
+                for row in rows:
+                    method = aggregate["payment_methods"].setdefault(row.payment_method or "Unknown", {"count": 0, "amount": 0})
+                    method["count"] += row.count
+                    method["amount"] += float(row.amount or 0)
+                frappe.cache().set_value(cache_key, aggregate, expires_in_sec=PAYMENT_AGGREGATE_TTL)
+            self._payment_aggregate = aggregate
+        return self._payment_aggregate
+
+
+def build_dashboard_stats(ctx):
+    """Headline counts and revenue for the admin dashboard"""
+    payments = ctx.payment_aggregate()
+    stats = {
+        "conferences": ctx.count("Conference"),
+        "sessions": ctx.count("Session"),
+        "registrations": ctx.count("Registration"),
+        "active_conferences": 0,
+        "total_revenue": payments["total_revenue"],
+        "processing_fees": payments["processing_fees"],
+        "net_revenue": payments["net_revenue"],
+        "email_logs": ctx.count("Mock Email Log"),
+        "recent_emails": 0,
+        "api_logs": ctx.count("API Log"),
+        "recent_api_calls": 0
+    }
+
+    try:
+        stats["active_conferences"] = frappe.db.count("Conference", {"status": ["in", ["Upcoming", "Ongoing"]]})
+    except Exception as e:
+        frappe.log_error(f"Error counting active conferences: {str(e)}", "Admin API")
+
+    try:
+        seven_days_ago = frappe.utils.add_days(frappe.utils.nowdate(), -7)
+        stats["recent_emails"] = frappe.db.count("Mock Email Log", {"sent_date": [">=", seven_days_ago]})
+    except Exception as e:
+        frappe.log_error(f"Error counting recent emails: {str(e)}", "Admin API")
+
+    try:
+        yesterday = frappe.utils.add_days(frappe.utils.nowdate(), -1)
+        stats["recent_api_calls"] = frappe.db.count("API Log", {"timestamp": [">=", yesterday]})
+    except Exception as e:
+        frappe.log_error(f"Error counting recent API calls: {str(e)}", "Admin API")
+
+    return stats
+
+def build_revenue_summary(ctx):
+    """Revenue totals, payment method breakdown and conversion rate"""
+    payments = ctx.payment_aggregate()
+    total_registrations = ctx.count("Registration")
+    return {
+        "total_revenue": payments["total_revenue"],
+        "processing_fees": payments["processing_fees"],
+        "net_revenue": payments["net_revenue"],
+        "paid_registrations": payments["payments"],
+        "conversion_rate": round(payments["payments"] / total_registrations * 100, 1) if total_registrations else 0,
+        "payment_methods": payments["payment_methods"]
+    }
+
+def build_recent_registrations(ctx):
+    """Latest registrations with attendee, session and payment details"""
+    registrations = frappe.db.sql("""
+        SELECT r.name, r.registration_date, r.payment_status, r.amount, r.payment_details,
+               c.conference_name, s.session_name, a.attendee_name, a.email as attendee_email,
+               p.payment_method, p.transaction_id
+        FROM `tabRegistration` r
+        LEFT JOIN `tabConference` c ON r.conference = c.name
+        LEFT JOIN `tabSession` s ON r.session = s.name
+        LEFT JOIN `tabAttendee` a ON r.attendee = a.name
+        LEFT JOIN `tabMock Payment Details` p ON r.payment_details = p.name
+        ORDER BY r.creation DESC
+        LIMIT 10
+    """, as_dict=True)
+
+    for reg in registrations:
+        for key, value in reg.items():
+            if value is None:
+                reg[key] = ''
+
+    return registrations
+
+# Query name -> (builder, source tables whose changes invalidate its result)
+DASHBOARD_QUERIES = {
+    "dashboard_stats": (build_dashboard_stats, ("Conference", "Session", "Registration", "Mock Payment Details", "Mock Email Log", TIME_BUCKET)),
+    "revenue_summary": (build_revenue_summary, ("Registration", "Mock Payment Details")),
+    "recent_registrations": (build_recent_registrations, ("Conference", "Session", "Registration", "Mock Payment Details"))
+}
+
+
+def run_dashboard_queries(queries, since=None):
+    """Run several dashboard queries against one shared context
+
+    since: the token from an earlier batch. Queries whose source tables are unchanged
+    since then are reported as unchanged instead of being rebuilt
+    """
+    ctx = DashboardContext()
+    since = since or {}
+    results = {}
+
+    for name in queries:
+        builder, sources = DASHBOARD_QUERIES[name]
+        if since and all(since.get(doctype) == ctx.fingerprint(doctype) for doctype in sources):
+            results[name] = {"unchanged": True}
+            continue
+
+        try:
+            results[name] = {"data": builder(ctx)}
+        except Exception as e:
+            frappe.log_error(f"Error running dashboard query {name}: {str(e)}", "Admin API")
+            results[name] = {"error": f"Failed to fetch {name.replace('_', ' ')}"}
+
+    return {
+        "results": results,
+        "token": {doctype: state["fingerprint"] for doctype, state in ctx.source_state().items()}
+    }
@@ -0,0 +1,230 @@
+import copy
+import json
+import os
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+
+import frappe
+
+# Reference doctypes read repeatedly while handling one request
+CACHED_DOCTYPES = ("Session", "Conference", "Attendee")
+
+# Read-mostly doctypes also shared across requests: process LRU in front of Redis
+SHARED_DOCTYPES = ("Session", "Conference")
+LOCAL_CACHE_SIZE = 1000         # entries per worker process
+LOCAL_ENTRY_MAX_AGE = 300       # seconds; safety bound on how long a local copy is trusted
+REDIS_DOC_TTL = 86400
+
+INVALIDATION_CHANNEL = "cms:doc_cache:invalidate"
+STATS_KEY = "cms:doc_cache:stats"
+STATS_FLUSH_EVERY = 100
+
+# (site, doctype, name) -> (version token, loaded_at, document dict)
+_local_cache = OrderedDict()
+_local_lock = threading.Lock()
+_stats = Counter()
+_unflushed_stats = Counter()
+_listener_pid = None
+
+
+def get_cached_doc(doctype, name):
+    """Load a document once per request and hand back the same instance afterwards
+
+    The returned document is shared, so callers must treat it as read-only.
+    Missing documents raise frappe.DoesNotExistError like frappe.get_doc
+    """
+    if doctype not in CACHED_DOCTYPES:
+        return frappe.get_doc(doctype, name)
+
+    docs = _request_docs()
+    key = (doctype, name)
+    doc = docs.get(key)
+    if doc is None:
+        doc = _get_shared_doc(doctype, name) if doctype in SHARED_DOCTYPES else frappe.get_doc(doctype, name)
+        docs[key] = doc
+    return doc
+
+def invalidate_cached_doc(doctype, name):
+    """Forget a document after it is saved or deleted so later reads see the change
+
+    Shared doctypes also get a new version once the transaction commits, and every
+    worker is told over Redis pub/sub to drop its local copy
+    """
+    _request_docs().pop((doctype, name), None)
+
+    if doctype in SHARED_DOCTYPES:
+        _evict_local((frappe.local.site, doctype, name))
+        frappe.db.after_commit.add(lambda: _publish_invalidation(doctype, name))
+
+def get_cache_stats():
+    """Hit, miss and eviction counters for this worker and for all workers combined"""
+    _flush_stats()
+
+    with _local_lock:
+        process = dict(_stats)
+        process["size"] = len(_local_cache)
+    process["capacity"] = LOCAL_CACHE_SIZE
+
+    cache = frappe.cache()
+    pipe = cache.pipeline()
+    pipe.hgetall(cache.make_key(STATS_KEY))
+    totals = {frappe.safe_decode(key): int(value) for key, value in pipe.execute()[0].items()}
+
+    return {"process": process, "all_workers": totals}
+
+def _get_shared_doc(doctype, name):
+    """Read through the process LRU and Redis, both keyed by the document version"""
+    _ensure_listener()
+
+    cache = frappe.cache()
+    version = _current_version(cache, doctype, name)
+    local_key = (frappe.local.site, doctype, name)
+
+    with _local_lock:
+        entry = _local_cache.get(local_key)
+        if entry and entry[0] == version and time.time() - entry[1] < LOCAL_ENTRY_MAX_AGE:
+            _local_cache.move_to_end(local_key)
+            data = entry[2]
+        else:
+            data = None
+
+    if data is not None:
+        _count("local_hits")
+    else:
+        redis_key = f"cms:doc:{doctype}:{name}:{version}"
+        data = cache.get_value(redis_key)
+        if data is not None:
+            _count("redis_hits")
+        else:
+            _count("misses")
+            data = frappe.get_doc(doctype, name).as_dict()
+            # An open transaction can read from a snapshot older than the commit that set this
+            # version, or a commit can move the version during the load. Either way the copy is
+            # returned but not cached
+            if not _matches_version(data, version) or _current_version(cache, doctype, name) != version:
+                _count("uncached_reads")
+                return frappe.get_doc(copy.deepcopy(data))
+            cache.set_value(redis_key, data, expires_in_sec=REDIS_DOC_TTL)
+        _store_local(local_key, version, data)
+
+    return frappe.get_doc(copy.deepcopy(data))
+
+def _current_version(cache, doctype, name):
+    """Version token of a document, seeding a fresh one when Redis has none
+
+    Tokens are random rather than counters, so a version key lost to eviction can never
+    come back with a value that matches a copy cached before it was lost
+    """
+    version_key = cache.make_key(_version_key(doctype, name))
+    version = cache.get(version_key)
+    if version is None:
+        cache.set(version_key, _new_version(), nx=True)
+        version = cache.get(version_key)
+    return frappe.safe_decode(version)
+
+def _new_version(modified=None):
+    """Random token, prefixed with the committed modified time when it is known"""
+    return f"{modified or ''}|{uuid.uuid4().hex[:16]}"
+
+def _matches_version(data, version):
+    """False when a loaded copy is older than the commit that set the version"""
+    modified = version.partition("|")[0]
+    return not modified or str(data.get("modified")) == modified
+
+def _store_local(local_key, version, data):
+    evicted = 0
+    with _local_lock:
+        _local_cache[local_key] = (version, time.time(), data)
+        _local_cache.move_to_end(local_key)
+        while len(_local_cache) > LOCAL_CACHE_SIZE:
+            _local_cache.popitem(last=False)
+            evicted += 1
+    if evicted:
+        _count("evictions", evicted)
+
+def _evict_local(local_key):
+    with _local_lock:
+        _local_cache.pop(local_key, None)
+
+def _publish_invalidation(doctype, name):
+    """Move the document version and broadcast the change to other workers"""
+    try:
+        cache = frappe.cache()
+        # Runs after commit, so this read sees the committed row (None once deleted)
+        modified = frappe.db.get_value(doctype, name, "modified")
+        cache.set(cache.make_key(_version_key(doctype, name)), _new_version(modified))
+        cache.publish(INVALIDATION_CHANNEL, json.dumps({"site": frappe.local.site, "doctype": doctype, "name": name}))
+        _evict_local((frappe.local.site, doctype, name))
+        _count("invalidations")
+    except Exception as e:
+        frappe.log_error(f"Error invalidating {doctype} {name}: {str(e)}", "Document Cache")
+
+def _ensure_listener():
+    """Start one pub/sub listener per worker process (again after a fork)"""
+    global _listener_pid
+    pid = os.getpid()
+    if _listener_pid == pid:
+        return
+
+    with _local_lock:
+        if _listener_pid == pid:
+            return
+        _listener_pid = pid
+        # Entries inherited from a parent process were never tracked by a listener
+        _local_cache.clear()
+
+    try:
+        pubsub = frappe.cache().pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(INVALIDATION_CHANNEL)
+        threading.Thread(target=_listen, args=(pubsub,), name="cms-doc-cache-listener", daemon=True).start()
+    except Exception as e:
+        _listener_pid = None
+        frappe.log_error(f"Error starting document cache listener: {str(e)}", "Document Cache")
+
+def _listen(pubsub):
+    global _listener_pid
+    try:
+        for message in pubsub.listen():
+            data = json.loads(message["data"])
+            _evict_local((data["site"], data["doctype"], data["name"]))
+    except Exception:
+        # Lost the subscription: start clean and let the next read subscribe again
+        with _local_lock:
+            _local_cache.clear()
+            _listener_pid = None
+
+def _count(name, amount=1):
+    with _local_lock:
+        _stats[name] += amount
+        _unflushed_stats[name] += amount
+        pending = sum(_unflushed_stats.values())
+    if pending >= STATS_FLUSH_EVERY:
+        _flush_stats()
+
+def _flush_stats():
+    """Add this worker's counters to the shared totals in one round trip"""
+    with _local_lock:
+        pending = dict(_unflushed_stats)
+        _unflushed_stats.clear()
+    if not pending:
+        return
+
+    try:
+        cache = frappe.cache()
+        pipe = cache.pipeline()
+        for name, amount in pending.items():
+            pipe.hincrby(cache.make_key(STATS_KEY), name, amount)
+        pipe.execute()
+    except Exception as e:
+        frappe.log_error(f"Error saving document cache stats: {str(e)}", "Document Cache")
+
+def _version_key(doctype, name):
+    return f"cms:doc_version:{doctype}:{name}"
+
+def _request_docs():
+    # frappe.local is torn down at the end of every request and background job
+    if not hasattr(frappe.local, "cms_doc_cache"):
+        frappe.local.cms_doc_cache = {}
+    return frappe.local.cms_doc_cache
@@ -1,7 +1,40 @@
 import frappe
 from frappe.utils import get_url
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+from conference_management_system.conference_management_system.utils.identity import resolve_attendee
 
-def mock_sendmail(recipients, subject, message, email_type="General", reference_doctype=None, reference_name=None):
+# Email kinds: subject template, body template and Mock Email Log type
+EMAIL_TEMPLATES = {
+    "registration_confirmation": {
+        "subject": "Registration Confirmed - {{ session_name }}",
+        "template": "registration_confirmation.html",
+        "email_type": "Registration Confirmation"
+    },
+    "payment_confirmation": {
+        "subject": "Payment Confirmed - {{ session_name }}",
+        "template": "payment_confirmation.html",
+        "email_type": "Payment Confirmation"
+    },
+    "session_recommendations": {
+        "subject": "Recommended Sessions for You",
+        "template": "session_recommendations.html",
+        "email_type": "Session Recommendations"
+    },
+    "otp_verification": {
+        "subject": "Your verification code",
+        "template": "otp_verification.html",
+        "email_type": "OTP Verification"
+    }
+}
+
+OTP_EXPIRY_MINUTES = 10
+
+# Compiled once per process; Jinja keeps the compiled templates on the environment
+_jenv = None
+_compiled = {}
+
+
+def mock_sendmail(recipients, subject, message, email_type="General", reference_doctype=None, reference_name=None, commit=True):
     """Mock email sending - logs email instead of sending"""
     try:
         for recipient in recipients if isinstance(recipients, list) else [recipients]:
@@ -15,141 +48,171 @@ def mock_sendmail(recipients, subject, message, email_type="General", reference_
             email_log.reference_name = reference_name
             email_log.insert(ignore_permissions=True)
         
-        frappe.db.commit()
+        if commit:
+            frappe.db.commit()
         return True
     except Exception as e:
         frappe.log_error(f"Failed to log mock email: {str(e)}", "Mock Email Service")
         return False
 
+def render_email(kind, context):
+    """Render (subject, message) for one email kind"""
+    return render_emails(kind, [context])[0]
+
+def render_emails(kind, contexts):
+    """Render (subject, message) pairs for many contexts in one pass over the compiled templates"""
+    subject_template, body_template = _get_templates(kind)
+    return [(subject_template.render(context), body_template.render(context)) for context in contexts]
+
 def send_registration_confirmation(registration_doc):
     """Send registration confirmation email (mock)"""
+    send_registration_confirmations([registration_doc])
+
+def send_registration_confirmations(registrations, commit=True):
+    """Send registration confirmation emails for many registrations (mock)"""
     try:
-        attendee = frappe.get_doc("Attendee", registration_doc.attendee)
-        session = frappe.get_doc("Session", registration_doc.session)
-        conference = frappe.get_doc("Conference", registration_doc.conference)
-        
-        subject = f"Registration Confirmed - {session.session_name}"
-        
-        message = f"""
-        <h3>Registration Confirmation</h3>
-        <p>Dear {attendee.attendee_name},</p>
-        
-        <p>Your registration has been confirmed for:</p>
-        
-        <div style="background: #f8f9fa; padding: 15px; border-radius: 5px; margin: 15px 0;">
-            <h4>{session.session_name}</h4>
-            <p><strong>Conference:</strong> {conference.conference_name}</p>
-            <p><strong>Speaker:</strong> {session.speaker}</p>
-            <p><strong>Date:</strong> {conference.start_date}</p>
-            <p><strong>Time:</strong> {session.start_time} - {session.end_time}</p>
-            <p><strong>Location:</strong> {conference.location}</p>
-        </div>
-        
-        <p><strong>Registration Details:</strong></p>
-        <ul>
-            <li>Registration ID: {registration_doc.name}</li>
-            <li>Invoice ID: {registration_doc.invoice_id}</li>
-            <li>Amount: ₹{registration_doc.amount}</li>
-            <li>Payment Status: {registration_doc.payment_status}</li>
-        </ul>
-        
-        {f'<p><strong>Join Link:</strong> <a href="{registration_doc.join_link}">Click here to join the session</a></p>' if registration_doc.join_link else ''}
-        
-        <p>Thank you for registering!</p>
-        """
-        
-        mock_sendmail(
-            recipients=[attendee.email],
-            subject=subject,
-            message=message,
-            email_type="Registration Confirmation",
-            reference_doctype="Registration",
-            reference_name=registration_doc.name
-        )
-        
+        _send_registration_emails("registration_confirmation", registrations, commit)
     except Exception as e:
         frappe.log_error(f"Failed to send registration confirmation: {str(e)}", "Email Service")
 
-def send_payment_confirmation(registration_doc):
+def send_payment_confirmation(registration_doc, commit=True):
     """Send payment confirmation email (mock)"""
+    send_payment_confirmations([registration_doc], commit=commit)
+
+def send_payment_confirmations(registrations, commit=True):
+    """Send payment confirmation emails for many registrations (mock)"""
     try:
-        attendee = frappe.get_doc("Attendee", registration_doc.attendee)
-        session = frappe.get_doc("Session", registration_doc.session)
-        
-        subject = f"Payment Confirmed - {session.session_name}"
-        
-        message = f"""
-        <h3>Payment Confirmation</h3>
-        <p>Dear {attendee.attendee_name},</p>
-        
-        <p>Your payment has been successfully processed!</p>
-        
-        <div style="background: #d4edda; padding: 15px; border-radius: 5px; margin: 15px 0;">
-            <h4>Payment Details</h4>
-            <p><strong>Amount Paid:</strong> ₹{registration_doc.amount}</p>
-            <p><strong>Invoice ID:</strong> {registration_doc.invoice_id}</p>
-            <p><strong>Session:</strong> {session.session_name}</p>
-            <p><strong>Status:</strong> Confirmed</p>
-        </div>
-        
-        {f'<p><strong>Join Link:</strong> <a href="{registration_doc.join_link}">Click here to join the session</a></p>' if registration_doc.join_link else ''}
-        
-        <p>We look forward to seeing you at the conference!</p>
-        """
-        
-        mock_sendmail(
-            recipients=[attendee.email],
-            subject=subject,
-            message=message,
-            email_type="Payment Confirmation",
-            reference_doctype="Registration",
-            reference_name=registration_doc.name
-        )
-        
+        _send_registration_emails("payment_confirmation", registrations, commit)
     except Exception as e:
         frappe.log_error(f"Failed to send payment confirmation: {str(e)}", "Email Service")
 
 def send_session_recommendations(attendee_email, recommendations):
     """Send session recommendations email (mock)"""
     try:
-        attendee = frappe.get_doc("Attendee", {"email": attendee_email})
-        
-        if not recommendations:
+        attendee_id = resolve_attendee(attendee_email)
+        if not attendee_id or not recommendations:
             return
-            
-        subject = "Recommended Sessions for You"
-        
-        recommendations_html = ""
-        for rec in recommendations:
-            recommendations_html += f"""
-            <div style="border: 1px solid #ddd; padding: 10px; margin: 10px 0; border-radius: 5px;">
-                <h4>{rec.session_name}</h4>
-                <p><strong>Speaker:</strong> {rec.speaker}</p>
-                <p><strong>Conference:</strong> {rec.conference_name}</p>
-                <p><strong>Time:</strong> {rec.start_time} - {rec.end_time}</p>
-            </div>
-            """
-        
-        message = f"""
-        <h3>Recommended Sessions</h3>
-        <p>Dear {attendee.attendee_name},</p>
         
-        <p>Based on your interests, we recommend these upcoming sessions:</p>
+        attendee_name = frappe.db.get_value("Attendee", attendee_id, "attendee_name")
+        send_session_recommendations_batch([{
+            "name": attendee_id,
+            "email": attendee_email,
+            "attendee_name": attendee_name,
+            "recommendations": recommendations
+        }])
         
-        {recommendations_html}
-        
-        <p>Visit the conference portal to register for these sessions.</p>
-        """
+    except Exception as e:
+        frappe.log_error(f"Failed to send recommendations: {str(e)}", "Email Service")
+
+def send_session_recommendations_batch(items, commit=True):
+    """Send recommendation emails to many attendees
+
+    items: dicts with name, email, attendee_name and recommendations
+    """
+    try:
+        items = [item for item in items if item.get("recommendations")]
+        messages = render_emails("session_recommendations", items)
+        email_type = EMAIL_TEMPLATES["session_recommendations"]["email_type"]
+        
+        for item, (subject, message) in zip(items, messages, strict=True):
+            mock_sendmail(
+                recipients=[item["email"]],
+                subject=subject,
+                message=message,
+                email_type=email_type,
+                reference_doctype="Attendee",
+                reference_name=item["name"],
+                commit=False
+            )
+        
+        if commit:
+            frappe.db.commit()
         
+    except Exception as e:
+        frappe.log_error(f"Failed to send recommendations: {str(e)}", "Email Service")
+
+def send_otp_email(email, otp):
+    """Send email verification code (mock)"""
+    try:
+        subject, message = render_email("otp_verification", {"otp": otp, "expiry_minutes": OTP_EXPIRY_MINUTES})
         mock_sendmail(
-            recipients=[attendee_email],
+            recipients=[email],
             subject=subject,
             message=message,
-            email_type="Session Recommendations",
+            email_type=EMAIL_TEMPLATES["otp_verification"]["email_type"],
             reference_doctype="Attendee",
-            reference_name=attendee.name
+            reference_name=resolve_attendee(email)
         )
-        
     except Exception as e:
-        frappe.log_error(f"Failed to send recommendations: {str(e)}", "Email Service")
+        frappe.log_error(f"Failed to send OTP email: {str(e)}", "Email Service")
 
+def _send_registration_emails(kind, registrations, commit):
+    """Render and log one email per registration, loading the context in one query"""
+    contexts = _load_registration_contexts(registrations)
+    messages = render_emails(kind, contexts)
+    email_type = EMAIL_TEMPLATES[kind]["email_type"]
+    
+    for context, (subject, message) in zip(contexts, messages, strict=True):
+        mock_sendmail(
+            recipients=[context["email"]],
+            subject=subject,
+            message=message,
+            email_type=email_type,
+            reference_doctype="Registration",
+            reference_name=context["name"],
+            commit=False
+        )
+    
+    if commit:
+        frappe.db.commit()
+
+def _load_registration_contexts(registrations):
+    """Attendee, session and conference columns for many registrations in one query
+
+    Values on the passed registrations win, since they may be newer than the stored row
+    """
+    if not registrations:
+        return []
+    
+    rows = frappe.db.sql("""
+        SELECT r.name, a.attendee_name, a.email,
+               s.session_name, s.speaker, s.start_time, s.end_time,
+               c.conference_name, c.start_date, c.location
+        FROM `tabRegistration` r
+        JOIN `tabAttendee` a ON a.name = r.attendee
+        JOIN `tabSession` s ON s.name = r.session
+        JOIN `tabConference` c ON c.name = r.conference
+        WHERE r.name IN %s
+    """, (tuple(reg.name for reg in registrations),), as_dict=True)
+    details = {row.name: row for row in rows}
+    
+    contexts = []
+    for reg in registrations:
+        row = details.get(reg.name)
+        if not row:
+            continue
+        context = dict(row)
+        for field in ("invoice_id", "amount", "payment_status", "join_link"):
+            context[field] = reg.get(field)
+        contexts.append(context)
+    return contexts
+
+def _get_templates(kind):
+    """Compiled (subject, body) templates for an email kind, built on first use"""
+    templates = _compiled.get(kind)
+    if templates is None:
+        config = EMAIL_TEMPLATES[kind]
+        jenv = _get_jenv()
+        templates = (jenv.from_string(config["subject"]), jenv.get_template(config["template"]))
+        _compiled[kind] = templates
+    return templates
+
+def _get_jenv():
+    global _jenv
+    if _jenv is None:
+        _jenv = Environment(
+            loader=FileSystemLoader(frappe.get_app_path("conference_management_system", "templates", "emails")),
+            autoescape=select_autoescape(["html"], default_for_string=False),
+            auto_reload=False
+        )
+    return _jenv
\ No newline at end of file
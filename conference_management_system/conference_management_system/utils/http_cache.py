@@ -0,0 +1,54 @@
+import hashlib
+
+import frappe
+from werkzeug.http import http_date, parse_date
+from werkzeug.wrappers import Response
+
+
+def make_snapshot(payload, modified):
+    """Serialize an API payload once and derive its ETag from the content"""
+    body = frappe.as_json({"message": payload}, indent=None, separators=(",", ":")).encode()
+    return {
+        "body": body,
+        "etag": hashlib.sha1(body).hexdigest(),
+        "modified": modified
+    }
+
+def catalog_response(snapshot, max_age, public=True):
+    """Return the snapshot with validators, Cache-Control and Vary, or a 304 for a matching conditional GET"""
+    if public:
+        cache_control = f"public, max-age={max_age}, stale-while-revalidate={max_age}"
+    else:
+        cache_control = "private, no-cache"
+
+    headers = {
+        "ETag": f'"{snapshot["etag"]}"',
+        "Last-Modified": http_date(int(snapshot["modified"])),
+        "Cache-Control": cache_control,
+        # Guests and signed-in users share the URL, so shared caches must key on the credentials
+        "Vary": "Cookie, Authorization"
+    }
+
+    if _is_not_modified(snapshot):
+        return Response(status=304, headers=headers)
+
+    return Response(snapshot["body"], status=200, mimetype="application/json", headers=headers)
+
+def not_found_response(message):
+    """JSON 404 that browsers and proxies must not store"""
+    body = frappe.as_json({"message": {"success": False, "error": message}}, indent=None, separators=(",", ":"))
+    return Response(body, status=404, mimetype="application/json", headers={"Cache-Control": "no-store"})
+
+def _is_not_modified(snapshot):
+    """Evaluate If-None-Match, falling back to If-Modified-Since"""
+    request = frappe.request
+    if not request or request.method not in ("GET", "HEAD"):
+        return False
+
+    if_none_match = request.headers.get("If-None-Match")
+    if if_none_match:
+        tags = {tag.strip().removeprefix("W/").strip('"') for tag in if_none_match.split(",")}
+        return snapshot["etag"] in tags or "*" in tags
+
+    since = parse_date(request.headers.get("If-Modified-Since"))
+    return bool(since) and int(snapshot["modified"]) <= since.timestamp()
@@ -0,0 +1,108 @@
+import frappe
+
+# Role and attendee changes invalidate explicitly; the TTL is only a safety net
+IDENTITY_CACHE_TTL = 300
+
+# Email -> Attendee mappings; misses are cached briefly so unknown users cost one query a minute
+ATTENDEE_CACHE_TTL = 6 * 3600
+ATTENDEE_MISS_TTL = 60
+
+ADMIN_ROLES = ("System Manager", "Conference Admin")
+
+
+def get_attendee_email(user):
+    """Attendee email used for a user (Administrator has no real mailbox)"""
+    if user == 'Administrator':
+        return 'admin@system.local'
+    return (user or "").strip().lower()
+
+def resolve_attendee(user_or_email=None):
+    """Attendee ID for a user or email, or None when there is no attendee
+
+    Served from the request, then Redis, then the unique email index on Attendee
+    """
+    email = get_attendee_email(user_or_email or frappe.session.user)
+    if not email or email == "guest":
+        return None
+
+    resolved = _request_attendees()
+    if email in resolved:
+        return resolved[email]
+
+    cache_key = _attendee_cache_key(email)
+    attendee_id = frappe.cache().get_value(cache_key)
+    if attendee_id is None:
+        attendee_id = frappe.db.get_value("Attendee", {"email": email}, "name") or ""
+        frappe.cache().set_value(cache_key, attendee_id,
+            expires_in_sec=ATTENDEE_CACHE_TTL if attendee_id else ATTENDEE_MISS_TTL)
+
+    resolved[email] = attendee_id or None
+    return resolved[email]
+
+def invalidate_attendee_email(*emails):
+    """Forget email -> Attendee mappings after an attendee is created, renamed, re-addressed or deleted"""
+    emails = {get_attendee_email(email) for email in emails if email}
+    if not emails:
+        return
+
+    for email in emails:
+        _request_attendees().pop(email, None)
+
+    cache_keys = [_attendee_cache_key(email) for email in emails]
+    frappe.cache().delete_value(cache_keys)
+    frappe.db.after_commit.add(lambda: frappe.cache().delete_value(cache_keys))
+
+def get_attendee_user(email):
+    """User whose identity maps to an attendee email"""
+    if email == 'admin@system.local':
+        return 'Administrator'
+    return email
+
+def get_identity(user=None):
+    """Roles and attendee mapping for a user, cached per user"""
+    user = user or frappe.session.user
+    if not user or user == "Guest":
+        return {
+            "user": "Guest",
+            "roles": ["Guest"],
+            "attendee_id": None,
+            "email_verified": False
+        }
+
+    cache_key = _cache_key(user)
+    identity = frappe.cache().get_value(cache_key)
+    if identity is None:
+        attendee_id = resolve_attendee(user)
+        identity = {
+            "user": user,
+            "roles": frappe.get_roles(user),
+            "attendee_id": attendee_id,
+            "email_verified": bool(attendee_id and frappe.db.get_value("Attendee", attendee_id, "email_verified"))
+        }
+        frappe.cache().set_value(cache_key, identity, expires_in_sec=IDENTITY_CACHE_TTL)
+
+    return identity
+
+def invalidate_identity(*users):
+    """Drop cached identities now and again after commit"""
+    cache_keys = [_cache_key(user) for user in set(users) if user]
+    if not cache_keys:
+        return
+
+    frappe.cache().delete_value(cache_keys)
+    frappe.db.after_commit.add(lambda: frappe.cache().delete_value(cache_keys))
+
+def invalidate_user_identity(doc, method=None):
+    """doc_events hook: role or enabled-state changes on a User"""
+    invalidate_identity(doc.name)
+
+def _cache_key(user):
+    return f"cms:identity:{user}"
+
+def _attendee_cache_key(email):
+    return f"cms:attendee_for:{email}"
+
+def _request_attendees():
+    if not hasattr(frappe.local, "cms_attendee_for"):
+        frappe.local.cms_attendee_for = {}
+    return frappe.local.cms_attendee_for
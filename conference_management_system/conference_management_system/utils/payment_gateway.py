@@ -0,0 +1,268 @@
+import asyncio
+import hashlib
+import json
+import random
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+import frappe
+
+# Gateway response codes shared by every adapter
+GATEWAY_APPROVED = "00"
+GATEWAY_DECLINED = "05"
+GATEWAY_INSUFFICIENT_FUNDS = "51"
+GATEWAY_TIMEOUT = "91"             # no answer: the gateway may or may not have charged
+GATEWAY_BAD_RESPONSE = "30"        # answered with a body we could not parse
+GATEWAY_REJECTED = "12"            # refused the request itself (HTTP 4xx)
+GATEWAY_HTTP_ERROR = "96"          # kept failing with HTTP 5xx: the gateway may or may not have charged
+
+# Codes whose outcome is unknown; the payment stays open and is reconciled with the same key
+UNRESOLVED_CODES = (GATEWAY_TIMEOUT, GATEWAY_HTTP_ERROR)
+
+DEFAULT_GATEWAY_CONFIG = {
+    "adapter": "mock",          # mock (in process) or http (stand-in server / real gateway)
+    "url": "http://127.0.0.1:8787/charge",
+    "timeout": 5,               # seconds per gateway call
+    "retries": 2,               # extra attempts on timeout / connection errors / HTTP 5xx
+    "pool_size": 10,            # pooled keep-alive connections per worker
+    "latency_ms": 0,            # simulated latency for the mock adapter
+    "decline_rate": 0.15,
+    "timeout_rate": 0.05
+}
+
+# Outcomes remembered per idempotency key by the in-process stand-in
+MOCK_RESULT_CACHE_SIZE = 10000
+
+_gateway_cache = {}
+
+
+def get_gateway():
+    """Return the configured gateway adapter (site config key: payment_gateway)"""
+    config = dict(DEFAULT_GATEWAY_CONFIG)
+    config.update(frappe.conf.get("payment_gateway") or {})
+
+    cache_key = json.dumps(config, sort_keys=True)
+    if cache_key not in _gateway_cache:
+        adapter = HTTPGateway if config["adapter"] == "http" else MockGateway
+        _gateway_cache.clear()
+        _gateway_cache[cache_key] = adapter(config)
+
+    return _gateway_cache[cache_key]
+
+def make_idempotency_key(registration_id, attempt=1):
+    """Stable key for one payment attempt of a registration, reused across gateway retries"""
+    digest = hashlib.sha256(f"{registration_id}:{attempt}".encode()).hexdigest()
+    return f"IDEM_{digest[:32].upper()}"
+
+def is_unresolved(result):
+    """True when a gateway outcome is unknown and the charge has to be reconciled"""
+    return bool(result) and result["gateway_code"] in UNRESOLVED_CODES
+
+def gateway_result(success, message, gateway_code, gateway_transaction_id=None):
+    """Normalized gateway outcome returned by every adapter"""
+    return {
+        "success": success,
+        "message": message,
+        "gateway_code": gateway_code,
+        "gateway_transaction_id": gateway_transaction_id or f"GW_{uuid.uuid4().hex[:16].upper()}"
+    }
+
+
+class PaymentGateway:
+    """Adapter interface for payment gateways
+
+    charge() must be safe to call from worker threads, so adapters may not touch frappe.local
+    """
+
+    def __init__(self, config):
+        self.config = config
+
+    def charge(self, registration_id, amount, payment_method, idempotency_key):
+        raise NotImplementedError
+
+
+class MockGateway(PaymentGateway):
+    """In-process stand-in that simulates latency, declines and timeouts"""
+
+    def __init__(self, config):
+        super().__init__(config)
+        self._results = OrderedDict()
+        # charge() runs on batch pool threads
+        self._results_lock = threading.Lock()
+
+    def charge(self, registration_id, amount, payment_method, idempotency_key):
+        # A retried key returns the original outcome, as a real gateway would
+        with self._results_lock:
+            if idempotency_key in self._results:
+                return self._results[idempotency_key]
+
+        if self.config["latency_ms"]:
+            time.sleep(self.config["latency_ms"] / 1000.0)
+
+        result = _simulate_outcome(payment_method, self.config["decline_rate"], self.config["timeout_rate"])
+        if result["gateway_code"] != GATEWAY_TIMEOUT:
+            with self._results_lock:
+                # Another thread may have answered the same key meanwhile; keep the first outcome
+                result = self._results.setdefault(idempotency_key, result)
+                if len(self._results) > MOCK_RESULT_CACHE_SIZE:
+                    self._results.popitem(last=False)
+        return result
+
+
+class HTTPGateway(PaymentGateway):
+    """JSON over HTTP gateway client with pooled connections, per-call timeouts and retries"""
+
+    def __init__(self, config):
+        super().__init__(config)
+
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self._requests = requests
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=config["pool_size"])
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+
+    def charge(self, registration_id, amount, payment_method, idempotency_key):
+        payload = {
+            "reference": registration_id,
+            "amount": amount,
+            "payment_method": payment_method
+        }
+
+        unresolved = gateway_result(False, "Network timeout", GATEWAY_TIMEOUT)
+        for attempt in range(self.config["retries"] + 1):
+            if attempt:
+                time.sleep(0.1 * (2 ** (attempt - 1)))
+            try:
+                response = self._session.post(
+                    self.config["url"],
+                    json=payload,
+                    headers={"Idempotency-Key": idempotency_key},
+                    timeout=self.config["timeout"]
+                )
+            except (self._requests.Timeout, self._requests.ConnectionError):
+                # Safe to retry: the idempotency key stops the gateway charging twice
+                continue
+
+            if response.status_code >= 500:
+                # The gateway may have charged before failing, so retry with the same key
+                unresolved = gateway_result(False, f"Gateway error (HTTP {response.status_code})", GATEWAY_HTTP_ERROR)
+                continue
+            if response.status_code >= 400:
+                return gateway_result(False, f"Gateway rejected the request (HTTP {response.status_code})", GATEWAY_REJECTED)
+            try:
+                data = response.json()
+            except ValueError:
+                return gateway_result(False, "Invalid gateway response", GATEWAY_BAD_RESPONSE)
+            return gateway_result(
+                data.get("status") == "success",
+                data.get("message", ""),
+                data.get("gateway_code", GATEWAY_DECLINED),
+                data.get("transaction_id")
+            )
+
+        # Unknown outcome; callers keep the payment open and reconcile it with the same key
+        return unresolved
+
+
+def _simulate_outcome(payment_method, decline_rate, timeout_rate):
+    """Pick a gateway outcome using the configured decline and timeout rates"""
+    roll = random.random()
+    if roll < timeout_rate:
+        return gateway_result(False, "Network timeout", GATEWAY_TIMEOUT)
+    if roll < timeout_rate + decline_rate:
+        return random.choice([
+            gateway_result(False, "Insufficient funds", GATEWAY_INSUFFICIENT_FUNDS),
+            gateway_result(False, "Card declined", GATEWAY_DECLINED)
+        ])
+
+    message = "Payment completed via UPI" if payment_method == "UPI" else random.choice([
+        "Payment processed successfully", "Card payment successful"
+    ])
+    return gateway_result(True, message, GATEWAY_APPROVED)
+
+
+async def _handle_stand_in_connection(reader, writer, config, results):
+    """Serve keep-alive HTTP/1.1 charge requests on one connection"""
+    try:
+        while True:
+            request_line = await reader.readline()
+            if not request_line:
+                break
+
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                key, _, value = line.decode("latin-1").partition(":")
+                headers[key.strip().lower()] = value.strip()
+
+            body = await reader.readexactly(int(headers.get("content-length", 0) or 0))
+            payload = json.loads(body or b"{}")
+            idempotency_key = headers.get("idempotency-key") or uuid.uuid4().hex
+
+            latency = config["latency_ms"] + random.uniform(0, config.get("jitter_ms", 0))
+            await asyncio.sleep(latency / 1000.0)
+
+            result = results.get(idempotency_key)
+            if not result:
+                result = _simulate_outcome(payload.get("payment_method"), config["decline_rate"], config["timeout_rate"])
+                if result["gateway_code"] == GATEWAY_TIMEOUT:
+                    # Hang past any sane client timeout instead of answering
+                    await asyncio.sleep(config.get("hang_seconds", 30))
+                    break
+                results[idempotency_key] = result
+
+            response = json.dumps({
+                "status": "success" if result["success"] else "failed",
+                "message": result["message"],
+                "gateway_code": result["gateway_code"],
+                "transaction_id": result["gateway_transaction_id"]
+            }).encode()
+            writer.write(
+                b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                + f"Content-Length: {len(response)}\r\n\r\n".encode()
+                + response
+            )
+            await writer.drain()
+    except (asyncio.IncompleteReadError, ConnectionResetError, ValueError):
+        pass
+    finally:
+        writer.close()
+
+async def serve_stand_in(host="127.0.0.1", port=8787, **overrides):
+    """Run the local latency-simulating gateway stand-in until cancelled"""
+    config = dict(DEFAULT_GATEWAY_CONFIG, jitter_ms=0, hang_seconds=30)
+    config.update(overrides)
+    results = {}
+
+    server = await asyncio.start_server(
+        lambda reader, writer: _handle_stand_in_connection(reader, writer, config, results), host, port)
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Local payment gateway stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8787)
+    parser.add_argument("--latency-ms", type=float, default=200)
+    parser.add_argument("--jitter-ms", type=float, default=50)
+    parser.add_argument("--decline-rate", type=float, default=0.15)
+    parser.add_argument("--timeout-rate", type=float, default=0.05)
+    args = parser.parse_args()
+
+    asyncio.run(serve_stand_in(
+        args.host, args.port,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        decline_rate=args.decline_rate,
+        timeout_rate=args.timeout_rate
+    ))
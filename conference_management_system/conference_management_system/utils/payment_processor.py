@@ -2,13 +2,77 @@ import frappe
 import random
 import uuid
 import json
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from conference_management_system.conference_management_system.utils.attendee_profile import invalidate_attendee_profile
+from conference_management_system.conference_management_system.utils.email_service import send_payment_confirmations
+from conference_management_system.conference_management_system.utils.payment_gateway import get_gateway, is_unresolved, make_idempotency_key
+
+# How long a payment result is replayed from cache for retried submissions
+IDEMPOTENCY_CACHE_SECONDS = 600
+
+# Upper bound on how long one submission holds the per-registration payment lock
+PAYMENT_LOCK_SECONDS = 60
+
+# Batch runs hold the locks for a whole chunk of gateway calls
+BATCH_PAYMENT_LOCK_SECONDS = 600
+
+# Processing payments older than this are re-sent to the gateway with their original key
+RECONCILE_AFTER_MINUTES = 5
 
 class PaymentProcessor:
     """Mock payment processor with comprehensive payment tracking"""
     
     @staticmethod
-    def process_payment(registration_id, payment_method="Credit Card", payment_data=None):
+    def submit_payment(registration_id, payment_method="Credit Card", payment_data=None,
+                       idempotency_key=None, async_payment=False):
+        """
+        Idempotent entry point for payment submission
+        Retries with the same key (or repeat submissions for an already paid registration)
+        return the original result without calling the gateway or writing new rows
+        Returns: dict with payment result
+        """
+        if idempotency_key:
+            # Scope client keys to the registration so keys cannot collide across registrations
+            idempotency_key = make_idempotency_key(registration_id, f"client:{idempotency_key}")
+        
+        replay = PaymentProcessor._replay_existing(registration_id, idempotency_key)
+        if replay:
+            return replay
+        
+        # Serialize submissions per registration so a double click cannot start two charges
+        lock_key = frappe.cache().make_key(f"cms:payment_lock:{registration_id}")
+        if not frappe.cache().set(lock_key, 1, ex=PAYMENT_LOCK_SECONDS, nx=True):
+            return {
+                "success": False,
+                "status": "Processing",
+                "error": "A payment for this registration is already in progress"
+            }
+        
+        try:
+            # A submission holding the lock may have finished between the check above and
+            # taking it; end the read snapshot so the re-check sees its committed payment
+            frappe.db.commit()
+            replay = PaymentProcessor._replay_existing(registration_id, idempotency_key)
+            if replay:
+                return replay
+            
+            if async_payment:
+                result = PaymentProcessor.start_async_payment(
+                    registration_id, payment_method, payment_data, idempotency_key=idempotency_key)
+            else:
+                result = PaymentProcessor.process_payment(
+                    registration_id, payment_method, payment_data, idempotency_key=idempotency_key)
+            
+            if result.get("payment_details"):
+                key = frappe.db.get_value("Mock Payment Details", result["payment_details"], "idempotency_key")
+                PaymentProcessor._remember_result(key, result)
+            return result
+        finally:
+            frappe.cache().delete(lock_key)
+    
+    @staticmethod
+    def process_payment(registration_id, payment_method="Credit Card", payment_data=None, idempotency_key=None):
         """
         Process payment for a registration with complete mock data
         Returns: dict with payment result
@@ -16,81 +80,423 @@ class PaymentProcessor:
         try:
             registration = frappe.get_doc("Registration", registration_id)
             
-            # Generate mock payment details based on method
-            mock_details = PaymentProcessor._generate_mock_payment_details(payment_method, payment_data)
-            
-            # Mock payment processing scenarios
-            payment_scenarios = [
-                {"success": True, "message": "Payment processed successfully", "gateway_code": "00"},
-                {"success": True, "message": "Payment completed via UPI", "gateway_code": "00"},
-                {"success": True, "message": "Card payment successful", "gateway_code": "00"},
-                {"success": False, "message": "Insufficient funds", "gateway_code": "51"},
-                {"success": False, "message": "Card declined", "gateway_code": "05"},
-                {"success": False, "message": "Network timeout", "gateway_code": "91"},
-            ]
-            
-            # 80% success rate for demo
-            weights = [0.3, 0.25, 0.25, 0.08, 0.07, 0.05]
-            result = random.choices(payment_scenarios, weights=weights)[0]
-            
-            # Generate transaction IDs
-            transaction_id = f"TXN_{uuid.uuid4().hex[:12].upper()}"
-            gateway_txn_id = f"GW_{uuid.uuid4().hex[:16].upper()}"
-            
-            # Calculate fees
-            processing_fee = round(registration.amount * 0.025, 2)  # 2.5% processing fee
-            net_amount = registration.amount - processing_fee
-            
-            # Create comprehensive payment record
-            payment_details = PaymentProcessor._create_payment_record(
-                registration_id, transaction_id, gateway_txn_id, payment_method,
-                registration.amount, processing_fee, net_amount, result, mock_details
-            )
+            # Gateway retries within this attempt reuse one idempotency key
+            idempotency_key = idempotency_key or make_idempotency_key(
+                registration_id, PaymentProcessor._next_attempt(registration_id))
             
-            if result["success"]:
-                # Update registration status and link payment details
-                registration.payment_status = "Paid"
-                if payment_details:
-                    registration.payment_details = payment_details.name
-                registration.save()
-                frappe.db.commit()
-                
-                return {
-                    "success": True,
-                    "transaction_id": transaction_id,
-                    "gateway_transaction_id": gateway_txn_id,
-                    "amount": registration.amount,
-                    "processing_fee": processing_fee,
-                    "net_amount": net_amount,
-                    "payment_method": payment_method,
-                    "payment_details": payment_details.name,
-                    "message": result["message"],
-                    "timestamp": datetime.now().isoformat()
-                }
-            else:
-                # Update registration status and link payment details
-                registration.payment_status = "Failed"
-                if payment_details:
-                    registration.payment_details = payment_details.name
-                registration.save()
-                frappe.db.commit()
-                
-                return {
-                    "success": False,
-                    "transaction_id": transaction_id,
-                    "gateway_transaction_id": gateway_txn_id,
-                    "error": result["message"],
-                    "payment_details": payment_details.name,
-                    "timestamp": datetime.now().isoformat()
-                }
-                
+            # Reserve the key with a Processing record before charging; the unique index
+            # makes a concurrent duplicate fail here instead of at the gateway
+            payment_doc = PaymentProcessor._create_pending_payment(
+                registration, payment_method, payment_data, idempotency_key)
+            
+            result = get_gateway().charge(registration_id, registration.amount, payment_method, idempotency_key)
+            
+            PaymentProcessor._apply_gateway_result(payment_doc, registration, result)
+            frappe.db.commit()
+            
+            return PaymentProcessor._result_from_record(payment_doc)
+            
+        except frappe.UniqueValidationError:
+            frappe.db.rollback()
+            existing = PaymentProcessor._find_existing_payment(registration_id, idempotency_key)
+            if existing:
+                return PaymentProcessor._result_from_record(existing, replayed=True)
+            return {
+                "success": False,
+                "error": "Duplicate payment submission"
+            }
         except Exception as e:
+            # Drop the reserved Processing record too, so it cannot be committed and orphaned
+            frappe.db.rollback()
             frappe.log_error(f"Payment processing error: {str(e)}", "Payment Processor")
             return {
                 "success": False,
                 "error": "Payment processing failed due to system error"
             }
     
+    @staticmethod
+    def start_async_payment(registration_id, payment_method="Credit Card", payment_data=None, idempotency_key=None):
+        """
+        Record a Processing payment and hand the gateway call to a background worker
+        The outcome is applied by complete_async_payment when the gateway answers
+        Returns: dict with the pending payment
+        """
+        try:
+            registration = frappe.get_doc("Registration", registration_id)
+            idempotency_key = idempotency_key or make_idempotency_key(
+                registration_id, PaymentProcessor._next_attempt(registration_id))
+            
+            payment_doc = PaymentProcessor._create_pending_payment(
+                registration, payment_method, payment_data, idempotency_key)
+            
+            frappe.enqueue(
+                "conference_management_system.conference_management_system.utils.payment_processor.run_async_payment",
+                queue="short",
+                enqueue_after_commit=True,
+                payment_details=payment_doc.name,
+                idempotency_key=idempotency_key,
+                user=frappe.session.user
+            )
+            frappe.db.commit()
+            
+            return PaymentProcessor._result_from_record(payment_doc)
+            
+        except frappe.UniqueValidationError:
+            frappe.db.rollback()
+            existing = PaymentProcessor._find_existing_payment(registration_id, idempotency_key)
+            if existing:
+                return PaymentProcessor._result_from_record(existing, replayed=True)
+            return {
+                "success": False,
+                "error": "Duplicate payment submission"
+            }
+        except Exception as e:
+            frappe.db.rollback()
+            frappe.log_error(f"Async payment submission error: {str(e)}", "Payment Processor")
+            return {
+                "success": False,
+                "error": "Payment processing failed due to system error"
+            }
+    
+    @staticmethod
+    def complete_async_payment(payment_details_name, result, user=None):
+        """Gateway callback: apply the outcome to the pending payment and its registration"""
+        try:
+            payment_doc = frappe.get_doc("Mock Payment Details", payment_details_name)
+            if payment_doc.payment_status != "Processing":
+                return  # Already completed by an earlier callback
+            
+            registration = frappe.get_doc("Registration", payment_doc.registration)
+            PaymentProcessor._apply_gateway_result(payment_doc, registration, result)
+            frappe.db.commit()
+            
+            PaymentProcessor._remember_result(
+                payment_doc.idempotency_key, PaymentProcessor._result_from_record(payment_doc))
+            
+            frappe.publish_realtime("payment_status", {
+                "registration_id": registration.name,
+                "payment_details": payment_doc.name,
+                "payment_status": registration.payment_status,
+                "message": result["message"]
+            }, user=user or payment_doc.owner)
+            
+        except Exception as e:
+            frappe.db.rollback()
+            frappe.log_error(f"Async payment completion error: {str(e)}", "Payment Processor")
+    
+    @staticmethod
+    def _create_pending_payment(registration, payment_method, payment_data, idempotency_key):
+        """Insert the Processing payment record that reserves an idempotency key"""
+        mock_details = PaymentProcessor._generate_mock_payment_details(payment_method, payment_data)
+        processing_fee, net_amount = PaymentProcessor._calculate_fees(registration.amount)
+        
+        payment_doc = frappe.new_doc("Mock Payment Details")
+        payment_doc.update(PaymentProcessor._build_payment_record(
+            registration.name, f"TXN_{uuid.uuid4().hex[:12].upper()}", None, payment_method,
+            registration.amount, processing_fee, net_amount, None, mock_details))
+        payment_doc.idempotency_key = idempotency_key
+        payment_doc.insert(ignore_permissions=True)
+        return payment_doc
+    
+    @staticmethod
+    def _apply_gateway_result(payment_doc, registration, result):
+        """Store a gateway outcome on the payment record and the registration"""
+        outcome = PaymentProcessor._build_payment_record(
+            payment_doc.registration, payment_doc.transaction_id, result["gateway_transaction_id"],
+            payment_doc.payment_method, payment_doc.amount, payment_doc.processing_fee,
+            payment_doc.net_amount, result, {})
+        payment_doc.update({key: outcome[key] for key in (
+            "gateway_transaction_id", "payment_status", "failure_reason", "gateway_response")})
+        payment_doc.save(ignore_permissions=True)
+        
+        if is_unresolved(result):
+            # The gateway may have charged; the registration stays Pending until reconciliation
+            return
+        
+        # Saving the registration fires the payment confirmation email on the Paid transition
+        registration.payment_status = "Paid" if result["success"] else "Failed"
+        registration.payment_details = payment_doc.name
+        registration.save(ignore_permissions=True)
+    
+    @staticmethod
+    def _result_from_record(payment_doc, replayed=False):
+        """Build the API result for a payment record, so replays match the original response"""
+        result = {
+            "success": payment_doc.payment_status in ("Success", "Processing"),
+            "transaction_id": payment_doc.transaction_id,
+            "gateway_transaction_id": payment_doc.gateway_transaction_id,
+            "payment_details": payment_doc.name,
+            "timestamp": frappe.utils.get_datetime(payment_doc.modified).isoformat()
+        }
+        
+        if payment_doc.payment_status == "Failed":
+            result["error"] = payment_doc.failure_reason
+        else:
+            message = "Payment submitted. You will be notified once it is confirmed."
+            if payment_doc.payment_status == "Success":
+                message = json.loads(payment_doc.gateway_response or "{}").get("message", "Payment processed successfully")
+            result.update({
+                "amount": payment_doc.amount,
+                "processing_fee": payment_doc.processing_fee,
+                "net_amount": payment_doc.net_amount,
+                "payment_method": payment_doc.payment_method,
+                "message": message
+            })
+        
+        if payment_doc.payment_status == "Processing":
+            result["status"] = "Processing"
+        if replayed:
+            result["idempotent_replay"] = True
+        return result
+    
+    @staticmethod
+    def _find_existing_payment(registration_id, idempotency_key):
+        """Payment that a retry should replay: same idempotency key, the one that paid the
+        registration, or one still in flight (async, or awaiting reconciliation after a timeout)"""
+        name = None
+        if idempotency_key:
+            name = frappe.db.get_value("Mock Payment Details", {"idempotency_key": idempotency_key}, "name")
+        
+        if not name:
+            registration = frappe.db.get_value("Registration", registration_id,
+                ["payment_status", "payment_details"], as_dict=True)
+            if registration and registration.payment_status == "Paid" and registration.payment_details:
+                name = registration.payment_details
+        
+        if not name:
+            name = frappe.db.get_value("Mock Payment Details",
+                {"registration": registration_id, "payment_status": "Processing"},
+                "name", order_by="creation desc")
+        
+        return frappe.get_doc("Mock Payment Details", name) if name else None
+    
+    @staticmethod
+    def _replay_existing(registration_id, idempotency_key):
+        """Original result of a repeat submission, or None when a new attempt is needed"""
+        cached = PaymentProcessor._get_cached_result(idempotency_key)
+        if cached:
+            return cached
+        
+        existing = PaymentProcessor._find_existing_payment(registration_id, idempotency_key)
+        if existing:
+            return PaymentProcessor._remember_result(
+                idempotency_key, PaymentProcessor._result_from_record(existing, replayed=True))
+        return None
+    
+    @staticmethod
+    def _get_cached_result(idempotency_key):
+        """Short-lived dedupe cache lookup"""
+        if not idempotency_key:
+            return None
+        result = frappe.cache().get_value(f"cms:payment_result:{idempotency_key}")
+        if result:
+            result = dict(result, idempotent_replay=True)
+        return result
+    
+    @staticmethod
+    def _remember_result(idempotency_key, result):
+        """Cache a final or pending result so retries skip the database entirely"""
+        if idempotency_key and result.get("payment_details"):
+            frappe.cache().set_value(f"cms:payment_result:{idempotency_key}", result,
+                expires_in_sec=IDEMPOTENCY_CACHE_SECONDS)
+        return result
+    
+    @staticmethod
+    def _next_attempt(registration_id):
+        """Attempt number for a new payment on a registration"""
+        return frappe.db.count("Mock Payment Details", {"registration": registration_id}) + 1
+    
+    @staticmethod
+    def process_payments_batch(registration_ids, payment_method="Credit Card", max_workers=8,
+                               chunk_size=200, send_emails=True):
+        """
+        Process payments for many registrations
+        Gateway calls run concurrently on a bounded thread pool; payment records and
+        registration updates are written with bulk statements, one transaction per chunk
+        Returns: dict with batch summary
+        """
+        summary = {"processed": 0, "paid": 0, "failed": 0, "pending": 0, "skipped": [], "payments": []}
+        registration_ids = list(dict.fromkeys(registration_ids or []))
+        
+        try:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                for start in range(0, len(registration_ids), chunk_size):
+                    chunk = registration_ids[start:start + chunk_size]
+                    try:
+                        PaymentProcessor._process_payment_chunk(chunk, payment_method, executor, send_emails, summary)
+                        frappe.db.commit()
+                    except Exception as chunk_error:
+                        frappe.db.rollback()
+                        frappe.log_error(f"Batch payment chunk failed: {str(chunk_error)}", "Payment Processor")
+                        summary["skipped"].extend(chunk)
+            
+            return {"success": True, "data": summary}
+            
+        except Exception as e:
+            frappe.log_error(f"Batch payment processing error: {str(e)}", "Payment Processor")
+            return {
+                "success": False,
+                "error": "Batch payment processing failed due to system error",
+                "data": summary
+            }
+        finally:
+            # A failed chunk may repeat names that were already skipped inside it
+            summary["skipped"] = list(dict.fromkeys(summary["skipped"]))
+    
+    @staticmethod
+    def _process_payment_chunk(registration_ids, payment_method, executor, send_emails, summary):
+        """Charge one chunk of registrations and persist the outcome with bulk writes
+        
+        Registrations locked by a running submission, or with a payment still Processing,
+        are skipped. A registration whose last attempt ended in an unknown outcome is charged
+        again with that attempt's key, so the gateway replays the original charge
+        """
+        registrations = frappe.get_all("Registration",
+            filters={"name": ["in", registration_ids], "payment_status": ["!=", "Paid"]},
+            fields=["name", "attendee", "session", "amount", "invoice_id", "join_link"])
+        
+        locked = PaymentProcessor._acquire_payment_locks([reg.name for reg in registrations], BATCH_PAYMENT_LOCK_SECONDS)
+        try:
+            registrations = [reg for reg in registrations if reg.name in locked]
+            attempts, latest = {}, {}
+            if registrations:
+                for payment in frappe.db.sql("""
+                    SELECT name, registration, idempotency_key, payment_status, gateway_response
+                    FROM `tabMock Payment Details`
+                    WHERE registration IN %s
+                    ORDER BY creation
+                """, (tuple(reg.name for reg in registrations),), as_dict=True):
+                    attempts[payment.registration] = attempts.get(payment.registration, 0) + 1
+                    latest[payment.registration] = payment
+            
+            # In flight (async, or awaiting reconciliation): the existing attempt settles it
+            registrations = [reg for reg in registrations
+                             if not (reg.name in latest and latest[reg.name].payment_status == "Processing")]
+            
+            found = {reg.name for reg in registrations}
+            skipped = [name for name in registration_ids if name not in found]
+            if registrations:
+                PaymentProcessor._charge_payment_chunk(
+                    registrations, attempts, latest, payment_method, executor, send_emails, summary)
+            summary["skipped"].extend(skipped)
+        finally:
+            PaymentProcessor._release_payment_locks(locked)
+    
+    @staticmethod
+    def _charge_payment_chunk(registrations, attempts, latest, payment_method, executor, send_emails, summary):
+        """Call the gateway for locked, chargeable registrations and write the outcomes"""
+        # Reused keys belong to an existing record, which is updated instead of inserted
+        reused = {reg.name: latest[reg.name] for reg in registrations
+                  if reg.name in latest and PaymentProcessor._is_unresolved_record(latest[reg.name])}
+        keys = {reg.name: reused[reg.name].idempotency_key if reg.name in reused
+                else make_idempotency_key(reg.name, attempts.get(reg.name, 0) + 1)
+                for reg in registrations}
+        
+        # Gateway calls are the only part that runs off the request thread; they must not touch frappe.db
+        gateway = get_gateway()
+        outcomes = list(executor.map(
+            lambda reg: gateway.charge(reg.name, reg.amount, payment_method, keys[reg.name]),
+            registrations))
+        
+        now = frappe.utils.now()
+        records = []
+        for reg, result in zip(registrations, outcomes, strict=True):
+            processing_fee, net_amount = PaymentProcessor._calculate_fees(reg.amount)
+            record = PaymentProcessor._build_payment_record(
+                reg.name, f"TXN_{uuid.uuid4().hex[:12].upper()}", result["gateway_transaction_id"],
+                payment_method, reg.amount, processing_fee, net_amount, result,
+                PaymentProcessor._generate_mock_payment_details(payment_method, None))
+            record.update({
+                "name": reused[reg.name].name if reg.name in reused else frappe.generate_hash(length=10),
+                "creation": now,
+                "modified": now,
+                "owner": frappe.session.user,
+                "modified_by": frappe.session.user,
+                "docstatus": 0,
+                "payment_date": now,
+                "idempotency_key": keys[reg.name]
+            })
+            records.append(record)
+            
+            reg.payment_status = "Pending" if is_unresolved(result) else "Paid" if result["success"] else "Failed"
+            reg.payment_details = record["name"]
+        
+        inserts = [record for record in records if record["registration"] not in reused]
+        if inserts:
+            fields = list(inserts[0].keys())
+            frappe.db.bulk_insert("Mock Payment Details", fields, [[record.get(f) for f in fields] for record in inserts])
+        for record in records:
+            if record["registration"] in reused:
+                frappe.db.set_value("Mock Payment Details", record["name"],
+                    {key: value for key, value in record.items() if key not in ("name", "creation", "owner")},
+                    update_modified=False)
+        
+        # One UPDATE for the whole chunk instead of a document save per registration
+        names = [reg.name for reg in registrations]
+        status_cases = " ".join(["WHEN %s THEN %s"] * len(registrations))
+        frappe.db.sql(f"""
+            UPDATE `tabRegistration`
+            SET payment_status = CASE name {status_cases} END,
+                payment_details = CASE name {status_cases} END,
+                modified = %s
+            WHERE name IN ({", ".join(["%s"] * len(names))})
+        """, (
+            *[value for reg in registrations for value in (reg.name, reg.payment_status)],
+            *[value for reg in registrations for value in (reg.name, reg.payment_details)],
+            now,
+            *names
+        ))
+        # The raw UPDATE bypasses Registration.on_update, so drop the cached profiles here
+        invalidate_attendee_profile(*[reg.attendee for reg in registrations])
+        
+        paid = [reg for reg in registrations if reg.payment_status == "Paid"]
+        if send_emails and paid:
+            # One context query and one render pass for the whole chunk
+            send_payment_confirmations(paid, commit=False)
+        
+        # Counted last, so a chunk that fails above is reported only as skipped
+        for reg, record in zip(registrations, records, strict=True):
+            summary["processed"] += 1
+            if reg.payment_status == "Paid":
+                summary["paid"] += 1
+                summary["payments"].append(record["name"])
+            elif reg.payment_status == "Pending":
+                summary["pending"] += 1
+            else:
+                summary["failed"] += 1
+    
+    @staticmethod
+    def _is_unresolved_record(payment):
+        """Whether a payment row recorded an unknown gateway outcome (older rows stored these as Failed)"""
+        try:
+            response = json.loads(payment.gateway_response or "{}")
+        except ValueError:
+            return False
+        return is_unresolved({"gateway_code": response.get("gateway_code")})
+    
+    @staticmethod
+    def _acquire_payment_locks(registration_ids, seconds=PAYMENT_LOCK_SECONDS):
+        """Take the submit_payment lock for each registration; returns the ones acquired"""
+        if not registration_ids:
+            return []
+        cache = frappe.cache()
+        pipe = cache.pipeline()
+        for name in registration_ids:
+            pipe.set(cache.make_key(f"cms:payment_lock:{name}"), 1, ex=seconds, nx=True)
+        return [name for name, acquired in zip(registration_ids, pipe.execute(), strict=True) if acquired]
+    
+    @staticmethod
+    def _release_payment_locks(registration_ids):
+        if registration_ids:
+            cache = frappe.cache()
+            cache.delete(*(cache.make_key(f"cms:payment_lock:{name}") for name in registration_ids))
+    
+    @staticmethod
+    def _calculate_fees(amount):
+        """Return (processing_fee, net_amount) for an amount"""
+        processing_fee = round((amount or 0) * 0.025, 2)  # 2.5% processing fee
+        return processing_fee, (amount or 0) - processing_fee
+    
     @staticmethod
     def _generate_mock_payment_details(payment_method, payment_data):
         """Generate realistic mock payment details based on method"""
@@ -121,51 +527,97 @@ class PaymentProcessor:
         return details
     
     @staticmethod
-    def _create_payment_record(registration_id, transaction_id, gateway_txn_id, payment_method, 
-                             amount, processing_fee, net_amount, result, mock_details):
-        """Create comprehensive payment record"""
-        try:
-            payment_doc = frappe.new_doc("Mock Payment Details")
-            payment_doc.registration = registration_id
-            payment_doc.transaction_id = transaction_id
-            payment_doc.gateway_transaction_id = gateway_txn_id
-            payment_doc.payment_method = payment_method
-            payment_doc.amount = amount
-            payment_doc.processing_fee = processing_fee
-            payment_doc.net_amount = net_amount
-            payment_doc.payment_status = "Success" if result["success"] else "Failed"
-            
-            # Add method-specific details
-            if mock_details.get("card_last_four"):
-                payment_doc.card_last_four = mock_details["card_last_four"]
-                payment_doc.card_type = mock_details["card_type"]
-                payment_doc.bank_name = mock_details["bank_name"]
-            elif mock_details.get("upi_id"):
-                payment_doc.upi_id = mock_details["upi_id"]
-            elif mock_details.get("bank_name"):
-                payment_doc.bank_name = mock_details["bank_name"]
-            
-            # Mock gateway response
+    def _build_payment_record(registration_id, transaction_id, gateway_txn_id, payment_method,
+                              amount, processing_fee, net_amount, result, mock_details):
+        """Build the Mock Payment Details field values for a gateway outcome"""
+        record = {
+            "registration": registration_id,
+            "transaction_id": transaction_id,
+            "gateway_transaction_id": gateway_txn_id,
+            "payment_method": payment_method,
+            "amount": amount,
+            "currency": "INR",
+            "payment_gateway": "MockPay Gateway",
+            "processing_fee": processing_fee,
+            "net_amount": net_amount,
+            "payment_status": PaymentProcessor._payment_status(result),
+            "failure_reason": None if not result or result["success"] or is_unresolved(result) else result["message"],
+            "card_last_four": None,
+            "card_type": None,
+            "bank_name": None,
+            "upi_id": None
+        }
+        
+        # Add method-specific details
+        if mock_details.get("card_last_four"):
+            record["card_last_four"] = mock_details["card_last_four"]
+            record["card_type"] = mock_details["card_type"]
+            record["bank_name"] = mock_details["bank_name"]
+        elif mock_details.get("upi_id"):
+            record["upi_id"] = mock_details["upi_id"]
+        elif mock_details.get("bank_name"):
+            record["bank_name"] = mock_details["bank_name"]
+        
+        # Pending payments get their gateway response when the callback runs
+        if result:
             gateway_response = {
-                "status": "success" if result["success"] else "failed",
+                "status": "unknown" if is_unresolved(result) else "success" if result["success"] else "failed",
                 "message": result["message"],
                 "gateway_code": result["gateway_code"],
                 "transaction_id": gateway_txn_id,
                 "timestamp": datetime.now().isoformat()
             }
-            payment_doc.gateway_response = json.dumps(gateway_response, indent=2)
-            
-            if not result["success"]:
-                payment_doc.failure_reason = result["message"]
-            
-            payment_doc.insert(ignore_permissions=True)
-            frappe.db.commit()
-            
-            return payment_doc
-            
-        except Exception as e:
-            frappe.log_error(f"Failed to create payment record: {str(e)}", "Payment Processor")
-            return None
+            record["gateway_response"] = json.dumps(gateway_response, indent=2)
+        
+        return record
     
-
+    @staticmethod
+    def _payment_status(result):
+        """Mock Payment Details status for a gateway outcome (Processing while pending or unknown)"""
+        if not result or is_unresolved(result):
+            return "Processing"
+        return "Success" if result["success"] else "Failed"
     
+    @staticmethod
+    def reconcile_pending_payments(limit=200):
+        """Re-send stale Processing payments with their original idempotency key
+        
+        Covers gateway timeouts and async jobs that never reported back. The key makes
+        the gateway return the outcome of the original charge instead of charging again
+        """
+        cutoff = frappe.utils.add_to_date(frappe.utils.now_datetime(), minutes=-RECONCILE_AFTER_MINUTES)
+        payments = frappe.get_all("Mock Payment Details",
+            filters={"payment_status": "Processing", "modified": ["<", cutoff]},
+            pluck="name", order_by="modified asc", limit=limit)
+        
+        resolved = 0
+        for name in payments:
+            payment_doc = frappe.get_doc("Mock Payment Details", name)
+            lock_key = frappe.cache().make_key(f"cms:payment_lock:{payment_doc.registration}")
+            if not frappe.cache().set(lock_key, 1, ex=PAYMENT_LOCK_SECONDS, nx=True):
+                continue  # a submission for this registration is running right now
+            try:
+                result = get_gateway().charge(payment_doc.registration, payment_doc.amount,
+                    payment_doc.payment_method, payment_doc.idempotency_key)
+                if is_unresolved(result):
+                    continue
+                PaymentProcessor.complete_async_payment(name, result)
+                resolved += 1
+            except Exception as e:
+                frappe.db.rollback()
+                frappe.log_error(f"Payment reconciliation failed for {name}: {str(e)}", "Payment Processor")
+            finally:
+                frappe.cache().delete(lock_key)
+        
+        return {"checked": len(payments), "resolved": resolved}
+
+
+def run_async_payment(payment_details, idempotency_key, user=None):
+    """Background job: call the gateway for a pending payment and report back through the callback"""
+    try:
+        payment_doc = frappe.get_doc("Mock Payment Details", payment_details)
+        result = get_gateway().charge(
+            payment_doc.registration, payment_doc.amount, payment_doc.payment_method, idempotency_key)
+        PaymentProcessor.complete_async_payment(payment_details, result, user=user)
+    except Exception as e:
+        frappe.log_error(f"Async payment job failed for {payment_details}: {str(e)}", "Payment Processor")
\ No newline at end of file
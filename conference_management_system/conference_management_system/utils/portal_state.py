@@ -0,0 +1,114 @@
+import frappe
+
+from conference_management_system.conference_management_system.utils.attendee_profile import (
+    get_attendee_profile,
+)
+
+# Pieces of the attendee portal state that callers can ask for
+PORTAL_STATE_FIELDS = ("profile", "preferences", "registrations", "recommendations")
+
+RECOMMENDATION_LIMIT = 5
+
+
+def get_portal_state(attendee_id, fields=None):
+    """Profile, preferences, registrations and recommendations for one attendee
+
+    Only the requested pieces are built. The cached profile is read once and
+    shared by the profile, preferences and recommendations. Returns None when
+    the attendee does not exist
+    """
+    fields = set(fields or PORTAL_STATE_FIELDS)
+
+    profile = get_attendee_profile(attendee_id)
+    if profile is None:
+        return None
+
+    state = {}
+    if "profile" in fields:
+        state["attendee"] = profile["attendee"]
+    if "preferences" in fields:
+        state["preferences"] = profile["preferences"]
+    if "registrations" in fields:
+        state["registrations"] = get_attendee_registrations(attendee_id)
+    if "recommendations" in fields:
+        state["recommendations"] = recommend_sessions(profile["preferences"])
+
+    return state
+
+def get_attendee_registrations(attendee_id):
+    """Registrations with conference, session and payment details in one query"""
+    registrations = frappe.db.sql("""
+        SELECT r.name, r.registration_date, r.payment_status, r.invoice_id, r.join_link, r.amount,
+               r.conference, r.session, r.payment_details,
+               c.conference_name, s.session_name, s.speaker, s.start_time, s.end_time,
+               p.payment_method, p.transaction_id, p.processing_fee
+        FROM `tabRegistration` r
+        JOIN `tabConference` c ON c.name = r.conference
+        JOIN `tabSession` s ON s.name = r.session
+        LEFT JOIN `tabMock Payment Details` p ON p.name = r.payment_details
+        WHERE r.attendee = %s
+        ORDER BY r.registration_date DESC
+    """, (attendee_id,), as_dict=True)
+
+    for reg in registrations:
+        reg.start_time = str(reg.start_time)
+        reg.end_time = str(reg.end_time)
+        if not reg.payment_details:
+            for field in ("payment_method", "transaction_id", "processing_fee"):
+                reg.pop(field)
+
+    return registrations
+
+def recommend_sessions(preferences, limit=RECOMMENDATION_LIMIT):
+    """Upcoming sessions similar to the preferred ones, or the most popular when there are none
+
+    preferences: rows with session_name and speaker, as in the attendee profile
+    """
+    recommendations = []
+    for pref in preferences:
+        words = (pref.get('session_name') or '').split()
+        keyword = f"%{words[0]}%" if words else None
+        recommendations.extend(frappe.db.sql("""
+            SELECT DISTINCT s.name, s.session_name, s.speaker, s.start_time, s.end_time, s.conference,
+                   c.conference_name, s.max_attendees
+            FROM `tabSession` s
+            JOIN `tabConference` c ON s.conference = c.name
+            WHERE (s.speaker = %s OR s.session_name LIKE %s OR s.description LIKE %s)
+            AND c.status IN ('Upcoming', 'Ongoing')
+            AND s.session_date >= CURDATE()
+            LIMIT 3
+        """, (pref.get('speaker'), keyword, keyword), as_dict=True))
+        if len(recommendations) >= limit:
+            break
+
+    if not recommendations:
+        recommendations = frappe.db.sql("""
+            SELECT s.name, s.session_name, s.speaker, s.start_time, s.end_time, s.conference,
+                   c.conference_name, s.max_attendees, COUNT(r.name) as registration_count
+            FROM `tabSession` s
+            JOIN `tabConference` c ON s.conference = c.name
+            LEFT JOIN `tabRegistration` r ON s.name = r.session
+            WHERE c.status IN ('Upcoming', 'Ongoing')
+            AND s.session_date >= CURDATE()
+            GROUP BY s.name
+            ORDER BY registration_count DESC
+            LIMIT %s
+        """, (limit,), as_dict=True)
+
+    recommendations = recommendations[:limit]
+    if not recommendations:
+        return []
+
+    # Availability for all recommended sessions in one grouped count
+    counts = dict(frappe.db.sql("""
+        SELECT session, COUNT(*) FROM `tabRegistration`
+        WHERE session IN %s
+        GROUP BY session
+    """, (tuple({rec.name for rec in recommendations}),)))
+
+    for rec in recommendations:
+        rec.start_time = str(rec.start_time)
+        rec.end_time = str(rec.end_time)
+        rec.available_spots = (rec.max_attendees or 0) - counts.get(rec.name, 0)
+
+    return recommendations
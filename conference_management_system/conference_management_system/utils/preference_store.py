@@ -0,0 +1,79 @@
+import frappe
+
+from conference_management_system.conference_management_system.utils.attendee_profile import (
+    invalidate_attendee_profile,
+)
+from conference_management_system.conference_management_system.utils.doc_cache import invalidate_cached_doc
+from conference_management_system.conference_management_system.utils.error_handler import ValidationError
+
+VALID_PREFERENCE_TYPES = ("Interested", "Not Interested", "Attended", "Wishlist")
+
+
+def upsert_preferences(attendee_id, preferences):
+    """Apply {session: preference_type} changes to an attendee with targeted child-row writes
+
+    An empty preference_type clears the preference. Returns counts of inserted, updated
+    and cleared rows; the caller owns the transaction
+    """
+    for preference_type in preferences.values():
+        if preference_type and preference_type not in VALID_PREFERENCE_TYPES:
+            raise ValidationError(f"Invalid preference type. Must be one of: {', '.join(VALID_PREFERENCE_TYPES)}")
+
+    known_sessions = set(frappe.get_all("Session", filters={"name": ["in", list(preferences)]}, pluck="name"))
+    missing = [session for session in preferences if session not in known_sessions]
+    if missing:
+        raise ValidationError(f"Session not found: {', '.join(missing)}")
+
+    existing = {}
+    next_idx = 1
+    for row in frappe.get_all("Attendee Preference",
+            filters={"parent": attendee_id, "parenttype": "Attendee", "parentfield": "preferences"},
+            fields=["name", "session", "preference_type", "idx"],
+            order_by="idx ASC"):
+        existing.setdefault(row.session, row)
+        next_idx = max(next_idx, (row.idx or 0) + 1)
+
+    now = frappe.utils.now()
+    updates, inserts, deletes = [], [], []
+    for session, preference_type in preferences.items():
+        row = existing.get(session)
+        if not preference_type:
+            if row:
+                deletes.append(row.name)
+        elif not row:
+            inserts.append([
+                frappe.generate_hash(length=10), now, now, frappe.session.user, frappe.session.user, 0,
+                attendee_id, "Attendee", "preferences", next_idx, session, preference_type
+            ])
+            next_idx += 1
+        elif row.preference_type != preference_type:
+            updates.append((row.name, preference_type))
+
+    if inserts:
+        frappe.db.bulk_insert("Attendee Preference",
+            ["name", "creation", "modified", "owner", "modified_by", "docstatus",
+             "parent", "parenttype", "parentfield", "idx", "session", "preference_type"],
+            inserts)
+
+    if updates:
+        frappe.db.sql(f"""
+            UPDATE `tabAttendee Preference`
+            SET preference_type = CASE name {" ".join(["WHEN %s THEN %s"] * len(updates))} END,
+                modified = %s
+            WHERE name IN ({", ".join(["%s"] * len(updates))})
+        """, (*[value for update in updates for value in update], now, *[name for name, _ in updates]))
+
+    if deletes:
+        frappe.db.delete("Attendee Preference", {"name": ["in", deletes]})
+
+    if inserts or updates or deletes:
+        # Child rows were written directly, so bump the parent and drop its cached copies by hand
+        frappe.db.set_value("Attendee", attendee_id, "modified", now, update_modified=False)
+        invalidate_cached_doc("Attendee", attendee_id)
+        invalidate_attendee_profile(attendee_id)
+
+    return {
+        "inserted": len(inserts),
+        "updated": len(updates),
+        "cleared": len(deletes)
+    }
@@ -0,0 +1,141 @@
+import cProfile
+import io
+import marshal
+import pstats
+import random
+import time
+
+import frappe
+
+from conference_management_system.conference_management_system.utils.compression import compress_to_text
+
+try:
+    from pyinstrument import Profiler as PyinstrumentProfiler
+except ImportError:
+    PyinstrumentProfiler = None
+
+# Lines of the text summary kept uncompressed on the API Profile for quick reading
+SUMMARY_LINES = 40
+
+# Days API Profiles are kept (site config api_profiling.retention_days overrides)
+PROFILE_RETENTION_DAYS = 30
+
+
+def get_profile_retention_days():
+    """Days to keep API Profiles before the monthly cleanup removes them"""
+    config = frappe.conf.get("api_profiling") or {}
+    return int(config.get("retention_days") or PROFILE_RETENTION_DAYS)
+
+def start_profile(endpoint):
+    """Start profiling this call when site config asks for it, else return None
+
+    site_config.json:
+        "api_profiling": {
+            "endpoints": ["register_for_session"],   # always profile these
+            "users": ["someone@example.com"],        # always profile these callers
+            "sample_rate": 0.01,                     # and this share of everything else
+            "engine": "pyinstrument",                # default cProfile
+            "retention_days": 30,                    # cleanup_old_api_logs drops older profiles
+            "enabled": 1
+        }
+    """
+    config = frappe.conf.get("api_profiling")
+    if not config or not config.get("enabled", 1):
+        return None
+
+    selected = (endpoint in (config.get("endpoints") or [])
+                or frappe.session.user in (config.get("users") or [])
+                or random.random() < float(config.get("sample_rate") or 0))
+    if not selected:
+        return None
+
+    engine = config.get("engine") or "cProfile"
+    if engine == "pyinstrument" and not PyinstrumentProfiler:
+        engine = "cProfile"
+
+    profile = RequestProfile(endpoint, engine)
+    profile.start()
+    return profile
+
+
+class RequestProfile:
+    """Stack profile of one API call with SQL time split out from Python time"""
+
+    def __init__(self, endpoint, engine):
+        self.endpoint = endpoint
+        self.engine = engine
+        self.sql_time = 0.0
+        self.query_count = 0
+        self.wall_time = 0.0
+        self._profiler = None
+        self._original_sql = None
+        self._started = None
+
+    def start(self):
+        self._original_sql = frappe.db.sql
+
+        def timed_sql(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return self._original_sql(*args, **kwargs)
+            finally:
+                self.sql_time += time.perf_counter() - started
+                self.query_count += 1
+
+        frappe.db.sql = timed_sql
+        self._profiler = PyinstrumentProfiler() if self.engine == "pyinstrument" else cProfile.Profile()
+        self._started = time.perf_counter()
+        if self.engine == "pyinstrument":
+            self._profiler.start()
+        else:
+            self._profiler.enable()
+
+    def stop(self):
+        if self.engine == "pyinstrument":
+            self._profiler.stop()
+        else:
+            self._profiler.disable()
+        self.wall_time = time.perf_counter() - self._started
+        frappe.db.sql = self._original_sql
+
+    def save(self, api_log=None):
+        """Store the profile compressed on an API Profile linked to the call's API Log"""
+        try:
+            data, profile_format, summary = self._export()
+            profile_data = compress_to_text(data)
+
+            profile_doc = frappe.new_doc("API Profile")
+            profile_doc.update({
+                "api_endpoint": self.endpoint,
+                "api_log": api_log,
+                "user": frappe.session.user,
+                "engine": self.engine,
+                "wall_time": round(self.wall_time * 1000, 2),
+                "sql_time": round(self.sql_time * 1000, 2),
+                "python_time": round((self.wall_time - self.sql_time) * 1000, 2),
+                "query_count": self.query_count,
+                "summary": summary,
+                "profile_format": profile_format,
+                "profile_data": profile_data,
+                "raw_size": len(data),
+                "compressed_size": len(profile_data)
+            })
+            profile_doc.insert(ignore_permissions=True)
+            frappe.db.commit()
+        except Exception as e:
+            frappe.log_error(f"Failed to save profile for {self.endpoint}: {str(e)}", "API Profiler")
+
+    def _export(self):
+        """(bytes, format, text summary) for the captured profile"""
+        if self.engine == "pyinstrument":
+            summary = self._profiler.output_text(unicode=True, color=False)
+            return self._profiler.output_html().encode("utf-8"), "html", _head(summary)
+
+        stats = pstats.Stats(self._profiler, stream=io.StringIO())
+        stats.sort_stats("cumulative").print_stats(SUMMARY_LINES)
+        # Same layout as pstats.dump_stats, so the download opens in snakeviz or pstats
+        return marshal.dumps(stats.stats), "pstats", stats.stream.getvalue()
+
+
+def _head(text):
+    return "\n".join(text.splitlines()[:SUMMARY_LINES * 2])
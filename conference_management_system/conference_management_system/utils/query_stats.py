@@ -0,0 +1,228 @@
+import hashlib
+import json
+import random
+import re
+import time
+
+import frappe
+
+# Redis keys; stats fields are "<endpoint>|<fingerprint>|<metric>"
+STATS_KEY = "cms:query_stats"
+MAX_MS_KEY = "cms:query_stats:max_ms"          # sorted set, member "<endpoint>|<fingerprint>"
+TEXT_KEY = "cms:query_stats:text"              # fingerprint -> normalized statement
+EXAMPLES_KEY = "cms:query_stats:examples"      # "<endpoint>|<fingerprint>" -> slowest example as JSON
+
+DEFAULT_SLOW_QUERY_MS = 200
+
+# Bounds on the shared keys: idle stats expire, and new pairs stop being tracked at the cap
+QUERY_STATS_TTL = 7 * 86400
+MAX_TRACKED_QUERIES = 5000
+
+_LITERAL_PATTERNS = (
+    (re.compile(r"'(?:[^'\\]|\\.|'')*'"), "?"),
+    (re.compile(r'"(?:[^"\\]|\\.|"")*"'), "?"),
+    (re.compile(r"%\(\w+\)s|%s"), "?"),
+    (re.compile(r"\b0x[0-9a-f]+\b", re.IGNORECASE), "?"),
+    (re.compile(r"(?<![\w`])-?\d+(?:\.\d+)?\b"), "?"),
+    (re.compile(r"\s+"), " "),
+    # Lists of any length share a fingerprint
+    (re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)"), "(?+)"),
+    (re.compile(r"\(\?\+\)(?:\s*,\s*\(\?\+\))+"), "(?+), ..."),
+)
+
+
+def fingerprint(query):
+    """(id, normalized statement) with literals and placeholders replaced by ?"""
+    normalized = query.strip().rstrip(";")
+    for pattern, replacement in _LITERAL_PATTERNS:
+        normalized = pattern.sub(replacement, normalized)
+    return hashlib.sha1(normalized.encode()).hexdigest()[:12], normalized
+
+def start_query_capture(endpoint):
+    """Start recording this call's queries when site config enables it, else return None
+
+    site_config.json:
+        "query_stats": {"enabled": 1, "sample_rate": 1, "slow_query_ms": 200}
+    """
+    config = frappe.conf.get("query_stats")
+    if not config or not config.get("enabled", 1):
+        return None
+    if random.random() >= float(config.get("sample_rate", 1)):
+        return None
+
+    capture = QueryCapture(endpoint, float(config.get("slow_query_ms") or DEFAULT_SLOW_QUERY_MS))
+    capture.start()
+    return capture
+
+
+class QueryCapture:
+    """Per-fingerprint totals for the queries of one API call, flushed to Redis at the end"""
+
+    def __init__(self, endpoint, slow_query_ms):
+        self.endpoint = endpoint
+        self.slow_query_ms = slow_query_ms
+        self.stats = {}
+        self.texts = {}
+        self.slow = {}
+        self._original_sql = None
+
+    def start(self):
+        self._original_sql = frappe.db.sql
+
+        def recorded_sql(query, values=(), *args, **kwargs):
+            started = time.perf_counter()
+            result = None
+            try:
+                result = self._original_sql(query, values, *args, **kwargs)
+                return result
+            finally:
+                self._record(query, values, (time.perf_counter() - started) * 1000, result)
+
+        frappe.db.sql = recorded_sql
+
+    def stop(self):
+        frappe.db.sql = self._original_sql
+
+    def _record(self, query, values, duration_ms, result):
+        if not isinstance(query, str):
+            query = str(query)  # frappe.qb queries
+        fingerprint_id, normalized = fingerprint(query)
+
+        if isinstance(result, list | tuple) and result:
+            rows = len(result)
+        else:
+            rows = max(getattr(frappe.db._cursor, "rowcount", 0) or 0, 0)
+
+        stats = self.stats.setdefault(fingerprint_id, {"count": 0, "total_ms": 0.0, "rows": 0, "max_ms": 0.0})
+        stats["count"] += 1
+        stats["total_ms"] += duration_ms
+        stats["rows"] += rows
+        stats["max_ms"] = max(stats["max_ms"], duration_ms)
+        self.texts[fingerprint_id] = normalized
+
+        slowest = self.slow.get(fingerprint_id)
+        if duration_ms >= self.slow_query_ms and (not slowest or duration_ms > slowest["duration_ms"]):
+            # The raw statement and values stay in memory for EXPLAIN and are never stored
+            self.slow[fingerprint_id] = {
+                "query": query,
+                "values": values,
+                "duration_ms": round(duration_ms, 2),
+                "rows": rows
+            }
+
+    def flush(self):
+        """Add this call's totals to the shared stats and keep any new slowest examples
+
+        Examples keep the normalized statement and the types of its values, not the values
+        """
+        if not self.stats:
+            return
+
+        try:
+            cache = frappe.cache()
+            members = {fingerprint_id: f"{self.endpoint}|{fingerprint_id}" for fingerprint_id in self.stats}
+
+            pipe = cache.pipeline()
+            pipe.zcard(cache.make_key(MAX_MS_KEY))
+            for fingerprint_id in self.stats:
+                pipe.zscore(cache.make_key(MAX_MS_KEY), members[fingerprint_id])
+            tracked, *scores = pipe.execute()
+            previous_max = dict(zip(self.stats, scores, strict=True))
+
+            if tracked >= MAX_TRACKED_QUERIES:
+                # At the cap only pairs already tracked keep accumulating
+                for fingerprint_id in [fid for fid, score in previous_max.items() if score is None]:
+                    self.stats.pop(fingerprint_id)
+                    self.slow.pop(fingerprint_id, None)
+                if not self.stats:
+                    return
+
+            pipe = cache.pipeline()
+            for fingerprint_id, stats in self.stats.items():
+                member = members[fingerprint_id]
+                pipe.hincrby(cache.make_key(STATS_KEY), f"{member}|count", stats["count"])
+                pipe.hincrbyfloat(cache.make_key(STATS_KEY), f"{member}|total_ms", round(stats["total_ms"], 3))
+                pipe.hincrby(cache.make_key(STATS_KEY), f"{member}|rows", stats["rows"])
+                pipe.zadd(cache.make_key(MAX_MS_KEY), {member: round(stats["max_ms"], 3)}, gt=True)
+                pipe.hset(cache.make_key(TEXT_KEY), fingerprint_id, self.texts[fingerprint_id])
+
+            # Only examples slower than the recorded maximum are worth an EXPLAIN
+            for fingerprint_id, example in self.slow.items():
+                if (previous_max.get(fingerprint_id) or 0) >= example["duration_ms"]:
+                    continue
+                query, values = example.pop("query"), example.pop("values")
+                example.update({
+                    "value_types": _describe_values(values),
+                    "explain": self._explain(query, values),
+                    "user": frappe.session.user,
+                    "timestamp": frappe.utils.now()
+                })
+                pipe.hset(cache.make_key(EXAMPLES_KEY), members[fingerprint_id], json.dumps(example, default=str))
+
+            for key in (STATS_KEY, MAX_MS_KEY, TEXT_KEY, EXAMPLES_KEY):
+                pipe.expire(cache.make_key(key), QUERY_STATS_TTL)
+            pipe.execute()
+        except Exception as e:
+            frappe.log_error(f"Error saving query stats for {self.endpoint}: {str(e)}", "Query Stats")
+
+    def _explain(self, query, values):
+        """EXPLAIN rows for a slow SELECT; other statements are not explained"""
+        if not query.lstrip().lower().startswith(("select", "with")):
+            return []
+        try:
+            return self._original_sql(f"EXPLAIN {query}", values, as_dict=True)
+        except Exception as e:
+            return [{"error": str(e)}]
+
+
+def get_query_stats(endpoint=None):
+    """Accumulated rows per endpoint and fingerprint, heaviest total time first"""
+    cache = frappe.cache()
+    pipe = cache.pipeline()
+    pipe.hgetall(cache.make_key(STATS_KEY))
+    pipe.zrange(cache.make_key(MAX_MS_KEY), 0, -1, withscores=True)
+    pipe.hgetall(cache.make_key(TEXT_KEY))
+    pipe.hgetall(cache.make_key(EXAMPLES_KEY))
+    raw_stats, max_ms, texts, examples = pipe.execute()
+
+    texts = {frappe.safe_decode(key): frappe.safe_decode(value) for key, value in texts.items()}
+    examples = {frappe.safe_decode(key): json.loads(value) for key, value in examples.items()}
+    max_ms = {frappe.safe_decode(member): score for member, score in max_ms}
+
+    rows = {}
+    for field, value in raw_stats.items():
+        row_endpoint, fingerprint_id, metric = frappe.safe_decode(field).rsplit("|", 2)
+        if endpoint and row_endpoint != endpoint:
+            continue
+        row = rows.setdefault((row_endpoint, fingerprint_id), {
+            "api_endpoint": row_endpoint,
+            "fingerprint": fingerprint_id,
+            "query": texts.get(fingerprint_id, ""),
+            "count": 0,
+            "total_ms": 0.0,
+            "rows": 0
+        })
+        row[metric] = float(value) if metric == "total_ms" else int(value)
+
+    for (row_endpoint, fingerprint_id), row in rows.items():
+        member = f"{row_endpoint}|{fingerprint_id}"
+        row["total_ms"] = round(row["total_ms"], 2)
+        row["avg_ms"] = round(row["total_ms"] / row["count"], 2) if row["count"] else 0
+        row["max_ms"] = round(max_ms.get(member, 0), 2)
+        row["avg_rows"] = round(row["rows"] / row["count"], 1) if row["count"] else 0
+        row["example"] = examples.get(member)
+
+    return sorted(rows.values(), key=lambda row: row["total_ms"], reverse=True)
+
+def reset_query_stats():
+    """Drop every accumulated total and example, e.g. before measuring an index change"""
+    cache = frappe.cache()
+    cache.delete(*(cache.make_key(key) for key in (STATS_KEY, MAX_MS_KEY, TEXT_KEY, EXAMPLES_KEY)))
+
+def _describe_values(values):
+    """Parameter types of a query, e.g. "str, int" or "email: str", without the values"""
+    if isinstance(values, dict):
+        return ", ".join(f"{key}: {type(value).__name__}" for key, value in values.items())
+    if isinstance(values, list | tuple):
+        return ", ".join(type(value).__name__ for value in values)
+    return type(values).__name__ if values is not None else ""
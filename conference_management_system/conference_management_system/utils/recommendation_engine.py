@@ -1,5 +1,6 @@
 import frappe
-from conference_management_system.conference_management_system.utils.email_service import send_session_recommendations
+from conference_management_system.conference_management_system.utils.email_service import send_session_recommendations_batch
+from conference_management_system.conference_management_system.utils.preference_store import upsert_preferences
 
 
 
@@ -102,16 +103,21 @@ class RecommendationEngine:
                 fields=["name", "email", "attendee_name"]
             )
             
+            batch = []
             for attendee in attendees:
                 recommendations = RecommendationEngine.generate_recommendations(attendee.name)
                 if recommendations:
-                    send_session_recommendations(attendee.email, recommendations)
-                    
-                    # Log the action
-                    frappe.log_error(
-                        f"Weekly recommendations sent to {attendee.email}",
-                        "Recommendation Engine"
-                    )
+                    attendee.recommendations = recommendations
+                    batch.append(attendee)
+            
+            # Rendered in one pass over the compiled template
+            send_session_recommendations_batch(batch)
+            
+            if batch:
+                frappe.log_error(
+                    f"Weekly recommendations sent to {len(batch)} attendees",
+                    "Recommendation Engine"
+                )
             
         except Exception as e:
             frappe.log_error(f"Error sending weekly recommendations: {str(e)}", "Recommendation Engine")
@@ -120,25 +126,8 @@ class RecommendationEngine:
     def update_preferences_from_registration(registration_doc):
         """Auto-update attendee preferences based on registration"""
         try:
-            attendee = frappe.get_doc("Attendee", registration_doc.attendee)
-            session = frappe.get_doc("Session", registration_doc.session)
-            
-            # Check if preference already exists
-            existing_pref = None
-            for pref in attendee.preferences:
-                if pref.session == session.name:
-                    existing_pref = pref
-                    break
-            
-            if existing_pref:
-                existing_pref.preference_type = "Attended"
-            else:
-                attendee.append("preferences", {
-                    "session": session.name,
-                    "preference_type": "Attended"
-                })
-            
-            attendee.save()
+            # Targeted child-row write instead of re-saving every preference of the attendee
+            upsert_preferences(registration_doc.attendee, {registration_doc.session: "Attended"})
             
         except Exception as e:
             frappe.log_error(f"Error updating preferences: {str(e)}", "Recommendation Engine")
\ No newline at end of file
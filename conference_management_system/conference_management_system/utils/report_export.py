@@ -0,0 +1,203 @@
+import csv
+import io
+import json
+import os
+from contextlib import nullcontext
+from importlib import import_module
+
+import frappe
+
+# Script reports that support streaming export
+EXPORTABLE_REPORTS = {
+    "Conference Report": "conference_management_system.conference_management_system.report.conference_report.conference_report",
+    "Session Analysis Report": "conference_management_system.conference_management_system.report.session_analysis_report.session_analysis_report",
+    "API Usage Report": "conference_management_system.conference_management_system.report.api_usage_report.api_usage_report"
+}
+
+EXPORT_FORMATS = ("csv", "xlsx", "ndjson")
+
+# Rows buffered before a chunk is flushed to the output
+CHUNK_SIZE = 1000
+
+# Rows between two progress events
+PROGRESS_INTERVAL = 10000
+
+
+@frappe.whitelist()
+def export_report(report_name, file_format="csv", filters=None):
+    """Queue a full-period streaming export of a script report"""
+    frappe.only_for(["System Manager", "Conference Admin"])
+
+    if report_name not in EXPORTABLE_REPORTS:
+        frappe.throw(f"Report {report_name} does not support export")
+
+    if file_format not in EXPORT_FORMATS:
+        frappe.throw(f"Invalid export format. Must be one of: {', '.join(EXPORT_FORMATS)}")
+
+    if isinstance(filters, str):
+        filters = json.loads(filters or "{}")
+
+    job = frappe.enqueue(
+        "conference_management_system.conference_management_system.utils.report_export.run_export",
+        queue="long",
+        timeout=3600,
+        report_name=report_name,
+        file_format=file_format,
+        filters=filters or {},
+        user=frappe.session.user
+    )
+
+    return {
+        "success": True,
+        "data": {"job_id": getattr(job, "id", None)},
+        "message": "Export started. You will be notified when the file is ready."
+    }
+
+def run_export(report_name, file_format="csv", filters=None, user=None):
+    """Background job: stream a report into a private file and notify the user"""
+    user = user or frappe.session.user
+    file_name = f"{frappe.scrub(report_name)}_{frappe.utils.now_datetime().strftime('%Y%m%d_%H%M%S')}.{file_format}"
+    file_path = frappe.get_site_path("private", "files", file_name)
+
+    def on_progress(rows_written):
+        frappe.publish_realtime("report_export_progress", {
+            "report_name": report_name,
+            "rows": rows_written,
+            "status": "running"
+        }, user=user)
+
+    try:
+        with open(file_path, "wb") as fileobj:
+            rows_written = write_report_export(report_name, file_format, filters, fileobj, on_progress=on_progress)
+
+        file_doc = frappe.get_doc({
+            "doctype": "File",
+            "file_name": file_name,
+            "file_url": f"/private/files/{file_name}",
+            "is_private": 1
+        })
+        file_doc.insert(ignore_permissions=True)
+        frappe.db.commit()
+
+        frappe.publish_realtime("report_export_progress", {
+            "report_name": report_name,
+            "rows": rows_written,
+            "status": "completed",
+            "file_url": file_doc.file_url
+        }, user=user)
+
+        return file_doc.file_url
+    except Exception as e:
+        frappe.log_error(f"Report export failed for {report_name}: {str(e)}", "Report Export")
+        if os.path.exists(file_path):
+            os.remove(file_path)
+
+        frappe.publish_realtime("report_export_progress", {
+            "report_name": report_name,
+            "status": "failed",
+            "error": str(e)
+        }, user=user)
+
+def write_report_export(report_name, file_format, filters, fileobj, on_progress=None):
+    """Stream all report rows into a binary file-like object, returns the row count"""
+    report = import_module(EXPORTABLE_REPORTS[report_name])
+    columns = report.get_columns()
+    query, values = report.get_query(filters or {}, limit=None)
+
+    rows = iter_report_rows(query, values, report.format_row)
+    rows = track_progress(rows, on_progress)
+
+    writers = {
+        "csv": write_csv,
+        "xlsx": write_xlsx,
+        "ndjson": write_ndjson
+    }
+    return writers[file_format](columns, rows, fileobj)
+
+def iter_report_rows(query, values, format_row):
+    """Yield formatted rows from an unbuffered server-side cursor"""
+    unbuffered_cursor = getattr(frappe.db, "unbuffered_cursor", None)
+
+    # The cursor must be fully consumed before any other query runs on this connection
+    with unbuffered_cursor() if unbuffered_cursor else nullcontext():
+        for row in frappe.db.sql(query, values, as_dict=True, as_iterator=True):
+            yield format_row(row)
+
+def track_progress(rows, on_progress):
+    """Pass rows through, reporting the running count every PROGRESS_INTERVAL rows"""
+    for count, row in enumerate(rows, 1):
+        if on_progress and count % PROGRESS_INTERVAL == 0:
+            on_progress(count)
+        yield row
+
+def iter_chunks(rows, size=CHUNK_SIZE):
+    """Group a row stream into lists of at most size rows"""
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def write_csv(columns, rows, fileobj):
+    """Write rows as CSV, one encoded chunk at a time"""
+    fieldnames = [col["fieldname"] for col in columns]
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    writer.writerow([col["label"] for col in columns])
+    count = 0
+
+    for chunk in iter_chunks(rows):
+        writer.writerows([[_export_value(row.get(field)) for field in fieldnames] for row in chunk])
+        count += len(chunk)
+
+        fileobj.write(buffer.getvalue().encode("utf-8"))
+        buffer.seek(0)
+        buffer.truncate()
+
+    fileobj.write(buffer.getvalue().encode("utf-8"))
+    return count
+
+def write_ndjson(columns, rows, fileobj):
+    """Write rows as newline-delimited JSON objects"""
+    fieldnames = [col["fieldname"] for col in columns]
+    count = 0
+
+    for chunk in iter_chunks(rows):
+        lines = [
+            json.dumps({field: row.get(field) for field in fieldnames}, default=str, separators=(",", ":"))
+            for row in chunk
+        ]
+        fileobj.write(("\n".join(lines) + "\n").encode("utf-8"))
+        count += len(chunk)
+
+    return count
+
+def write_xlsx(columns, rows, fileobj):
+    """Write rows to a write-only workbook so openpyxl does not keep them in memory"""
+    from openpyxl import Workbook
+
+    fieldnames = [col["fieldname"] for col in columns]
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Report")
+    sheet.append([col["label"] for col in columns])
+    count = 0
+
+    for chunk in iter_chunks(rows):
+        for row in chunk:
+            sheet.append([_export_value(row.get(field)) for field in fieldnames])
+        count += len(chunk)
+
+    workbook.save(fileobj)
+    return count
+
+def _export_value(value):
+    """Convert values that spreadsheet writers cannot handle natively"""
+    if value is None:
+        return ""
+    if isinstance(value, str | int | float):
+        return value
+    return str(value)
@@ -0,0 +1,92 @@
+import frappe
+from frappe.utils import add_days, cint, getdate
+
+
+class ReportFilter:
+    """Maps one report filter to a parameterized SQL predicate"""
+
+    def __init__(self, fieldname, predicate, transform=None, having=False):
+        self.fieldname = fieldname
+        self.predicate = predicate  # uses %(fieldname)s as its placeholder
+        self.transform = transform
+        self.having = having
+
+    def get_value(self, filters):
+        """Return the bound value, or None when the filter is unset or invalid"""
+        value = filters.get(self.fieldname)
+        if value in (None, ""):
+            return None
+
+        if not self.transform:
+            return value
+
+        try:
+            return self.transform(value)
+        except (ValueError, TypeError, frappe.ValidationError):
+            return None  # Skip invalid filter values
+
+
+class ReportQuery:
+    """Builds parameterized report SQL and memoizes the query text per filter combination"""
+
+    def __init__(self, template, filters):
+        # template uses {conditions}, {having} and {limit} placeholders
+        self.template = template
+        self.filters = filters
+        self._shapes = {}
+
+    def build(self, filters=None, limit=None):
+        """Return (query, values) for the given filters"""
+        filters = filters or {}
+        values = {}
+        active = []
+
+        for report_filter in self.filters:
+            value = report_filter.get_value(filters)
+            if value is not None:
+                values[report_filter.fieldname] = value
+                active.append(report_filter.fieldname)
+
+        if limit:
+            values["limit"] = cint(limit)
+
+        return self._compile(tuple(active), bool(limit)), values
+
+    def _compile(self, active, has_limit):
+        """Render the SQL text for a filter set, caching it so equal shapes share one statement"""
+        shape = (active, has_limit)
+        query = self._shapes.get(shape)
+        if query:
+            return query
+
+        where = ["1=1"]
+        having = []
+        for report_filter in self.filters:
+            if report_filter.fieldname in active:
+                (having if report_filter.having else where).append(report_filter.predicate)
+
+        query = self.template.format(
+            conditions="WHERE " + " AND ".join(where),
+            having=("HAVING " + " AND ".join(having)) if having else "",
+            limit="LIMIT %(limit)s" if has_limit else ""
+        )
+        self._shapes[shape] = query
+        return query
+
+
+def like_value(value):
+    """Wrap a value for a LIKE '%...%' match with wildcards in the input escaped"""
+    value = str(value).replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{value}%"
+
+def date_value(value):
+    """Normalize a date filter"""
+    return getdate(value)
+
+def next_day_value(value):
+    """Exclusive upper bound for an inclusive 'to date' on a Datetime column"""
+    return add_days(getdate(value), 1)
+
+def int_value(value):
+    """Strictly parse an integer filter"""
+    return int(value)
@@ -0,0 +1,177 @@
+import time
+
+import frappe
+
+from conference_management_system.conference_management_system.utils.http_cache import make_snapshot
+
+# Safety net only: writes invalidate the cache explicitly
+SESSION_CATALOG_TTL = 300
+
+# Public catalog snapshots, revalidated against the catalog version
+CATALOG_STATE_KEY = "cms:catalog_state"
+CATALOG_SNAPSHOT_TTL = 3600
+
+
+def get_conference_sessions(conference_id):
+    """Sessions of a conference with registration counts, shared by every user and cached per conference
+
+    Returns None when the conference does not exist
+    """
+    cache_key = _cache_key(conference_id)
+    catalog = frappe.cache().get_value(cache_key)
+
+    if catalog is None:
+        catalog = _build_catalog(conference_id)
+        # Unknown ids are caller-chosen, so only real conferences get a cache entry
+        if catalog["exists"]:
+            frappe.cache().set_value(cache_key, catalog, expires_in_sec=SESSION_CATALOG_TTL)
+
+    if not catalog["exists"]:
+        return None
+
+    # Hand out copies so per-user fields never leak into the cached payload
+    return [dict(session) for session in catalog["sessions"]]
+
+def get_registered_session_ids(attendee_id, session_ids):
+    """Which of the given sessions the attendee is registered for, in one query"""
+    if not attendee_id or not session_ids:
+        return set()
+
+    return set(frappe.get_all("Registration",
+        filters={"attendee": attendee_id, "session": ["in", list(session_ids)]},
+        pluck="session"))
+
+def invalidate_conference_sessions(conference_id):
+    """Drop the cached catalog for a conference after a session or registration change"""
+    if not conference_id:
+        return
+
+    cache_key = _cache_key(conference_id)
+    frappe.cache().delete_value(cache_key)
+    # Drop it again once committed, so a concurrent reader cannot re-cache uncommitted state
+    frappe.db.after_commit.add(lambda: frappe.cache().delete_value(cache_key))
+    bump_catalog_version()
+
+def get_upcoming_conferences():
+    """Upcoming and ongoing conferences with their sessions and registration counts"""
+    conferences = frappe.get_all("Conference",
+        filters={"status": ["in", ["Upcoming", "Ongoing"]]},
+        fields=["name", "conference_name", "start_date", "end_date", "location", "description", "status", "registration_fee"],
+        order_by="start_date ASC")
+
+    sessions_by_conference = {conference.name: [] for conference in conferences}
+    if conferences:
+        sessions = frappe.get_all("Session",
+            filters={"conference": ["in", list(sessions_by_conference)]},
+            fields=["name", "conference", "session_name", "speaker", "start_time", "end_time", "max_attendees"],
+            order_by="start_time ASC")
+        counts = _registration_counts([session.name for session in sessions])
+
+        for session in sessions:
+            max_attendees = int(session.get('max_attendees', 0) or 0)
+            registered_count = counts.get(session.name, 0)
+            sessions_by_conference[session.conference].append({
+                "name": session.name,
+                "session_name": session.get('session_name') or '',
+                "speaker": session.get('speaker') or '',
+                "start_time": str(session.start_time) if session.get('start_time') else '',
+                "end_time": str(session.end_time) if session.get('end_time') else '',
+                "max_attendees": max_attendees,
+                "registered_count": registered_count,
+                "available_spots": max(0, max_attendees - registered_count)
+            })
+
+    for conference in conferences:
+        conference['start_date'] = str(conference.start_date) if conference.get('start_date') else conference.get('start_date')
+        conference['end_date'] = str(conference.end_date) if conference.get('end_date') else conference.get('end_date')
+        conference['location'] = conference.get('location') or ''
+        conference['description'] = conference.get('description') or ''
+        conference['registration_fee'] = float(conference.get('registration_fee', 0) or 0)
+        conference['sessions'] = sessions_by_conference[conference.name]
+
+    return conferences
+
+def get_catalog_state():
+    """Current catalog version token and the time it last moved"""
+    state = frappe.cache().get_value(CATALOG_STATE_KEY)
+    if not state:
+        state = {"token": frappe.generate_hash(length=12), "modified": time.time()}
+        frappe.cache().set_value(CATALOG_STATE_KEY, state)
+    return state
+
+def bump_catalog_version():
+    """Move the catalog version once the current transaction commits"""
+    frappe.db.after_commit.add(_bump_catalog_version)
+
+def get_catalog_snapshot(name, builder, *args):
+    """Serialized catalog payload, rebuilt only after the catalog version moves
+
+    Last-Modified only advances when the rebuilt content actually differs. Returns None,
+    and caches nothing, when the builder reports a failure such as an unknown conference
+    """
+    state = get_catalog_state()
+    cache_key = f"cms:catalog_snapshot:{name}"
+    snapshot = frappe.cache().get_value(cache_key)
+    if snapshot and snapshot["token"] == state["token"]:
+        return snapshot
+
+    payload = builder(*args)
+    if not payload.get("success"):
+        return None
+
+    rebuilt = make_snapshot(payload, state["modified"])
+    if snapshot and snapshot["etag"] == rebuilt["etag"]:
+        rebuilt["modified"] = snapshot["modified"]
+    rebuilt["token"] = state["token"]
+
+    frappe.cache().set_value(cache_key, rebuilt, expires_in_sec=CATALOG_SNAPSHOT_TTL)
+    return rebuilt
+
+def _bump_catalog_version():
+    frappe.cache().set_value(CATALOG_STATE_KEY, {"token": frappe.generate_hash(length=12), "modified": time.time()})
+
+def _registration_counts(session_names):
+    """Registration count per session in one grouped query"""
+    if not session_names:
+        return {}
+
+    return {session: int(count) for session, count in frappe.db.sql("""
+        SELECT session, COUNT(*)
+        FROM `tabRegistration`
+        WHERE session IN %s
+        GROUP BY session
+    """, (tuple(session_names),))}
+
+def _build_catalog(conference_id):
+    """Load sessions and their registration counts with a fixed number of queries"""
+    if not frappe.db.exists("Conference", conference_id):
+        return {"exists": False, "sessions": []}
+
+    sessions = frappe.get_all("Session",
+        filters={"conference": conference_id},
+        fields=["name", "session_name", "speaker", "session_date", "start_time", "end_time", "max_attendees", "description"],
+        order_by="session_date ASC, start_time ASC")
+
+    counts = _registration_counts([session.name for session in sessions])
+
+    catalog = []
+    for session in sessions:
+        max_attendees = int(session.get('max_attendees', 0) or 0)
+        registered_count = counts.get(session.name, 0)
+        catalog.append({
+            "name": session.name,
+            "session_name": session.get('session_name') or '',
+            "speaker": session.get('speaker') or '',
+            "session_date": str(session.session_date) if session.get('session_date') else session.get('session_date'),
+            "start_time": str(session.start_time) if session.get('start_time') else session.get('start_time'),
+            "end_time": str(session.end_time) if session.get('end_time') else session.get('end_time'),
+            "max_attendees": max_attendees,
+            "description": session.get('description'),
+            "registered_count": registered_count,
+            "available_spots": max(0, max_attendees - registered_count)
+        })
+
+    return {"exists": True, "sessions": catalog}
+
+def _cache_key(conference_id):
+    return f"cms:session_catalog:{conference_id}"
@@ -2,9 +2,25 @@ import frappe
 import random
 import uuid
 import json
+import time
 from datetime import datetime, timedelta
 from conference_management_system.conference_management_system.utils.payment_processor import PaymentProcessor
-from conference_management_system.conference_management_system.utils.email_service import mock_sendmail
+from conference_management_system.conference_management_system.utils.email_service import (
+    send_registration_confirmations, send_payment_confirmations, send_otp_email
+)
+from conference_management_system.conference_management_system.utils.session_catalog import bump_catalog_version
+
+# Bulk generation sizes; sessions_per_conference stays within the slots a conference can hold
+SCALE_PRESETS = {
+    "small": {"conferences": 6, "sessions_per_conference": 4, "attendees": 50, "registrations": 100},
+    "10k": {"conferences": 60, "sessions_per_conference": 16, "attendees": 2500, "registrations": 10000},
+    "1m": {"conferences": 1000, "sessions_per_conference": 20, "attendees": 200000, "registrations": 1000000}
+}
+
+BULK_CHUNK_SIZE = 5000
+BULK_TIME_SLOTS = [(9, 10), (10, 11), (11, 12), (12, 13), (14, 15), (15, 16), (16, 17), (17, 18)]
+# Redis key prefixes cached per document name (doc_cache, identity, attendee_profile)
+BULK_CACHE_PREFIXES = ("cms:doc:", "cms:doc_version:", "cms:identity:", "cms:attendee_for:", "cms:attendee_profile:")
 
 def create_sample_data():
     """Create comprehensive sample data with 100+ records"""
@@ -177,7 +193,7 @@ def create_sessions(conferences):
             # Track used slots per date
             used_slots_by_date = {}
             
-            for i in range(sessions_per_conf):
+            for _ in range(sessions_per_conf):
                 if session_count >= 20:
                     break
                 
@@ -275,10 +291,20 @@ def create_registrations(sessions, attendees):
     registrations = []
     attendee_session_map = {}  # Track attendee registrations to avoid conflicts
     
+    # Session times and existing registrations are loaded once instead of per attendee
+    session_rows = {row.name: row for row in frappe.get_all("Session",
+        filters={"name": ["in", sessions]},
+        fields=["name", "conference", "session_date", "start_time", "end_time", "max_attendees"])}
+    registered_pairs = set(frappe.get_all("Registration",
+        filters={"session": ["in", sessions]},
+        fields=["session", "attendee"], as_list=True))
+    conference_fees = dict(frappe.get_all("Conference",
+        filters={"name": ["in", list({row.conference for row in session_rows.values()})]},
+        fields=["name", "registration_fee"], as_list=True))
+
     for session_id in sessions:
         try:
-            session_doc = frappe.get_doc("Session", session_id)
-            conf_doc = frappe.get_doc("Conference", session_doc.conference)
+            session_doc = session_rows[session_id]
             
             # Calculate reasonable number of registrations (50-80% of capacity)
             max_registrations = min(int(session_doc.max_attendees * 0.8), len(attendees))
@@ -288,25 +314,21 @@ def create_registrations(sessions, attendees):
             available_attendees = []
             for attendee_id in attendees:
                 # Check if attendee already registered for this session
-                if frappe.db.exists("Registration", {"session": session_id, "attendee": attendee_id}):
+                if (session_id, attendee_id) in registered_pairs:
                     continue
                 
                 # Check for time conflicts with existing registrations
                 has_conflict = False
-                if attendee_id in attendee_session_map:
-                    for existing_session_id in attendee_session_map[attendee_id]:
-                        try:
-                            existing_session = frappe.get_doc("Session", existing_session_id)
-                            # Check if same date and overlapping times
-                            if (existing_session.session_date == session_doc.session_date and
-                                existing_session.conference == session_doc.conference):
-                                # Check time overlap
-                                if (session_doc.start_time < existing_session.end_time and 
-                                    session_doc.end_time > existing_session.start_time):
-                                    has_conflict = True
-                                    break
-                        except Exception:
-                            continue
+                for existing_session_id in attendee_session_map.get(attendee_id, []):
+                    existing_session = session_rows[existing_session_id]
+                    # Check if same date and overlapping times
+                    if (existing_session.session_date == session_doc.session_date and
+                        existing_session.conference == session_doc.conference):
+                        # Check time overlap
+                        if (session_doc.start_time < existing_session.end_time and 
+                            session_doc.end_time > existing_session.start_time):
+                            has_conflict = True
+                            break
                 
                 if not has_conflict:
                     available_attendees.append(attendee_id)
@@ -324,7 +346,7 @@ def create_registrations(sessions, attendees):
                         registration.attendee = attendee_id
                         registration.registration_date = (datetime.now() - timedelta(days=random.randint(1, 30))).date()
                         registration.payment_status = "Pending"
-                        registration.amount = conf_doc.registration_fee
+                        registration.amount = conference_fees.get(session_doc.conference)
                         registration.invoice_id = f"INV-{uuid.uuid4().hex[:8].upper()}"
                         registration.join_link = f"https://conference.local/join/{uuid.uuid4().hex[:12]}"
                         
@@ -354,15 +376,17 @@ def process_sample_payments(registrations):
     # Process 70% of registrations
     to_process = random.sample(registrations, int(len(registrations) * 0.7))
     
+    # Group by payment method so each method is settled as one batch
+    by_method = {}
     for reg_name in to_process:
+        by_method.setdefault(random.choice(payment_methods), []).append(reg_name)
+    
+    for payment_method, reg_names in by_method.items():
         try:
-            payment_method = random.choice(payment_methods)
-            result = PaymentProcessor.process_payment(reg_name, payment_method)
-            
-            if result.get("success"):
-                payments.append(result.get("payment_details"))
+            result = PaymentProcessor.process_payments_batch(reg_names, payment_method)
+            payments.extend(result.get("data", {}).get("payments", []))
         except Exception as e:
-            print(f"Payment processing failed for {reg_name}: {e}")
+            print(f"Payment processing failed for {payment_method} batch: {e}")
     
     return payments
 
@@ -370,36 +394,20 @@ def generate_email_logs(registrations, attendees):
     """Generate email logs for registrations and other communications"""
     emails = []
     
-    # Registration confirmation emails
-    for reg_id in registrations:
-        try:
-            reg_doc = frappe.get_doc("Registration", reg_id)
-            attendee_doc = frappe.get_doc("Attendee", reg_doc.attendee)
-            
-            mock_sendmail(
-                recipients=[attendee_doc.email],
-                subject=f"Registration Confirmed - {reg_id}",
-                message="Your registration has been confirmed.",
-                email_type="Registration Confirmation",
-                reference_doctype="Registration",
-                reference_name=reg_id
-            )
-            emails.append(f"Registration confirmation for {reg_id}")
-            
-            # Payment confirmation for paid registrations
-            if reg_doc.payment_status == "Paid":
-                mock_sendmail(
-                    recipients=[attendee_doc.email],
-                    subject=f"Payment Confirmed - {reg_id}",
-                    message="Your payment has been processed successfully.",
-                    email_type="Payment Confirmation",
-                    reference_doctype="Registration",
-                    reference_name=reg_id
-                )
-                emails.append(f"Payment confirmation for {reg_id}")
-                
-        except Exception as e:
-            print(f"Email generation failed for {reg_id}: {e}")
+    # Registration and payment confirmations, rendered in batches
+    try:
+        registration_rows = frappe.get_all("Registration",
+            filters={"name": ["in", registrations]},
+            fields=["name", "invoice_id", "amount", "payment_status", "join_link"])
+        paid_rows = [reg for reg in registration_rows if reg.payment_status == "Paid"]
+        
+        send_registration_confirmations(registration_rows)
+        emails.extend(f"Registration confirmation for {reg.name}" for reg in registration_rows)
+        
+        send_payment_confirmations(paid_rows)
+        emails.extend(f"Payment confirmation for {reg.name}" for reg in paid_rows)
+    except Exception as e:
+        print(f"Email generation failed: {e}")
     
     # OTP emails for some attendees
     if len(attendees) >= 20:
@@ -408,12 +416,7 @@ def generate_email_logs(registrations, attendees):
             try:
                 attendee_doc = frappe.get_doc("Attendee", attendee_id)
                 otp = f"{random.randint(100000, 999999)}"
-                mock_sendmail(
-                    recipients=[attendee_doc.email],
-                    subject="Email Verification - Conference Portal",
-                    message=f"Your verification code is: {otp}",
-                    email_type="OTP Verification"
-                )
+                send_otp_email(attendee_doc.email, otp)
                 emails.append(f"OTP email for {attendee_doc.email}")
             except Exception as e:
                 print(f"OTP email failed for attendee {attendee_id}: {e}")
@@ -463,4 +466,229 @@ def create_test_users():
             
         except Exception as e:
             print(f"Error creating user {user_data['email']}: {e}")
-            continue
\ No newline at end of file
+            continue
+
+def create_bulk_sample_data(scale="small", seed=None):
+    """Generate a load-test dataset with multi-row inserts, bypassing document hooks
+
+    scale: small, 10k or 1m (see SCALE_PRESETS). Registrations never exceed session
+    capacity or overlap for one attendee. No emails are sent. Run with
+    bench --site <site> execute <module>.create_bulk_sample_data --kwargs "{'scale': '10k'}"
+    """
+    if scale not in SCALE_PRESETS:
+        raise ValueError(f"Unknown scale {scale}. Must be one of: {', '.join(SCALE_PRESETS)}")
+
+    preset = SCALE_PRESETS[scale]
+    rng = random.Random(seed)
+    started = time.time()
+
+    try:
+        print(f"Creating {scale} bulk sample data...")
+        cleanup_sample_data()
+
+        conferences = _bulk_conferences(rng, preset)
+        sessions = _bulk_sessions(rng, preset, conferences)
+        attendees = _bulk_attendees(rng, preset)
+        summary = _bulk_registrations(rng, preset, sessions, attendees)
+
+        # Hooks were bypassed, so move the catalog version and drop cached lookups by hand
+        bump_catalog_version()
+        frappe.db.commit()
+        clear_bulk_caches()
+
+        summary.update({
+            "conferences": len(conferences),
+            "sessions": len(sessions),
+            "attendees": len(attendees),
+            "seconds": round(time.time() - started, 1)
+        })
+        print(f"\n✅ Bulk sample data created: {summary}")
+        return summary
+    except Exception as e:
+        frappe.log_error(f"Error creating bulk sample data: {str(e)}")
+        frappe.db.rollback()
+        print(f"❌ Critical error: {str(e)}")
+
+def clear_bulk_caches():
+    """Drop cached documents, identities and profiles that a bulk rerun may have replaced
+
+    Bulk names repeat across runs, so entries cached for the previous dataset would
+    otherwise be served for the new rows with the same names
+    """
+    cache = frappe.cache()
+    for prefix in BULK_CACHE_PREFIXES:
+        cache.delete_keys(prefix)
+
+def _bulk_conferences(rng, preset):
+    """Conference rows with enough days to hold every session in its own slot"""
+    topics = ["Tech Summit", "AI Conference", "DevOps World", "Cloud Computing Expo",
+              "Cybersecurity Summit", "Data Science Conference"]
+    locations = ["Mumbai", "Bangalore", "Delhi", "Hyderabad", "Chennai", "Pune", "Kolkata"]
+    min_days = -(-preset["sessions_per_conference"] // len(BULK_TIME_SLOTS))
+    today = datetime.now().date()
+
+    conferences = []
+    for i in range(preset["conferences"]):
+        start_date = today + timedelta(days=rng.randint(10, 365))
+        conferences.append(frappe._dict({
+            "name": f"CONF-BULK-{i + 1:07d}",
+            "conference_name": f"{rng.choice(topics)} {start_date.year} #{i + 1}",
+            "start_date": start_date,
+            "end_date": start_date + timedelta(days=max(min_days, rng.randint(1, 3)) - 1),
+            "location": rng.choice(locations),
+            "status": rng.choice(["Upcoming", "Upcoming", "Upcoming", "Ongoing"]),
+            "description": "Generated load-test conference",
+            "registration_fee": rng.choice([1500, 2000, 2500, 3000, 3500])
+        }))
+
+    bulk_write("Conference", conferences)
+    return conferences
+
+def _bulk_sessions(rng, preset, conferences):
+    """Session rows placed in distinct (date, slot) pairs within each conference"""
+    topics = ["Introduction to AI", "Machine Learning Basics", "Cloud Architecture", "Microservices",
+              "DevOps Best Practices", "Cybersecurity Fundamentals", "Data Analytics", "Big Data",
+              "Blockchain Basics", "Edge Computing", "Agile Methodology", "Leadership"]
+    speakers = ["Dr. John Smith", "Prof. Jane Doe", "Mr. Alex Johnson", "Ms. Sarah Wilson",
+                "Dr. Michael Brown", "Prof. Emily Davis", "Mr. David Miller", "Ms. Lisa Garcia"]
+
+    sessions = []
+    for conf in conferences:
+        days = (conf.end_date - conf.start_date).days + 1
+        slots = [(day, slot) for day in range(days) for slot in BULK_TIME_SLOTS]
+        for day, (start_hour, end_hour) in rng.sample(slots, preset["sessions_per_conference"]):
+            topic = rng.choice(topics)
+            sessions.append(frappe._dict({
+                "name": f"SES-BULK-{len(sessions) + 1:07d}",
+                "session_name": f"{topic} - {len(sessions) + 1}",
+                "conference": conf.name,
+                "speaker": rng.choice(speakers),
+                "session_date": conf.start_date + timedelta(days=day),
+                "start_time": f"{start_hour:02d}:00:00",
+                "end_time": f"{end_hour:02d}:00:00",
+                "max_attendees": rng.choice([30, 50, 75, 100, 150, 200]),
+                "description": f"Generated session on {topic.lower()}",
+                # Kept for registration generation, not written
+                "_fee": conf.registration_fee
+            }))
+
+    bulk_write("Session", sessions)
+    return sessions
+
+def _bulk_attendees(rng, preset):
+    first_names = ["John", "Jane", "Michael", "Sarah", "David", "Emily", "Robert", "Lisa", "James", "Maria"]
+    last_names = ["Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis"]
+
+    attendees = []
+    for i in range(preset["attendees"]):
+        first_name, last_name = rng.choice(first_names), rng.choice(last_names)
+        attendees.append(frappe._dict({
+            "name": f"ATT-BULK-{i + 1:07d}",
+            "attendee_name": f"{first_name} {last_name}",
+            "email": f"{first_name.lower()}.{last_name.lower()}{i}@example.com",
+            "email_verified": 1 if rng.random() < 0.75 else 0
+        }))
+
+    bulk_write("Attendee", attendees)
+    return attendees
+
+def _bulk_registrations(rng, preset, sessions, attendees):
+    """Registrations and their payments, generated and written chunk by chunk
+
+    Attendees take turns; each picks random sessions until one has room and does not
+    clash with a slot the attendee already holds
+    """
+    remaining = [session.max_attendees for session in sessions]
+    held_slots = [set() for _ in attendees]
+    payment_methods = ["Credit Card", "Debit Card", "UPI", "Net Banking"]
+    today = datetime.now().date()
+
+    summary = {"registrations": 0, "payments": 0, "paid": 0, "failed": 0}
+    registrations, payments = [], []
+
+    for i in range(preset["registrations"]):
+        attendee_index = i % len(attendees)
+        for _ in range(8):
+            session_index = rng.randrange(len(sessions))
+            session = sessions[session_index]
+            slot = (session.session_date, session.start_time)
+            if remaining[session_index] > 0 and slot not in held_slots[attendee_index]:
+                break
+        else:
+            continue
+
+        remaining[session_index] -= 1
+        held_slots[attendee_index].add(slot)
+
+        registration = frappe._dict({
+            "name": f"REG-BULK-{summary['registrations'] + 1:08d}",
+            "conference": session.conference,
+            "session": session.name,
+            "attendee": attendees[attendee_index].name,
+            "registration_date": today - timedelta(days=rng.randint(1, 60)),
+            "payment_status": "Pending",
+            "amount": session._fee,
+            "invoice_id": f"INV-{uuid.uuid4().hex[:8].upper()}",
+            "payment_details": None,
+            "join_link": f"https://conference.local/join/{uuid.uuid4().hex[:12]}"
+        })
+        registrations.append(registration)
+        summary["registrations"] += 1
+
+        # 70% paid, 5% failed, the rest still pending
+        outcome = rng.random()
+        if outcome < 0.75:
+            payment = _bulk_payment(rng, registration, rng.choice(payment_methods), success=outcome < 0.7)
+            payments.append(payment)
+            registration.payment_details = payment["name"]
+            registration.payment_status = "Paid" if outcome < 0.7 else "Failed"
+            summary["payments"] += 1
+            summary["paid" if outcome < 0.7 else "failed"] += 1
+
+        if len(registrations) >= BULK_CHUNK_SIZE:
+            bulk_write("Registration", registrations)
+            bulk_write("Mock Payment Details", payments)
+            registrations, payments = [], []
+
+    bulk_write("Registration", registrations)
+    bulk_write("Mock Payment Details", payments)
+    return summary
+
+def _bulk_payment(rng, registration, payment_method, success):
+    """Mock Payment Details values for a generated registration"""
+    processing_fee, net_amount = PaymentProcessor._calculate_fees(registration.amount)
+    gateway_transaction_id = f"GTX{uuid.uuid4().hex[:12].upper()}"
+    result = {
+        "success": success,
+        "message": "Payment processed successfully" if success else "Card declined by issuer",
+        "gateway_code": "00" if success else "05",
+        "gateway_transaction_id": gateway_transaction_id
+    }
+    record = PaymentProcessor._build_payment_record(
+        registration.name, f"TXN_{uuid.uuid4().hex[:12].upper()}", gateway_transaction_id,
+        payment_method, registration.amount, processing_fee, net_amount, result,
+        PaymentProcessor._generate_mock_payment_details(payment_method, None))
+    record.update({
+        "name": f"PAY-BULK-{registration.name[9:]}",
+        "payment_date": datetime.combine(registration.registration_date, datetime.min.time()),
+        "idempotency_key": None
+    })
+    return record
+
+def bulk_write(doctype, rows):
+    """Insert rows in multi-row chunks with standard columns filled in, committing per chunk"""
+    if not rows:
+        return
+
+    now = frappe.utils.now()
+    user = frappe.session.user
+    fields = ["name", "creation", "modified", "owner", "modified_by", "docstatus"] + \
+        [field for field in rows[0] if field != "name" and not field.startswith("_")]
+
+    for start in range(0, len(rows), BULK_CHUNK_SIZE):
+        chunk = rows[start:start + BULK_CHUNK_SIZE]
+        frappe.db.bulk_insert(doctype, fields,
+            [[row["name"], now, now, user, user, 0] + [row.get(field) for field in fields[6:]] for row in chunk])
+        frappe.db.commit()
+
+    print(f"✓ Wrote {len(rows)} {doctype} rows")
@@ -147,16 +147,22 @@ after_install = "conference_management_system.conference_management_system.insta
 # ---------------
 # Hook on document methods and events
 
-# doc_events = {
-# 	"Registration": {
-# 		"after_insert": "conference_management_system.send_registration_confirmation"
-# 	}
-# }
+doc_events = {
+	"User": {
+		"on_update": "conference_management_system.conference_management_system.utils.identity.invalidate_user_identity",
+		"on_trash": "conference_management_system.conference_management_system.utils.identity.invalidate_user_identity"
+	}
+}
 
 # Scheduled Tasks
 # ---------------
 
 scheduler_events = {
+	"cron": {
+		"*/10 * * * *": [
+			"conference_management_system.conference_management_system.tasks.reconcile_pending_payments"
+		]
+	},
 	"daily": [
 		"conference_management_system.conference_management_system.tasks.update_conference_status"
 	],
@@ -0,0 +1,44 @@
+import frappe
+
+from conference_management_system.conference_management_system.utils.api_log_body import pack_api_log_body
+
+BATCH_SIZE = 2000
+LEGACY_COLUMNS = ("request_headers", "request_body", "response_body")
+
+
+def execute():
+    """Compress existing API Log bodies into API Log Body, keep their sizes, drop the text columns"""
+    if not all(frappe.db.has_column("API Log", column) for column in LEGACY_COLUMNS):
+        return
+
+    now = frappe.utils.now()
+    last_name = ""
+    while True:
+        rows = frappe.db.sql("""
+            SELECT name, request_headers, request_body, response_body
+            FROM `tabAPI Log`
+            WHERE name > %s
+            ORDER BY name
+            LIMIT %s
+        """, (last_name, BATCH_SIZE), as_dict=True)
+        if not rows:
+            break
+
+        bodies = []
+        for row in rows:
+            payload, sizes = pack_api_log_body(row.request_headers, row.request_body, row.response_body)
+            frappe.db.sql("""
+                UPDATE `tabAPI Log`
+                SET request_size = %s, response_size = %s, stored_size = %s
+                WHERE name = %s
+            """, (sizes["request_size"], sizes["response_size"], sizes["stored_size"], row.name))
+            bodies.append([row.name, now, now, "Administrator", "Administrator", row.name, payload])
+
+        # Rows kept from an interrupted earlier run are left as they are
+        frappe.db.bulk_insert("API Log Body",
+            ["name", "creation", "modified", "owner", "modified_by", "api_log", "payload"],
+            bodies, ignore_duplicates=True)
+        frappe.db.commit()
+        last_name = rows[-1].name
+
+    frappe.db.sql_ddl("ALTER TABLE `tabAPI Log` " + ", ".join(f"DROP COLUMN `{column}`" for column in LEGACY_COLUMNS))